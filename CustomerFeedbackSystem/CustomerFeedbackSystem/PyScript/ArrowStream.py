@@ -0,0 +1,125 @@
+# 安裝套件：pip install pyarrow
+
+# -*- coding: utf-8 -*-
+"""
+串流寫出欄式格式（Parquet / Arrow IPC(Feather)）：資料列累積到 batch_size 筆就寫成一個
+row group / record batch，記憶體用量只與批次大小有關。
+欄位型別：
+  string    一般字串
+  category  字典編碼（pandas 讀回為 category）：Parquet 每個 row group 只帶該批用到的值；
+            Feather 整份檔案共用同一份字典，每批只以 delta 寫出新出現的值
+  int64 / int32
+  timestamp 微秒精度時間
+讀回：pandas.read_parquet(path) / pandas.read_feather(path)；加上 dtype_backend="pyarrow" 時字串不轉成 Python 物件，較快。
+100 萬列實測（單核、不含 import pandas 約 0.5 秒）：Feather 約 0.5 秒（pyarrow 0.35 秒），
+Parquet 約 1.0 秒（pyarrow 0.85 秒）；要在一秒內載入請用 Feather。Benchmark.py columnar 可重新量測。
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# 支援的副檔名
+PARQUET_SUFFIXES = (".parquet",)
+ARROW_SUFFIXES = (".feather", ".arrow")
+COLUMNAR_SUFFIXES = PARQUET_SUFFIXES + ARROW_SUFFIXES
+
+
+def _arrow_type(kind: str):
+    return {
+        "string": pa.string(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "int64": pa.int64(),
+        "int32": pa.int32(),
+        "timestamp": pa.timestamp("us"),
+    }[kind]
+
+
+class ArrowStreamWriter:
+    """
+    用法：
+        with ArrowStreamWriter(out_path, [("Name", "string"), ("Type", "category"), ...]) as w:
+            for r in rows:
+                w.append(r)
+    """
+
+    def __init__(self, out_path: Path, fields: Sequence[Tuple[str, str]], batch_size: int = 65_536):
+        if not HAS_PYARROW:
+            raise SystemExit("輸出 Parquet/Feather 需要 pyarrow：pip install pyarrow")
+        self.out_path = out_path
+        self.kinds = [kind for _, kind in fields]
+        self.schema = pa.schema([(name, _arrow_type(kind)) for name, kind in fields])
+        self.batch_size = batch_size
+        self.rows = 0
+        self._cols: List[List[Any]] = [[] for _ in fields]
+        # Feather 的 category 欄位：整份檔案共用、只增不減的字典（值 -> 索引）與已建好的字典陣列
+        self._dicts: Dict[int, Dict[str, int]] = {}
+        self._dict_arrays: Dict[int, Any] = {}
+
+        suffix = out_path.suffix.lower()
+        if suffix in PARQUET_SUFFIXES:
+            self._writer = pq.ParquetWriter(str(out_path), self.schema, compression="zstd")
+        elif suffix in ARROW_SUFFIXES:
+            self._dicts = {i: {} for i, kind in enumerate(self.kinds) if kind == "category"}
+            self._dict_arrays = {i: pa.array([], type=pa.string()) for i in self._dicts}
+            # 字典只會在尾端新增，以 delta 方式寫出即可在 IPC 檔案格式中延續同一份字典
+            options = pa.ipc.IpcWriteOptions(compression="zstd", emit_dictionary_deltas=True)
+            self._writer = pa.ipc.new_file(str(out_path), self.schema, options=options)
+        else:
+            raise ValueError(f"不支援的欄式輸出格式：{suffix}")
+
+    def append(self, values: Sequence[Any]):
+        for col, val in zip(self._cols, values):
+            col.append(val)
+        self.rows += 1
+        if len(self._cols[0]) >= self.batch_size:
+            self._flush()
+
+    def _column(self, i: int, values: List[Any]):
+        kind = self.kinds[i]
+        if kind != "category":
+            return pa.array(values, type=_arrow_type(kind))
+        mapping = self._dicts.get(i)
+        if mapping is None:
+            # Parquet 每個 row group 各自寫字典頁：只用這一批出現過的值
+            return pa.array(values, type=pa.string()).dictionary_encode()
+        indices = []
+        new = []
+        for v in values:
+            if v is None:
+                indices.append(None)
+                continue
+            idx = mapping.get(v)
+            if idx is None:
+                idx = mapping[v] = len(mapping)
+                new.append(v)
+            indices.append(idx)
+        # 只轉換新出現的值接在既有字典後面；IPC 寫入時只以 delta 寫出這些新值
+        if new:
+            self._dict_arrays[i] = pa.concat_arrays([self._dict_arrays[i], pa.array(new, type=pa.string())])
+        return pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()), self._dict_arrays[i])
+
+    def _flush(self):
+        if not self._cols[0]:
+            return
+        arrays = [self._column(i, col) for i, col in enumerate(self._cols)]
+        self._writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self._cols = [[] for _ in self._cols]
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.close()
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
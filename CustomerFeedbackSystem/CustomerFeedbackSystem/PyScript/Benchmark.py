@@ -0,0 +1,671 @@
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\Benchmark.py excel --rows 100000 1000000
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\Benchmark.py columnar --rows 1000000
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\Benchmark.py walk --depth 4 --fanout 6 --files 20 --workers 1 4 8
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\Benchmark.py copy --small-count 2000 --large-mb 500 --dir D:\tmp
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\Benchmark.py pathlist --rows 100000 500000
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\Benchmark.py ooxml --parts 10 1000 5000 --files 50
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\Benchmark.py inventory --files 1000000 --dir D:\bench
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\Benchmark.py suite --files 10000 100000 --dir D:\bench --label v2.3
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\Benchmark.py compare --baseline v2.2
+
+# -*- coding: utf-8 -*-
+"""
+PyScript 工具的效能量測：每個案例在獨立子行程執行，回報耗時、CPU 時間與峰值記憶體（RSS）。
+suite 以 SyntheticTree 產生的測試樹實際執行各工具，結果附加到 JSONL 結果檔；
+compare 比較結果檔中兩個版本（--label）的差異，找出效能退步。
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import multiprocessing as mp
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Iterator, List
+
+HEADERS = [
+    "Name",
+    "Type",
+    "Extension",
+    "Size(bytes)",
+    "ModifiedTime",
+    "CreatedTime",
+    "RelativePath",
+    "Parent",
+    "Depth",
+    "FullPath",
+]
+
+
+def peak_rss_mb() -> float:
+    """目前行程的峰值 RSS（MB）；無法取得時回傳 -1。"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 單位為 KB，macOS 為 bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil  # Windows 需 pip install psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except Exception:
+        return -1.0
+
+
+def _cpu_seconds() -> float:
+    t = os.times()
+    return t.user + t.system
+
+
+def _child(target: Callable, args: tuple, q):
+    t0 = time.perf_counter()
+    c0 = _cpu_seconds()
+    target(*args)
+    q.put((time.perf_counter() - t0, peak_rss_mb(), _cpu_seconds() - c0))
+
+
+def run_isolated(target: Callable, *args) -> tuple:
+    """在子行程執行 target(*args)，回傳 (秒數, 峰值 RSS MB, CPU 秒數)，互不影響彼此的峰值。"""
+    q = mp.Queue()
+    p = mp.Process(target=_child, args=(target, args, q))
+    p.start()
+    result = q.get()
+    p.join()
+    return result
+
+
+def synthetic_rows(n: int) -> Iterator[List[Any]]:
+    """產生與 ListAllFilePath 相同欄位的假資料列。"""
+    base = datetime(2020, 1, 1, 8, 0, 0)
+    for i in range(n):
+        parent = f"部門{i % 50:02d}/專案{i % 997:03d}"
+        name = f"文件_{i:07d}.docx"
+        rel = f"{parent}/{name}"
+        t = base + timedelta(seconds=i * 37)
+        yield [name, "File", ".docx", 10_000 + i % 500_000, t, t, rel, parent, 3, f"D:\\GMP文件庫\\{rel}"]
+
+
+def _excel_openpyxl(n: int, out: str):
+    """原本的 openpyxl 一般模式寫法（三趟走訪），作為比較基準。"""
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Inventory"
+    ws.append(HEADERS)
+    for r in synthetic_rows(n):
+        ws.append(r)
+    ws.freeze_panes = "A2"
+    ws.auto_filter.ref = ws.dimensions
+    for col_idx, col_cells in enumerate(ws.columns, start=1):
+        max_len = max((len(str(c.value)) for c in col_cells if c.value is not None), default=0)
+        ws.column_dimensions[get_column_letter(col_idx)].width = min(max_len + 2, 80)
+    for col_idx in (5, 6):
+        for row_idx in range(2, ws.max_row + 1):
+            cell = ws.cell(row=row_idx, column=col_idx)
+            if isinstance(cell.value, datetime):
+                cell.number_format = "yyyy-mm-dd hh:mm:ss"
+    wb.save(out)
+
+
+def _excel_stream(n: int, out: str):
+    from ListAllFilePath import export_to_excel
+    export_to_excel(synthetic_rows(n), HEADERS, Path(out))
+
+
+def bench_excel(sizes: List[int], skip_baseline: bool):
+    cases = [("stream", _excel_stream)]
+    if not skip_baseline:
+        cases.insert(0, ("openpyxl", _excel_openpyxl))
+    print(f"{'案例':10s} {'列數':>10s} {'秒數':>9s} {'峰值RSS(MB)':>12s} {'列/秒':>10s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            for label, fn in cases:
+                out = os.path.join(tmp, f"{label}_{n}.xlsx")
+                secs, rss, _ = run_isolated(fn, n, out)
+                print(f"{label:10s} {n:>10,d} {secs:>9.2f} {rss:>12.1f} {n / secs:>10,.0f}")
+
+
+def _columnar_write(n: int, out: str):
+    from ListAllFilePath import export_to_columnar
+    export_to_columnar(synthetic_rows(n), HEADERS, Path(out))
+
+
+def _pandas_import():
+    importlib.import_module("pandas")
+
+
+def _columnar_read(out: str, dtype_backend: str):
+    import pandas as pd
+    read = pd.read_parquet if out.endswith(".parquet") else pd.read_feather
+    read(out, **({} if dtype_backend == "default" else {"dtype_backend": dtype_backend}))
+
+
+def bench_columnar(sizes: List[int]):
+    """
+    Parquet / Feather 寫出與 pandas 讀回耗時。讀回每次都在新的子行程執行，秒數包含 import pandas，
+    另列出只 import pandas 的秒數；扣掉後才是讀檔本身。
+    dtype_backend=pyarrow 時字串不轉成 Python 物件，讀回較快。
+    """
+    print(f"{'案例':24s} {'列數':>10s} {'秒數':>9s} {'峰值RSS(MB)':>12s} {'檔案(MB)':>9s}")
+    secs, rss, _ = run_isolated(_pandas_import)
+    print(f"{'import pandas':24s} {'':>10s} {secs:>9.2f} {rss:>12.1f}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            for suffix in (".parquet", ".feather"):
+                out = os.path.join(tmp, f"inventory_{n}{suffix}")
+                secs, rss, _ = run_isolated(_columnar_write, n, out)
+                size = os.path.getsize(out) / (1024 * 1024)
+                print(f"{'寫出' + suffix:24s} {n:>10,d} {secs:>9.2f} {rss:>12.1f} {size:>9.1f}")
+                for backend in ("default", "pyarrow"):
+                    secs, rss, _ = run_isolated(_columnar_read, out, backend)
+                    label = f"讀回{suffix} ({backend})"
+                    print(f"{label:24s} {n:>10,d} {secs:>9.2f} {rss:>12.1f} {size:>9.1f}")
+
+
+def make_tree(base: Path, depth: int, fanout: int, files: int) -> int:
+    """建立 depth 層、每層 fanout 個子資料夾、每個資料夾 files 個空檔的測試目錄，回傳檔案數。"""
+    count = 0
+    stack = [(base, 0)]
+    while stack:
+        d, level = stack.pop()
+        d.mkdir(parents=True, exist_ok=True)
+        for i in range(files):
+            (d / f"f{i:04d}.docx").touch()
+            count += 1
+        if level < depth:
+            stack.extend((d / f"d{j:02d}", level + 1) for j in range(fanout))
+    return count
+
+
+def _walk_legacy(root: str):
+    """原本 ListAllFilePath.iter_entries 的單執行緒 stack 掃描 + safe_stat。"""
+    stack = [Path(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    try:
+                        entry.stat(follow_symlinks=False)
+                    except OSError:
+                        pass
+                    if is_dir:
+                        stack.append(Path(entry.path))
+        except (PermissionError, FileNotFoundError):
+            continue
+
+
+def _walk_new(root: str, workers: int):
+    from DirWalker import walk, safe_stat
+    for _, entry, _, _ in walk([root], workers=workers, prestat=True):
+        safe_stat(entry)
+
+
+def bench_walk(depth: int, fanout: int, files: int, workers: List[int], root: str = None):
+    """比較原本掃描與 DirWalker（不同執行緒數）；可用 --root 指向網路磁碟上的既有目錄。"""
+    with tempfile.TemporaryDirectory() as tmp:
+        if root is None:
+            root = os.path.join(tmp, "tree")
+            n = make_tree(Path(root), depth, fanout, files)
+            print(f"測試目錄：{n:,} 個檔案（depth={depth}, fanout={fanout}, files={files}）")
+        print(f"{'案例':14s} {'秒數':>9s} {'峰值RSS(MB)':>12s}")
+        secs, rss, _ = run_isolated(_walk_legacy, root)
+        print(f"{'legacy':14s} {secs:>9.2f} {rss:>12.1f}")
+        for w in workers:
+            secs, rss, _ = run_isolated(_walk_new, root, w)
+            print(f"{'walker x' + str(w):14s} {secs:>9.2f} {rss:>12.1f}")
+
+
+def _copy_files(backend: str, sources: List[str], dst_dir: str):
+    from FastCopy import COPY_BACKENDS, stats
+    fn = COPY_BACKENDS[backend]
+    for src in sources:
+        fn(src, os.path.join(dst_dir, os.path.basename(src)))
+    if stats:
+        print(f"  （{backend} 實際使用：{dict(stats)}）")
+
+
+def _make_files(d: Path, prefix: str, count: int, size: int) -> List[str]:
+    d.mkdir(parents=True, exist_ok=True)
+    block = os.urandom(min(size, 1024 * 1024))
+    paths = []
+    for i in range(count):
+        p = d / f"{prefix}{i:05d}.pdf"
+        with open(p, "wb") as f:
+            left = size
+            while left > 0:
+                f.write(block[:left])
+                left -= len(block)
+        paths.append(str(p))
+    return paths
+
+
+def bench_copy(small_count: int, small_kb: int, large_count: int, large_mb: int, base: str = None, rounds: int = 2):
+    """
+    FastCopy（reflink / copy_file_range / sendfile）與 shutil.copy2 比較：GB/s 與 CPU 秒數。
+    兩種方式輪流執行 rounds 次，避免只有第一個案例吃到冷快取；--dir 指向要量測的檔案系統。
+    """
+    with tempfile.TemporaryDirectory(dir=base) as tmp:
+        cases = [
+            (f"{small_kb} KB x {small_count}", _make_files(Path(tmp, "src_small"), "s", small_count, small_kb * 1024)),
+            (f"{large_mb} MB x {large_count}", _make_files(Path(tmp, "src_large"), "l", large_count, large_mb * 1024 * 1024)),
+        ]
+        print(f"{'案例':18s} {'方式':6s} {'秒數':>8s} {'GB/s':>8s} {'CPU秒':>8s} {'峰值RSS(MB)':>12s}")
+        for label, sources in cases:
+            total = sum(os.path.getsize(p) for p in sources)
+            for r in range(rounds):
+                for backend in ("copy2", "auto"):
+                    dst = os.path.join(tmp, f"dst_{backend}_{r}")
+                    os.mkdir(dst)
+                    secs, rss, cpu = run_isolated(_copy_files, backend, sources, dst)
+                    print(f"{label:18s} {backend:6s} {secs:>8.2f} {total / secs / 1e9:>8.2f} {cpu:>8.2f} {rss:>12.1f}")
+                    shutil.rmtree(dst)
+
+
+def _make_path_list(n: int, out: str):
+    """以 openpyxl 寫出路徑清單（與 Excel 存檔相同使用共用字串表），第二欄放備註。"""
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("清單")
+    ws.append(["FullPath", "備註"])
+    for r in synthetic_rows(n):
+        ws.append([r[9], r[7]])
+    wb.save(out)
+
+
+def _read_path_list(path: str, engine: str):
+    from PathList import read_path_list
+    t0 = time.perf_counter()
+    first = None
+    n = 0
+    for _ in read_path_list(Path(path), skip_header=True, engine=engine):
+        n += 1
+        if first is None:
+            first = time.perf_counter() - t0
+    print(f"  （{engine}：{n:,} 筆，取得第一筆耗時 {first:.2f} 秒）")
+
+
+def bench_pathlist(sizes: List[int]):
+    """PathList 串流讀取與原本 openpyxl read-only 讀取比較（含取得第一筆的時間）。"""
+    print(f"{'案例':10s} {'列數':>10s} {'秒數':>9s} {'峰值RSS(MB)':>12s} {'列/秒':>10s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            out = os.path.join(tmp, f"list_{n}.xlsx")
+            _make_path_list(n, out)
+            for engine in ("openpyxl", "fast"):
+                secs, rss, _ = run_isolated(_read_path_list, out, engine)
+                print(f"{engine:10s} {n:>10,d} {secs:>9.2f} {rss:>12.1f} {n / secs:>10,.0f}")
+
+
+_DOCX_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Default Extension="png" ContentType="image/png"/>'
+    '{overrides}'
+    '<Override PartName="/word/document.xml" ContentType="{main}"/>'
+    '</Types>'
+)
+
+
+def make_docx(out: str, parts: int, main: str = "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"):
+    """產生含 parts 個內嵌圖片（與對應 Override 項目）的最小 DOCX，模擬圖片很多的文件。"""
+    import zipfile
+    overrides = "".join(
+        f'<Override PartName="/word/embeddings/oleObject{i}.bin" '
+        f'ContentType="application/vnd.openxmlformats-officedocument.oleObject"/>'
+        for i in range(parts // 10)
+    )
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        # Word 存檔時 [Content_Types].xml 在最前面，圖片接在 document.xml 之後
+        zf.writestr("[Content_Types].xml", _DOCX_TYPES.format(overrides=overrides, main=main))
+        zf.writestr("_rels/.rels", "<Relationships/>")
+        zf.writestr(
+            "word/document.xml",
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body/></w:document>',
+        )
+        for i in range(parts):
+            zf.writestr(f"word/media/image{i}.png", os.urandom(64), zipfile.ZIP_STORED)
+
+
+def _sniff_corpus(files: List[str], engine: str, loops: int):
+    import VerifyDoc
+    fn = VerifyDoc._docx_from_zipfile if engine == "zipfile" else VerifyDoc._docx_from_zip
+    for _ in range(loops):
+        for path in files:
+            with open(path, "rb") as f:
+                ok, kind, _ = fn(f)
+            if not ok:
+                raise SystemExit(f"判斷錯誤：{path} {kind}")
+
+
+def bench_ooxml(parts_list: List[int], files: int, loops: int):
+    """VerifyDoc 的 DOCX 判斷：OoxmlSniff（只讀中央目錄兩個項目）與 zipfile namelist 比較，回報每檔微秒數。"""
+    print(f"{'案例':8s} {'內含項目':>8s} {'檔案數':>6s} {'秒數':>8s} {'每檔(µs)':>10s} {'CPU秒數':>8s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for parts in parts_list:
+            corpus = []
+            for i in range(files):
+                out = os.path.join(tmp, f"doc_{parts}_{i}.docx")
+                make_docx(out, parts)
+                corpus.append(out)
+            for engine in ("zipfile", "sniff"):
+                secs, _, cpu = run_isolated(_sniff_corpus, corpus, engine, loops)
+                per = secs / (files * loops) * 1e6
+                print(f"{engine:8s} {parts:>8,d} {files:>6d} {secs:>8.2f} {per:>10.1f} {cpu:>8.2f}")
+
+
+def _inventory_walk(tree: str):
+    """只走訪不保留：量測掃描本身的峰值，作為兩種保存方式的共同基準。"""
+    from DirWalker import walk
+    n = sum(1 for _ in walk([Path(tree)], prestat=True))
+    print(f"  項目數：{n:,}")
+
+
+def _inventory_rows(tree: str):
+    """每個項目一個 entry_row 資料列（十欄 list）全部留在記憶體。"""
+    from DirWalker import walk
+    from ListAllFilePath import entry_row
+    root = Path(tree)
+    rows = [entry_row(root, entry, is_dir) for _, entry, is_dir, _ in walk([root], prestat=True)]
+    print(f"  資料列：{len(rows):,}")
+
+
+def _inventory_store(tree: str):
+    """InventoryStore 欄式保存；另外建立查詢索引，量測查詢時的峰值。"""
+    from DirWalker import walk
+    from InventoryStore import InventoryStore
+    store = InventoryStore(Path(tree))
+    for _, entry, is_dir, _ in walk([store.root], prestat=True):
+        store.add(entry, is_dir)
+    store.find(store.rel_path(len(store) - 1))
+
+
+def bench_inventory(files: int, base: str, tree_opts: dict):
+    """
+    ListAllFilePath 需要把整份清單留在記憶體時（--hash）：十欄 list 與 InventoryStore 的峰值 RSS 比較。
+    測試樹以 SyntheticTree 產生（相同參數會沿用）；淨增加量為扣掉只走訪不保留時的峰值。
+    """
+    from SyntheticTree import generate
+
+    base_dir = Path(base) if base else Path(tempfile.gettempdir()) / "pyscript_bench"
+    m = generate(base_dir / f"inventory_{files}", files, **tree_opts)
+    print(f"{'案例':14s} {'秒數':>9s} {'峰值RSS(MB)':>12s} {'淨增加(MB)':>11s}")
+    walk_secs, walk_rss, _ = run_isolated(_inventory_walk, m["tree"])
+    print(f"{'walk':14s} {walk_secs:>9.2f} {walk_rss:>12.1f} {'':>11s}")
+    peaks = {}
+    for label, fn in (("rows", _inventory_rows), ("InventoryStore", _inventory_store)):
+        secs, rss, _ = run_isolated(fn, m["tree"])
+        peaks[label] = rss
+        print(f"{label:14s} {secs:>9.2f} {rss:>12.1f} {rss - walk_rss:>11.1f}")
+    net = (peaks["rows"] - walk_rss) / max(peaks["InventoryStore"] - walk_rss, 0.1)
+    print(f"峰值 RSS：{peaks['rows'] / peaks['InventoryStore']:.1f} 倍；淨增加：{net:.1f} 倍")
+
+
+DEFAULT_RESULTS = "benchmark_results.jsonl"
+SUITE_CASES = ["list-csv", "list-xlsx", "list-hash", "verify", "verify-w8", "scan", "copy", "pathlist", "pathlist-openpyxl", "xlsx-write"]
+
+
+def _run_tool(module: str, argv: List[str]):
+    """在（子行程中）以指定參數執行工具的 main()。"""
+    mod = importlib.import_module(module)
+    sys.argv = [f"{module}.py"] + argv
+    mod.main()
+
+
+def _quiet(target: Callable, *args):
+    """在（子行程中）執行 target(*args)，主控台輸出導向 devnull，不打亂 suite 的結果表格。"""
+    with open(os.devnull, "w", encoding="utf-8") as null, contextlib.redirect_stdout(null):
+        target(*args)
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=10,
+        )
+        return out.stdout.strip() if out.returncode == 0 else ""
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def _suite_case(case: str, m: dict, work: str, copy_max: int) -> tuple:
+    """回傳 (要在子行程執行的函式, 參數, 處理件數, 處理位元組數或 0)。"""
+    tree, lists = m["tree"], m["lists"]
+    files = sum(m["kinds"].values())
+    if case == "list-csv":
+        return _run_tool, ("ListAllFilePath", [tree, "-o", os.path.join(work, "inventory.csv")]), files, 0
+    if case == "list-xlsx":
+        return _run_tool, ("ListAllFilePath", [tree, "-o", os.path.join(work, "inventory.xlsx")]), files, 0
+    if case == "list-hash":
+        return _run_tool, ("ListAllFilePath", [tree, "-o", os.path.join(work, "inventory.csv"), "--hash"]), files, 0
+    if case == "verify":
+        return _run_tool, ("VerifyDoc", [tree, "--csv", os.path.join(work, "verify.csv")]), files, 0
+    if case == "verify-w8":
+        return _run_tool, ("VerifyDoc", [tree, "--csv", os.path.join(work, "verify.csv"), "--workers", "8"]), files, 0
+    if case == "scan":
+        # 單次掃描同時輸出清單與驗證結果，與 list-csv + verify 的合計比較
+        return _run_tool, ("ScanLibrary", [tree, "-o", os.path.join(work, "scan.csv")]), files, 0
+    if case == "copy":
+        # 複製只取清單前 copy_max 筆，避免大型測試樹複製整份
+        subset = os.path.join(work, "copy_list.txt")
+        n = size = 0
+        with open(lists[".txt"], "r", encoding="utf-8") as src, open(subset, "w", encoding="utf-8") as dst:
+            for line in src:
+                if n >= copy_max:
+                    break
+                dst.write(line)
+                size += os.path.getsize(line.rstrip("\n"))
+                n += 1
+        out = os.path.join(work, "copy_out")
+        return _run_tool, ("CopyOthers", [subset, "-o", out, "--no-journal"]), n, size
+    if case == "pathlist":
+        return _read_path_list, (lists[".xlsx"], "fast"), files, 0
+    if case == "pathlist-openpyxl":
+        return _read_path_list, (lists[".xlsx"], "openpyxl"), files, 0
+    if case == "xlsx-write":
+        return _excel_stream, (files, os.path.join(work, "rows.xlsx")), files, 0
+    raise ValueError(f"未知的案例：{case}")
+
+
+def bench_suite(sizes: List[int], cases: List[str], base: str, results: str, label: str,
+                rounds: int, copy_max: int, tree_opts: dict):
+    """
+    以 SyntheticTree 產生（或沿用）各檔案數的測試樹，在獨立子行程執行各工具，
+    每次執行的耗時、CPU、峰值 RSS、每秒件數附加到 results（JSONL），供 compare 比較版本差異。
+    """
+    from SyntheticTree import generate
+
+    base_dir = Path(base) if base else Path(tempfile.gettempdir()) / "pyscript_bench"
+    commit = _git_commit()
+    label = label or commit or datetime.now().strftime("%Y%m%d_%H%M%S")
+    print(f"版本標籤：{label}，結果檔：{results}")
+    print(f"{'案例':18s} {'檔案數':>10s} {'秒數':>9s} {'CPU秒數':>9s} {'峰值RSS(MB)':>12s} {'件/秒':>10s} {'MB/秒':>8s}")
+    for n in sizes:
+        m = generate(base_dir / f"tree_{n}", n, **tree_opts)
+        for case in cases:
+            for _ in range(rounds):
+                with tempfile.TemporaryDirectory(dir=base_dir) as work:
+                    fn, args, items, nbytes = _suite_case(case, m, work, copy_max)
+                    secs, rss, cpu = run_isolated(_quiet, fn, *args)
+                rec = {
+                    "time": datetime.now().isoformat(timespec="seconds"),
+                    "label": label,
+                    "commit": commit,
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "case": case,
+                    "files": n,
+                    "items": items,
+                    "seconds": round(secs, 4),
+                    "cpu_seconds": round(cpu, 4),
+                    "peak_rss_mb": round(rss, 1),
+                    "items_per_second": round(items / secs, 1) if secs > 0 else 0,
+                    "mb_per_second": round(nbytes / secs / 1e6, 1) if secs > 0 and nbytes else None,
+                    "tree": m["params"],
+                }
+                with open(results, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                mbps = f"{rec['mb_per_second']:>8.1f}" if rec["mb_per_second"] else f"{'':>8s}"
+                print(f"{case:18s} {n:>10,d} {secs:>9.2f} {cpu:>9.2f} {rss:>12.1f} {rec['items_per_second']:>10,.0f} {mbps}")
+
+
+def compare_results(results: str, baseline: str = None, current: str = None, threshold: float = 10.0) -> int:
+    """
+    比較結果檔中兩個版本標籤：每個 (案例, 檔案數) 取各版本最快的一次，
+    耗時或峰值記憶體增加超過 threshold% 標示為退步。回傳退步項目數。
+    """
+    by_label: dict = {}
+    order: List[str] = []
+    with open(results, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            if rec["label"] not in by_label:
+                by_label[rec["label"]] = {}
+                order.append(rec["label"])
+            key = (rec["case"], rec["files"])
+            old = by_label[rec["label"]].get(key)
+            if old is None or rec["seconds"] < old["seconds"]:
+                by_label[rec["label"]][key] = rec
+    current = current or (order[-1] if order else None)
+    if current not in by_label:
+        raise SystemExit(f"結果檔中找不到版本：{current}")
+    if baseline is None:
+        idx = order.index(current)
+        if idx == 0:
+            raise SystemExit("結果檔中只有一個版本，請先以不同 --label 執行 suite")
+        baseline = order[idx - 1]
+    if baseline not in by_label:
+        raise SystemExit(f"結果檔中找不到版本：{baseline}")
+
+    print(f"比較：{baseline} → {current}（門檻 {threshold:g}%）")
+    print(f"{'案例':18s} {'檔案數':>10s} {'秒數(前)':>9s} {'秒數(後)':>9s} {'變化':>8s} {'RSS(前)':>9s} {'RSS(後)':>9s} {'變化':>8s}")
+    regressions = 0
+    for key, new in sorted(by_label[current].items()):
+        old = by_label[baseline].get(key)
+        if old is None:
+            continue
+        dt = (new["seconds"] / old["seconds"] - 1) * 100 if old["seconds"] else 0.0
+        dm = (new["peak_rss_mb"] / old["peak_rss_mb"] - 1) * 100 if old["peak_rss_mb"] > 0 else 0.0
+        flag = "  << 退步" if dt > threshold or dm > threshold else ""
+        regressions += bool(flag)
+        print(f"{key[0]:18s} {key[1]:>10,d} {old['seconds']:>9.2f} {new['seconds']:>9.2f} {dt:>+7.1f}%"
+              f" {old['peak_rss_mb']:>9.1f} {new['peak_rss_mb']:>9.1f} {dm:>+7.1f}%{flag}")
+    print(f"退步項目：{regressions}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyScript 工具效能量測（耗時與峰值記憶體）")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p_excel = sub.add_parser("excel", help="ListAllFilePath 的 Excel 匯出")
+    p_excel.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000], help="資料列數")
+    p_excel.add_argument("--skip-baseline", action="store_true", help="不跑原本 openpyxl 寫法（列數很大時很慢）")
+
+    p_col = sub.add_parser("columnar", help="ListAllFilePath 的 Parquet/Feather 寫出與讀回")
+    p_col.add_argument("--rows", type=int, nargs="+", default=[1_000_000], help="資料列數")
+
+    p_walk = sub.add_parser("walk", help="DirWalker 與原本單執行緒掃描比較")
+    p_walk.add_argument("--depth", type=int, default=4)
+    p_walk.add_argument("--fanout", type=int, default=6)
+    p_walk.add_argument("--files", type=int, default=20, help="每個資料夾的檔案數")
+    p_walk.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    p_walk.add_argument("--root", help="改用既有目錄（例如網路磁碟）而不產生測試目錄")
+
+    p_copy = sub.add_parser("copy", help="FastCopy 與 shutil.copy2 比較（GB/s、CPU 秒數）")
+    p_copy.add_argument("--small-count", type=int, default=2000, help="小檔案數量")
+    p_copy.add_argument("--small-kb", type=int, default=10, help="小檔案大小（KB）")
+    p_copy.add_argument("--large-count", type=int, default=2, help="大檔案數量")
+    p_copy.add_argument("--large-mb", type=int, default=500, help="大檔案大小（MB）")
+    p_copy.add_argument("--rounds", type=int, default=2, help="每種方式重複次數")
+    p_copy.add_argument("--dir", help="測試檔案放置的資料夾（決定量測哪個檔案系統），預設系統暫存資料夾")
+
+    p_list = sub.add_parser("pathlist", help="CopyOthers/DocToDocx 路徑清單讀取（PathList 與 openpyxl 比較）")
+    p_list.add_argument("--rows", type=int, nargs="+", default=[100_000, 500_000], help="清單列數")
+
+    p_ooxml = sub.add_parser("ooxml", help="VerifyDoc 的 DOCX 判斷（OoxmlSniff 與 zipfile 比較）")
+    p_ooxml.add_argument("--parts", type=int, nargs="+", default=[10, 1000, 5000], help="每個 DOCX 內含的圖片數")
+    p_ooxml.add_argument("--files", type=int, default=50, help="每種大小產生的 DOCX 數量")
+    p_ooxml.add_argument("--loops", type=int, default=20, help="整批重複判斷次數（檔案會在快取中，量測的是 CPU 成本）")
+
+    p_inv = sub.add_parser("inventory", help="整份清單留在記憶體時：十欄資料列與 InventoryStore 的峰值記憶體比較")
+    p_inv.add_argument("--files", type=int, default=1_000_000, help="測試樹檔案數，預設 1000000")
+    p_inv.add_argument("--dir", help="測試樹放置的資料夾（相同參數會沿用），預設系統暫存資料夾下的 pyscript_bench")
+    p_inv.add_argument("--depth", type=int, default=3, help="測試樹資料夾深度")
+    p_inv.add_argument("--fanout", type=int, default=8, help="測試樹每層子資料夾數")
+    p_inv.add_argument("--median-kb", type=float, default=0.1,
+                       help="檔案大小中位數（KB）；只量測清單，預設用極小檔案以節省磁碟空間")
+
+    p_suite = sub.add_parser("suite", help="以合成測試樹執行各工具，結果附加到 JSONL 結果檔")
+    p_suite.add_argument("--files", type=int, nargs="+", default=[10_000], help="測試樹檔案數（例：10000 100000 1000000）")
+    p_suite.add_argument("--cases", nargs="+", choices=SUITE_CASES, default=SUITE_CASES, help="要執行的案例，預設全部")
+    p_suite.add_argument("--dir", help="測試樹放置的資料夾（相同參數會沿用），預設系統暫存資料夾下的 pyscript_bench")
+    p_suite.add_argument("--results", default=DEFAULT_RESULTS, help=f"結果檔（JSONL，附加寫入），預設 {DEFAULT_RESULTS}")
+    p_suite.add_argument("--label", help="版本標籤（預設為 git commit，沒有時為執行時間）")
+    p_suite.add_argument("--rounds", type=int, default=1, help="每個案例重複次數（compare 取最快的一次）")
+    p_suite.add_argument("--copy-max", type=int, default=10_000, help="copy 案例最多複製的檔案數，預設 10000")
+    p_suite.add_argument("--depth", type=int, default=3, help="測試樹資料夾深度")
+    p_suite.add_argument("--fanout", type=int, default=8, help="測試樹每層子資料夾數")
+    p_suite.add_argument("--mix", default=None, help="檔案類型比例，見 SyntheticTree.py --mix")
+    p_suite.add_argument("--median-kb", type=float, default=32, help="檔案大小中位數（KB）")
+    p_suite.add_argument("--seed", type=int, default=1)
+
+    p_cmp = sub.add_parser("compare", help="比較結果檔中兩個版本的耗時與峰值記憶體")
+    p_cmp.add_argument("--results", default=DEFAULT_RESULTS, help=f"結果檔，預設 {DEFAULT_RESULTS}")
+    p_cmp.add_argument("--baseline", help="比較基準版本標籤（預設為目前版本的前一個）")
+    p_cmp.add_argument("--current", help="目前版本標籤（預設為結果檔中最後一個）")
+    p_cmp.add_argument("--threshold", type=float, default=10.0, help="視為退步的增加百分比，預設 10")
+
+    args = parser.parse_args()
+    if args.bench == "excel":
+        bench_excel(args.rows, args.skip_baseline)
+    elif args.bench == "columnar":
+        bench_columnar(args.rows)
+    elif args.bench == "walk":
+        bench_walk(args.depth, args.fanout, args.files, args.workers, args.root)
+    elif args.bench == "copy":
+        bench_copy(args.small_count, args.small_kb, args.large_count, args.large_mb, args.dir, args.rounds)
+    elif args.bench == "pathlist":
+        bench_pathlist(args.rows)
+    elif args.bench == "ooxml":
+        bench_ooxml(args.parts, args.files, args.loops)
+    elif args.bench == "inventory":
+        base = Path(args.dir).expanduser().resolve() if args.dir else None
+        bench_inventory(args.files, str(base) if base else None,
+                        dict(depth=args.depth, fanout=args.fanout, median_kb=args.median_kb, mix="junk=1"))
+    elif args.bench == "suite":
+        tree_opts = dict(depth=args.depth, fanout=args.fanout, median_kb=args.median_kb, seed=args.seed)
+        if args.mix:
+            tree_opts["mix"] = args.mix
+        base = Path(args.dir).expanduser().resolve() if args.dir else None
+        base_dir = base or Path(tempfile.gettempdir()) / "pyscript_bench"
+        base_dir.mkdir(parents=True, exist_ok=True)
+        bench_suite(args.files, args.cases, str(base_dir), args.results, args.label,
+                    args.rounds, args.copy_max, tree_opts)
+    elif args.bench == "compare":
+        if compare_results(args.results, args.baseline, args.current, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+找出內容完全相同的檔案（供 ListAllFilePath.py --hash 使用）。
+為了盡量少讀檔，分三階段篩選：
+  1. 依檔案大小分組，大小唯一的檔案不可能重複，不必讀取
+  2. 同大小的檔案只讀檔頭+檔尾各 sample 位元組做雜湊，不同者即排除
+     （檔案不大於 2*sample 時，此步驟已讀完整個檔案，即為完整雜湊）
+  3. 仍相同的才讀完整內容計算雜湊
+讀檔與雜湊在執行緒池中進行（hashlib 與檔案 I/O 都會釋放 GIL）。
+"""
+import hashlib
+import os
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+
+SAMPLE_SIZE = 64 * 1024
+READ_BUFFER = 1024 * 1024
+# 空檔案的雜湊（不必讀檔）
+EMPTY_DIGEST = hashlib.blake2b(b"", digest_size=16).hexdigest()
+
+
+def _new_hash():
+    return hashlib.blake2b(digest_size=16)
+
+
+def _hash_stream(f, h, buffer_size: int = READ_BUFFER) -> int:
+    """以固定大小的緩衝區讀到檔尾、逐段更新雜湊，回傳讀取位元組數（記憶體用量與檔案大小無關）。"""
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    total = 0
+    while True:
+        n = f.readinto(buf)
+        if not n:
+            break
+        h.update(view[:n])
+        total += n
+    return total
+
+
+def file_digest(path) -> Tuple[str, int]:
+    """以大緩衝區讀完整個檔案計算雜湊，回傳 (雜湊, 讀取位元組數)。"""
+    h = _new_hash()
+    with open(path, "rb", buffering=0) as f:
+        total = _hash_stream(f, h)
+    return h.hexdigest(), total
+
+
+class DuplicateFinder:
+    """
+    用法：
+        finder = DuplicateFinder(workers=8)
+        digests = finder.run([(path, size), ...])   # {path: 完整雜湊}，只含可能重複而被完整雜湊的檔案
+        finder.groups                              # [(size, digest, [path, ...]), ...] 重複群組
+    """
+
+    def __init__(self, workers: int = 8, sample_size: int = SAMPLE_SIZE):
+        self.workers = max(1, workers)
+        self.sample_size = sample_size
+        self.bytes_total = 0
+        self.bytes_read = 0
+        self.errors: Dict[str, str] = {}
+        self.groups: List[Tuple[int, str, List[str]]] = []
+
+    def _sample_digest(self, path: str, size: int) -> Tuple[str, bool, int]:
+        """回傳 (檔頭+檔尾雜湊, 是否已涵蓋整個檔案, 讀取位元組數)。"""
+        h = _new_hash()
+        with open(path, "rb", buffering=0) as f:
+            if size <= 2 * self.sample_size:
+                # 檔案在掃描後可能變大，仍以固定緩衝區讀取；小檔不必配置整個 READ_BUFFER
+                n = _hash_stream(f, h, min(READ_BUFFER, size + 1))
+                return h.hexdigest(), True, n
+            head = f.read(self.sample_size)
+            f.seek(-self.sample_size, os.SEEK_END)
+            tail = f.read(self.sample_size)
+        h.update(head)
+        h.update(tail)
+        return h.hexdigest(), False, len(head) + len(tail)
+
+    def _map(self, fn, items):
+        """
+        在執行緒池中對 items 執行 fn，依序產出 (item, 結果或 None)；讀檔失敗記錄在 errors。
+        最多同時排入 workers * 4 件（Executor.map 會一次建立所有 Future，百萬個檔案時佔用大量記憶體）。
+        """
+        def safe(item):
+            try:
+                return item, fn(*item)
+            except OSError as e:
+                self.errors[item[0]] = str(e)
+                return item, None
+
+        if self.workers == 1:
+            for item in items:
+                yield safe(item)
+            return
+        max_pending = self.workers * 4
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as ex:
+            for item in items:
+                pending.append(ex.submit(safe, item))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def run(self, files: Iterable[Tuple[str, int]]) -> Dict[str, str]:
+        by_size: Dict[int, List[str]] = defaultdict(list)
+        for path, size in files:
+            if size is None:
+                continue
+            by_size[size].append(path)
+            self.bytes_total += size
+
+        digests: Dict[str, str] = {}
+        full: List[Tuple[str, int]] = []
+        by_key: Dict[Tuple[int, str], List[str]] = defaultdict(list)
+
+        # 1. 大小相同才需要比較；空檔案全部相同
+        candidates = []
+        for size, paths in by_size.items():
+            if len(paths) < 2:
+                continue
+            if size == 0:
+                for p in paths:
+                    digests[p] = EMPTY_DIGEST
+                by_key[(0, EMPTY_DIGEST)].extend(paths)
+                continue
+            candidates.extend((p, size) for p in paths)
+
+        # 2. 檔頭+檔尾抽樣
+        sampled: Dict[Tuple[int, str], List[Tuple[str, bool]]] = defaultdict(list)
+        for (path, size), res in self._map(self._sample_digest, candidates):
+            if res is None:
+                continue
+            digest, complete, nread = res
+            self.bytes_read += nread
+            sampled[(size, digest)].append((path, complete))
+
+        for (size, digest), items in sampled.items():
+            if len(items) < 2:
+                continue
+            for path, complete in items:
+                if complete:
+                    digests[path] = digest
+                    by_key[(size, digest)].append(path)
+                else:
+                    full.append((path, size))
+
+        # 3. 抽樣仍相同者才讀完整內容
+        for (path, size), res in self._map(lambda p, s: file_digest(p), full):
+            if res is None:
+                continue
+            digest, nread = res
+            self.bytes_read += nread
+            digests[path] = digest
+            by_key[(size, digest)].append(path)
+
+        self.groups = sorted(
+            ((size, digest, sorted(paths)) for (size, digest), paths in by_key.items() if len(paths) > 1),
+            key=lambda g: -g[0] * (len(g[2]) - 1),
+        )
+        return digests
+
+    @property
+    def wasted_bytes(self) -> int:
+        """重複檔案多佔用的空間（每組保留一份）。"""
+        return sum(size * (len(paths) - 1) for size, _, paths in self.groups)
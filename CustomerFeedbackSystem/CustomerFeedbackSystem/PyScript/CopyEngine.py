@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+"""
+批次複製引擎（CopyOthers.py 使用）：
+  - 輸出資料夾只 scandir 一次，建立檔名索引；不重覆檔名直接由索引配發
+    （foo.txt -> foo (2).txt -> foo (3).txt ...，規則與 unique_target_path 相同），不再逐一 exists()
+  - 來源 stat 與複製都在執行緒池中進行，並限制同時複製中的總位元組數
+  - 可選：輸出資料夾已有大小與內容雜湊都相同的檔案時略過複製（比對在複製工作執行緒中進行，
+    檔名仍依清單順序先保留；略過時該檔名空出不用）
+  - 可選：複製記錄檔（CopyJournal），中斷後重跑可從上次停下的地方接續
+  - 預設以 FastCopy.fast_copy2 複製（reflink / copy_file_range / sendfile，結果同 copy2）
+檔名依清單順序配發、結果也依清單順序產出，與逐一複製時相同。
+"""
+import json
+import os
+import stat
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from ContentHash import file_digest
+from FastCopy import fast_copy2
+from Profiler import PROFILE
+
+DEFAULT_WORKERS = 8
+DEFAULT_INFLIGHT_BYTES = 256 * 1024 * 1024
+
+
+class CopyResult(NamedTuple):
+    src: Path
+    status: str  # copied / journaled / identical / missing / not-file / failed
+    dst: Optional[Path] = None
+    message: str = ""
+
+
+class NameIndex:
+    """輸出資料夾的檔名索引（不分大小寫比照 Windows），並依大小記錄既有檔案供比對內容。"""
+
+    def __init__(self, dst_dir: Path):
+        self.dst_dir = dst_dir
+        self._names = set()
+        self._next: Dict[str, int] = {}
+        # 目前輸出資料夾內檔案的大小（normcase 名稱 -> bytes）
+        self.sizes: Dict[str, int] = {}
+        # size -> [(路徑, 複製中的 Future 或 None)]
+        self._by_size: Dict[int, List[Tuple[Path, Optional[Future]]]] = defaultdict(list)
+        self._digests: Dict[Path, str] = {}
+        with os.scandir(dst_dir) as it:
+            for e in it:
+                self._names.add(os.path.normcase(e.name))
+                try:
+                    if e.is_file(follow_symlinks=False):
+                        size = e.stat(follow_symlinks=False).st_size
+                        self.sizes[os.path.normcase(e.name)] = size
+                        self._by_size[size].append((Path(e.path), None))
+                except OSError:
+                    continue
+
+    def unique_path(self, base_name: str, ext: str) -> Path:
+        name = f"{base_name}{ext}"
+        key = os.path.normcase(name)
+        if key not in self._names:
+            self._names.add(key)
+            return self.dst_dir / name
+        i = self._next.get(key, 2)
+        while True:
+            cand = f"{base_name} ({i}){ext}"
+            if os.path.normcase(cand) not in self._names:
+                break
+            i += 1
+        self._next[key] = i + 1
+        self._names.add(os.path.normcase(cand))
+        return self.dst_dir / cand
+
+    def reserve(self, name: str):
+        """保留檔名：之後 unique_path 不會配到（檔案目前可能不在輸出資料夾中）。"""
+        self._names.add(os.path.normcase(name))
+
+    def add(self, path: Path, size: int, pending: Optional[Future] = None):
+        self._names.add(os.path.normcase(path.name))
+        self._by_size[size].append((path, pending))
+
+    def candidates(self, size: int) -> List[Tuple[Path, Optional[Future]]]:
+        """目前已知、大小為 size 的檔案（規劃時取快照，之後才加入的檔案不影響這次比對）。"""
+        return list(self._by_size.get(size, ()))
+
+    def remember(self, path: Path, digest: str):
+        """記下剛複製完成的檔案雜湊（與來源相同），之後比對時不必再讀一次。"""
+        self._digests[path] = digest
+
+    def digest(self, path: Path, pending: Optional[Future] = None) -> Optional[str]:
+        if pending is not None:
+            # 等複製完成再讀；該來源未實際複製（內容相同略過或失敗）時檔案不存在或不完整
+            if pending.result().status != "copied":
+                return None
+        d = self._digests.get(path)
+        if d is None:
+            try:
+                d = self._digests[path] = file_digest(path)[0]
+            except OSError:
+                return None
+        return d
+
+    def find_identical(
+        self, src: Path, candidates: List[Tuple[Path, Optional[Future]]]
+    ) -> Tuple[Optional[Path], Optional[str]]:
+        """
+        回傳 (candidates 中與 src 內容相同的檔案, src 雜湊)；在複製工作執行緒中呼叫。
+        沒有候選時不讀取任何內容。
+        """
+        if not candidates:
+            return None, None
+        src_digest = file_digest(src)[0]
+        for path, pending in candidates:
+            if self.digest(path, pending) == src_digest:
+                return path, src_digest
+        return None, src_digest
+
+
+class ByteBudget:
+    """限制同時複製中的總位元組數；單一檔案超過上限時仍允許（但獨占）。"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.inflight = 0
+        self.cond = threading.Condition()
+
+    def acquire(self, n: int):
+        with self.cond:
+            while self.inflight > 0 and self.inflight + n > self.limit:
+                self.cond.wait()
+            self.inflight += n
+
+    def release(self, n: int):
+        with self.cond:
+            self.inflight -= n
+            self.cond.notify_all()
+
+
+def read_journal(path: Path) -> Dict[Tuple[str, int], dict]:
+    """讀取複製記錄檔，回傳 {(src, n): 最後一筆記錄}。"""
+    records: Dict[Tuple[str, int], dict] = {}
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # 中斷時最後一行可能不完整
+                records[(rec["src"], rec["n"])] = rec
+    return records
+
+
+class CopyJournal:
+    """
+    複製記錄檔（JSON Lines，只會附加寫入），每筆記錄：
+      {"event": "start"|"done"|"failed", "src": 來源, "n": 同一來源在清單中第幾次出現,
+       "size": 來源大小, "mtime_ns": 來源修改時間, "dst": 目的檔, "time": 記錄時間}
+    開始複製前先寫 start、完成後寫 done；重跑時：
+      - done 且來源大小/修改時間未變、目的檔大小相符 -> 略過
+      - 只有 start（複製到一半中斷）-> 沿用同一個目的檔名重新複製
+    每個 (src, n) 以最後一筆記錄為準，也可當作可比對的輸出清單（manifest）。
+    """
+
+    def __init__(self, path: Path, flush_every: int = 100):
+        self.path = path
+        self.records = read_journal(path)
+        self._f = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._flush_every = flush_every
+        self._pending = 0
+
+    def lookup(self, src: Path, n: int) -> Optional[dict]:
+        return self.records.get((str(src), n))
+
+    def write(self, event: str, src: Path, n: int, size: int, mtime_ns: int, dst: Path):
+        rec = {
+            "event": event, "src": str(src), "n": n, "size": size,
+            "mtime_ns": mtime_ns, "dst": str(dst), "time": time.time(),
+        }
+        line = json.dumps(rec, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._f.write(line)
+            self._pending += 1
+            if event == "start" or self._pending >= self._flush_every:
+                # start 必須先落地，才能在中斷後辨識出複製到一半的檔案
+                self._f.flush()
+                os.fsync(self._f.fileno())
+                self._pending = 0
+
+    def close(self):
+        with self._lock:
+            if self._f is not None:
+                self._f.flush()
+                os.fsync(self._f.fileno())
+                self._f.close()
+                self._f = None
+
+
+def load_manifest(journal_path: Path) -> Dict[str, str]:
+    """由複製記錄檔取得已完成的 來源 -> 目的檔 對照（同一來源多次出現時取最後一次）。"""
+    manifest: Dict[str, str] = {}
+    for (src, _), rec in sorted(read_journal(journal_path).items()):
+        if rec["event"] == "done":
+            manifest[src] = rec["dst"]
+    return manifest
+
+
+def _probe_stat(st: os.stat_result) -> Tuple[str, int, int]:
+    if not stat.S_ISREG(st.st_mode):
+        return "not-file", 0, 0
+    return "file", st.st_size, st.st_mtime_ns
+
+
+def _probe(src: Path) -> Tuple[str, int, int]:
+    """一次 stat 取得 (狀態, 大小, 修改時間 ns)：file / missing / not-file。"""
+    t = PROFILE.start()
+    try:
+        st = src.stat()
+    except OSError:
+        return "missing", 0, 0
+    finally:
+        PROFILE.stop("stat", t)
+    return _probe_stat(st)
+
+
+class CopyEngine:
+    """
+    用法：
+        engine = CopyEngine(out_dir, workers=8, skip_identical=True)
+        for r in engine.run(paths):
+            print(r.status, r.src, r.dst)
+    """
+
+    def __init__(
+        self,
+        out_dir: Path,
+        workers: int = DEFAULT_WORKERS,
+        max_inflight_bytes: int = DEFAULT_INFLIGHT_BYTES,
+        overwrite: bool = False,
+        skip_identical: bool = False,
+        copy_func=fast_copy2,
+        journal: Optional[CopyJournal] = None,
+    ):
+        self.out_dir = out_dir
+        self.workers = max(1, workers)
+        self.budget = ByteBudget(max_inflight_bytes)
+        self.overwrite = overwrite
+        self.skip_identical = skip_identical
+        self.copy_func = copy_func
+        with PROFILE.span("index"):
+            self.index = NameIndex(out_dir)
+        self._by_dst: Dict[str, Future] = {}
+        self.journal = journal
+        self._seen: Dict[str, int] = {}
+        if journal is not None:
+            # 記錄檔中的目的檔名保留給原來源（即使檔案已被刪除，稍後仍會以 redo 寫回），新來源不會配到
+            for rec in journal.records.values():
+                if rec["event"] != "failed":
+                    dst = Path(rec["dst"])
+                    if dst.parent == out_dir:
+                        self.index.reserve(dst.name)
+
+    def _copy(
+        self, src: Path, dst: Path, size: int, wait_for: Optional[Future], key,
+        candidates: Optional[List[Tuple[Path, Optional[Future]]]] = None,
+    ) -> CopyResult:
+        if wait_for is not None:
+            # 覆蓋模式下同一目的檔須依序寫入
+            wait_for.exception()
+        src_digest = None
+        if candidates:
+            # 內容比對在工作執行緒讀檔，主執行緒繼續依序配發檔名、送出後續的複製
+            t = PROFILE.start()
+            try:
+                same, src_digest = self.index.find_identical(src, candidates)
+            except OSError as e:
+                return CopyResult(src, "failed", dst, str(e))
+            finally:
+                PROFILE.stop("identical", t)
+            if same is not None:
+                return CopyResult(src, "identical", same)
+        t = PROFILE.start()
+        self.budget.acquire(size)
+        PROFILE.stop("budget-wait", t)
+        try:
+            if self.journal is not None:
+                t = PROFILE.start()
+                self.journal.write("start", src, *key, dst)
+                PROFILE.stop("journal", t)
+            t = PROFILE.start()
+            self.copy_func(src, dst)  # 與 copy2 相同，會連同時間戳等中繼資料
+            PROFILE.stop("copy", t, read=size, written=size)
+            if src_digest is not None:
+                self.index.remember(dst, src_digest)
+            if self.journal is not None:
+                t = PROFILE.start()
+                self.journal.write("done", src, *key, dst)
+                PROFILE.stop("journal", t)
+            return CopyResult(src, "copied", dst)
+        except Exception as e:
+            if self.journal is not None:
+                self.journal.write("failed", src, *key, dst)
+            return CopyResult(src, "failed", dst, str(e))
+        finally:
+            self.budget.release(size)
+
+    def _resume_target(self, src: Path, n: int, size: int, mtime_ns: int):
+        """
+        依記錄檔判斷：回傳 ("done", 目的檔) 表示已完成可略過；
+        ("redo", 目的檔) 表示上次中斷或來源已變更，沿用同一個目的檔重新複製；None 表示沒有記錄。
+        """
+        rec = self.journal.lookup(src, n) if self.journal is not None else None
+        if rec is None or rec["event"] == "failed":
+            return None
+        dst = Path(rec["dst"])
+        if dst.parent != self.out_dir:
+            return None
+        on_disk = self.index.sizes.get(os.path.normcase(dst.name))
+        if rec["event"] == "done" and rec["size"] == size and rec["mtime_ns"] == mtime_ns and on_disk == size:
+            return "done", dst
+        return "redo", dst
+
+    def _plan(self, src: Path, probe: Tuple[str, int], pool: ThreadPoolExecutor):
+        """在主執行緒依清單順序決定目的檔名，回傳 CopyResult 或複製中的 Future。"""
+        state, size, mtime_ns = probe
+        key_src = str(src)
+        n = self._seen[key_src] = self._seen.get(key_src, 0) + 1
+        if state != "file":
+            return CopyResult(src, state)
+        try:
+            resume = self._resume_target(src, n, size, mtime_ns)
+            if resume is not None and resume[0] == "done":
+                self.index.add(resume[1], size)
+                return CopyResult(src, "journaled", resume[1])
+
+            # 內容比對延到複製工作執行緒；這裡只取同大小檔案的快照（含之前已送出、複製中的檔案）
+            candidates = self.index.candidates(size) if resume is None and self.skip_identical else None
+
+            base, ext = src.stem, src.suffix
+            wait_for = None
+            if resume is not None:
+                dst = resume[1]
+                wait_for = self._by_dst.get(os.path.normcase(dst.name))
+            elif self.overwrite:
+                dst = self.out_dir / f"{base}{ext}"
+                wait_for = self._by_dst.get(os.path.normcase(dst.name))
+            else:
+                dst = self.index.unique_path(base, ext)
+        except Exception as e:
+            return CopyResult(src, "failed", None, str(e))
+
+        fut = pool.submit(self._copy, src, dst, size, wait_for, (n, size, mtime_ns), candidates)
+        self.index.add(dst, size, fut)
+        if self.overwrite or resume is not None:
+            self._by_dst[os.path.normcase(dst.name)] = fut
+        return fut
+
+    def run(
+        self, sources: Iterable[Path], known_stats: Optional[Dict[Path, os.stat_result]] = None
+    ) -> Iterator[CopyResult]:
+        """known_stats：已取得的來源 stat（例如清單預檢的結果），有的就不再 stat。"""
+        max_pending = self.workers * 8
+        probes: deque = deque()
+        results: deque = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as stat_pool, \
+                ThreadPoolExecutor(max_workers=self.workers) as copy_pool:
+
+            def drain(block: bool):
+                while results and (block or not isinstance(results[0], Future) or results[0].done()):
+                    r = results.popleft()
+                    yield r.result() if isinstance(r, Future) else r
+
+            def plan_one():
+                src, fut = probes.popleft()
+                results.append(self._plan(src, fut.result(), copy_pool))
+
+            for src in sources:
+                st = known_stats.get(src) if known_stats else None
+                if st is not None:
+                    fut = Future()
+                    fut.set_result(_probe_stat(st))
+                else:
+                    fut = stat_pool.submit(_probe, src)
+                probes.append((src, fut))
+                if len(probes) >= max_pending:
+                    plan_one()
+                yield from drain(False)
+                while len(results) >= max_pending:
+                    r = results.popleft()
+                    yield r.result() if isinstance(r, Future) else r
+            while probes:
+                plan_one()
+                yield from drain(False)
+            yield from drain(True)
@@ -1,66 +1,62 @@
-# 安裝套件：pip install openpyxl
+# 不需額外套件（清單可為 .xlsx/.xlsm、.csv 或每行一個路徑的 .txt）
 # 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\CopyOthers.py "C:\Users\peter\OneDrive\Desktop\剩下的.xlsx" -o "C:\Users\peter\OneDrive\Desktop\GMP文件庫(剩下的)" -s 1 -c A
 
 # -*- coding: utf-8 -*-
 import argparse
+from itertools import chain
 from pathlib import Path
-from typing import Iterable, Union
-from shutil import copy2
-from openpyxl import load_workbook
-from openpyxl.utils import column_index_from_string
+from typing import Union
 
-def read_paths_from_excel(
-    excel_path: Path,
-    sheet: Union[int, str] = 1,
-    col_letter: str = "A",
-    skip_header: bool = False,
-) -> Iterable[Path]:
-    """
-    從 Excel 指定工作表與欄位抓出每列完整檔案路徑。
-    會自動去除前後空白與引號；空白列略過。
-    """
-    wb = load_workbook(excel_path, read_only=True, data_only=True)
-    ws = wb.worksheets[sheet - 1] if isinstance(sheet, int) else wb[sheet]
+from CopyEngine import CopyEngine, CopyJournal, DEFAULT_WORKERS, DEFAULT_INFLIGHT_BYTES
+from FastCopy import COPY_BACKENDS
+from PathList import read_path_list
+from Preflight import DEFAULT_SCAN_WORKERS, preflight
+from Profiler import PROFILE, add_profile_arguments
+from Progress import Progress, add_progress_arguments
 
-    col_idx = column_index_from_string(col_letter.upper().strip())
-    for idx, row in enumerate(ws.iter_rows(min_col=col_idx, max_col=col_idx, values_only=True), start=1):
-        if skip_header and idx == 1:
-            continue
-        val = row[0]
-        if val is None:
-            continue
-        s = str(val).strip().strip('"').strip("'")
-        if not s:
-            continue
-        yield Path(s)
-
-def unique_target_path(dst_dir: Path, base_name: str, ext: str) -> Path:
-    """
-    產生不重覆的輸出路徑：foo.txt -> foo (2).txt -> foo (3).txt ...
-    """
-    p = dst_dir / f"{base_name}{ext}"
-    if not p.exists():
-        return p
-    i = 2
-    while True:
-        q = dst_dir / f"{base_name} ({i}){ext}"
-        if not q.exists():
-            return q
-        i += 1
+# 狀態列各結果的顯示名稱
+PROGRESS_LABELS = {
+    "copied": "已複製", "journaled": "依記錄略過", "identical": "內容相同", "missing": "不存在",
+    "not-file": "不是檔案", "failed": "失敗",
+}
 
 def main():
     parser = argparse.ArgumentParser(description="讀 Excel 路徑清單，將檔案複製到指定資料夾。")
-    parser.add_argument("excel", help="Excel 檔（.xlsx/.xlsm），指定欄位放完整檔案路徑")
+    parser.add_argument("excel", help="路徑清單：Excel 檔（.xlsx/.xlsm）或 CSV 的指定欄位，或每行一個路徑的文字檔")
     parser.add_argument("-o", "--outdir", required=True, help="輸出資料夾（會自動建立）")
     parser.add_argument("-s", "--sheet", default="1", help="工作表索引(從1起算) 或 名稱，預設 1")
     parser.add_argument("-c", "--column", default="A", help="路徑所在欄位字母，預設 A")
     parser.add_argument("--skip-header", action="store_true", help="若第1列為表頭請加入此旗標")
+    parser.add_argument("--encoding", default="utf-8-sig", help="CSV/文字清單的編碼，預設 utf-8-sig（Big5 請用 cp950）")
     parser.add_argument("--overwrite", action="store_true", help="若輸出已存在同名檔，直接覆蓋（預設改名避免覆蓋）")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"同時複製的執行緒數，預設 {DEFAULT_WORKERS}")
+    parser.add_argument("--max-inflight-mb", type=int, default=DEFAULT_INFLIGHT_BYTES // (1024 * 1024),
+                        help="同時複製中的檔案總大小上限（MB），預設 %(default)s")
+    parser.add_argument("--skip-identical", action="store_true",
+                        help="輸出資料夾已有大小與內容相同的檔案時略過（不另存 foo (2).ext）")
+    parser.add_argument("--journal",
+                        help="複製記錄檔路徑（預設為輸出資料夾旁的 <資料夾名>.copy_journal.jsonl）；"
+                             "重跑時依記錄接續，已完成的不再複製")
+    parser.add_argument("--no-journal", action="store_true", help="不使用複製記錄檔")
+    parser.add_argument("--no-preflight", action="store_true",
+                        help="不做清單預檢，邊讀清單邊複製（逐檔檢查是否存在）")
+    parser.add_argument("--scan-workers", type=int, default=DEFAULT_SCAN_WORKERS,
+                        help=f"預檢時同時掃描的資料夾數，預設 {DEFAULT_SCAN_WORKERS}")
+    parser.add_argument("--keep-duplicates", action="store_true",
+                        help="清單重複列出的路徑仍逐次複製（另存 foo (2).ext），預設只複製一次")
+    parser.add_argument("--preflight-report", help="預檢報告 CSV 輸出路徑（不存在/不是檔案/重複列出）")
+    parser.add_argument("--copy-backend", choices=sorted(COPY_BACKENDS), default="auto",
+                        help="auto：核心內複製（reflink/copy_file_range/sendfile，不支援時自動退回）；"
+                             "copy2：原本的 shutil.copy2。預設 auto")
+    add_profile_arguments(parser)
+    add_progress_arguments(parser)
     args = parser.parse_args()
+    PROFILE.configure(args, "CopyOthers")
 
     excel_path = Path(args.excel).expanduser().resolve()
     if not excel_path.exists():
-        raise SystemExit(f"找不到 Excel 檔：{excel_path}")
+        raise SystemExit(f"找不到清單檔：{excel_path}")
 
     out_dir = Path(args.outdir).expanduser().resolve()
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -68,48 +64,111 @@ def main():
     # 解析 sheet 參數（數字或名稱）
     sheet_arg: Union[int, str] = int(args.sheet) if args.sheet.isdigit() else args.sheet
 
-    paths = list(read_paths_from_excel(excel_path, sheet=sheet_arg, col_letter=args.column, skip_header=args.skip_header))
-    if not paths:
-        raise SystemExit("Excel 指定欄位沒有可用的路徑資料。")
+    # 邊讀清單邊複製，不必等整份清單讀完
+    paths = PROFILE.iter("list", read_path_list(
+        excel_path, sheet=sheet_arg, col_letter=args.column, skip_header=args.skip_header, encoding=args.encoding
+    ))
+    first = next(paths, None)
+    if first is None:
+        raise SystemExit("清單指定欄位沒有可用的路徑資料。")
+    paths = chain([first], paths)
 
-    total = len(paths)
+    total = 0
     copied = 0
     skipped = 0
     failed = 0
-
-    for i, src in enumerate(paths, start=1):
-        print(f"[{i}/{total}] 處理：{src}")
-        try:
-            if not src.exists():
-                print("  -> 路徑不存在，略過。")
+    duplicated = 0
+    known_stats = None
+    report = None
+    if not args.no_preflight:
+        # 每個資料夾 scandir 一次，先排除不存在/資料夾/重複的列
+        with PROFILE.span("preflight"):
+            report = preflight(paths, workers=args.scan_workers, keep_duplicates=args.keep_duplicates)
+        report.print_summary()
+        if args.preflight_report:
+            report.write_csv(Path(args.preflight_report).expanduser().resolve())
+            print(f"預檢報告：{args.preflight_report}")
+        total = report.total
+        failed += len(report.missing)
+        skipped += len(report.directories)
+        if not args.keep_duplicates:
+            duplicated = sum(n - 1 for n in report.duplicates.values())
+        paths = [p for p, _ in report.valid]
+        known_stats = report.stats
+
+    identical = 0
+    journaled = 0
+    journal = None
+    if not args.no_journal:
+        journal_path = (
+            Path(args.journal).expanduser().resolve()
+            if args.journal
+            else out_dir.with_name(f"{out_dir.name}.copy_journal.jsonl")
+        )
+        journal = CopyJournal(journal_path)
+        if journal.records:
+            print(f"使用複製記錄接續：{journal_path}（{len(journal.records)} 筆記錄）")
+
+    engine = CopyEngine(
+        out_dir,
+        workers=args.workers,
+        max_inflight_bytes=args.max_inflight_mb * 1024 * 1024,
+        overwrite=args.overwrite,
+        skip_identical=args.skip_identical,
+        journal=journal,
+        copy_func=COPY_BACKENDS[args.copy_backend],
+    )
+
+    progress = Progress.from_args(args, PROGRESS_LABELS)
+    if report is not None:
+        for p in report.missing:
+            progress.log("missing", p)
+        for p in report.directories:
+            progress.log("not-file", p)
+    progress.start(None if known_stats is None else len(paths))
+    try:
+        for i, r in enumerate(PROFILE.iter("wait", engine.run(paths, known_stats)), start=1):
+            if known_stats is None:
+                total = i
+                progress.say(f"[{i}] 處理：{r.src}")
+            else:
+                progress.say(f"[{i}/{len(paths)}] 處理：{r.src}")
+            if r.status == "copied":
+                progress.event("copied", r.src, f"  -> 已複製到：{r.dst}", dst=r.dst)
+                copied += 1
+            elif r.status == "journaled":
+                progress.event("journaled", r.src, f"  -> 上次已複製完成，略過：{r.dst}", dst=r.dst)
+                journaled += 1
+            elif r.status == "identical":
+                progress.event("identical", r.src, f"  -> 輸出資料夾已有相同內容的檔案，略過：{r.dst}", dst=r.dst)
+                identical += 1
+            elif r.status == "missing":
+                progress.event("missing", r.src, "  -> 路徑不存在，略過。")
                 failed += 1
-                continue
-            if not src.is_file():
-                print("  -> 不是檔案（可能是資料夾），略過。")
+            elif r.status == "not-file":
+                progress.event("not-file", r.src, "  -> 不是檔案（可能是資料夾），略過。")
                 skipped += 1
-                continue
-
-            base = src.stem
-            ext = src.suffix
-            if args.overwrite:
-                dst = out_dir / f"{base}{ext}"
             else:
-                dst = unique_target_path(out_dir, base, ext)
-
-            copy2(src, dst)  # copy2 會連同時間戳等中繼資料
-            print(f"  -> 已複製到：{dst}")
-            copied += 1
-
-        except Exception as e:
-            print(f"  -> 複製失敗：{e}")
-            failed += 1
+                progress.event("failed", r.src, f"  -> 複製失敗：{r.message}", message=r.message)
+                failed += 1
+    finally:
+        progress.close()
 
     print("\n==== 結果 ====")
     print(f"總計：{total}")
     print(f"成功複製：{copied}")
     print(f"略過：{skipped}")
+    if duplicated:
+        print(f"重複列出略過：{duplicated}")
+    if args.skip_identical:
+        print(f"內容相同略過：{identical}")
+    if journal is not None:
+        print(f"依記錄略過（已完成）：{journaled}")
     print(f"失敗：{failed}")
     print(f"輸出資料夾：{out_dir}")
+    if journal is not None:
+        journal.close()
+        print(f"複製記錄：{journal.path}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+串流寫出 CSV（UTF-8 BOM）：每產生一列就寫出，並定期 flush 到磁碟，
+記憶體用量與資料列數無關；中斷後可用 resume 模式從最後寫入的列接續。
+供 VerifyDoc.py、ListAllFilePath.py 共用。
+"""
+import csv
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+CSV_ENCODING = "utf-8-sig"
+
+
+class CsvStreamWriter:
+    """
+    用法：
+        w = CsvStreamWriter(out_path, fieldnames, resume=True)
+        for row in w.existing_rows():   # resume 時先取回已寫出的列
+            ...
+        w.open()
+        w.writerow({...})
+        w.close()
+    """
+
+    def __init__(self, path: Path, fieldnames: List[str], resume: bool = False, flush_every: int = 1000):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.resume = resume and path.exists() and path.stat().st_size > 0
+        self.flush_every = flush_every
+        self.written = 0
+        self._f = None
+        self._writer: Optional[csv.DictWriter] = None
+
+    def _drop_partial_tail(self):
+        """中斷時最後一列可能只寫了一半：截掉最後一個換行之後的內容。"""
+        with open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            pos = size
+            chunk = 64 * 1024
+            while pos > 0:
+                step = min(chunk, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step)
+                idx = buf.rfind(b"\n")
+                if idx >= 0:
+                    f.truncate(pos + idx + 1)
+                    return
+            f.truncate(0)
+
+    def existing_rows(self) -> Iterator[Dict[str, str]]:
+        """resume 模式下逐列讀回既有的資料（不含表頭）；非 resume 時不產出任何列。"""
+        if not self.resume:
+            return
+        self._drop_partial_tail()
+        if self.path.stat().st_size == 0:
+            self.resume = False
+            return
+        with open(self.path, "r", newline="", encoding=CSV_ENCODING) as f:
+            reader = csv.DictReader(f)
+            if reader.fieldnames != self.fieldnames:
+                raise SystemExit(f"無法接續：既有 CSV 欄位與本次輸出不同：{self.path}")
+            for row in reader:
+                yield row
+
+    def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.resume:
+            self._f = open(self.path, "a", newline="", encoding=CSV_ENCODING)
+            self._writer = csv.DictWriter(self._f, fieldnames=self.fieldnames)
+        else:
+            self._f = open(self.path, "w", newline="", encoding=CSV_ENCODING)
+            self._writer = csv.DictWriter(self._f, fieldnames=self.fieldnames)
+            self._writer.writeheader()
+        return self
+
+    def writerow(self, row: Dict):
+        self._writer.writerow(row)
+        self.written += 1
+        if self.written % self.flush_every == 0:
+            self.flush()
+
+    def flush(self):
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self):
+        if self._f is not None:
+            self.flush()
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,430 @@
+# 不需額外套件（.parquet/.feather 清單需 pyarrow）
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\DiffInventory.py "C:\Users\peter\OneDrive\Desktop\原始輸出清單.xlsx" "C:\Users\peter\OneDrive\Desktop\合併後輸出清單.xlsx" -o "C:\Users\peter\OneDrive\Desktop\清單差異.csv"
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\DiffInventory.py "D:\原始輸出清單.csv" "D:\合併後輸出清單.csv" -o "D:\清單差異.csv" --content
+#       之後可直接以 CopyOthers.py 補回缺少的檔案：CopyOthers.py "D:\清單差異_removed.txt" -o "D:\補回的檔案"
+
+# -*- coding: utf-8 -*-
+"""
+比較兩份 ListAllFilePath.py（或 ScanLibrary.py）產生的清單（.xlsx / .csv / .parquet / .feather），找出：
+  removed   只在前一份（依 RelativePath）且找不到改名對象
+  added     只在後一份且找不到改名對象
+  modified  RelativePath 相同但大小或修改時間不同
+  renamed   RelativePath 不同但內容相同：預設依 (大小, 修改時間) 一對一配對；
+            --content 時讀取兩邊的實際檔案以內容雜湊確認（同大小多個候選也能正確配對）
+只比較檔案列（資料夾列略過）；Windows 上 RelativePath 不分大小寫。
+
+兩份清單各只讀一次，以 grace hash join 比對：依 RelativePath 的雜湊分到 PARTITIONS 個暫存檔，
+再逐一分割區載入前一份、比對後一份；改名偵測同樣依 (大小, 修改時間) 分割區配對。
+暫存檔為純文字紀錄（欄位以 \0、紀錄以 \x1e 分隔，路徑不會含這兩個字元），比 pickle 快數倍。
+記憶體用量約為清單筆數 / PARTITIONS，兩百萬筆的清單也只需要數萬筆的字典。
+--workers > 1 時兩份清單在兩個子行程同時讀取分割，各分割區也分給多個子行程比對（分割區彼此獨立）。
+.xlsx 清單不經 openpyxl，直接以 expat 串流讀取（仍比 .csv/.parquet 慢，大型清單建議輸出為 .csv 或 .parquet）。
+
+輸出：
+  -o 差異報告 CSV（每列一筆差異，順序依分割區而非路徑排序）
+  同資料夾下 <報告名>_<狀態>.txt 路徑清單（每行一個完整路徑，可直接給 CopyOthers.py）：
+    removed / modified / renamed 為前一份的 FullPath，added 為後一份的 FullPath
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+import zlib
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from ArrowStream import ARROW_SUFFIXES, PARQUET_SUFFIXES
+from ContentHash import file_digest
+from CsvStream import CsvStreamWriter
+from PathList import CSV_SUFFIXES, EXCEL_SUFFIXES, iter_xlsx_rows
+from Profiler import PROFILE, add_profile_arguments
+
+PARTITIONS = 64
+SPOOL_BUFFER = 256 * 1024
+_FS = "\0"
+_RS = "\x1e"
+DEFAULT_HASH_WORKERS = 8
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+REPORT_FIELDS = [
+    "Status", "RelativePath", "NewRelativePath", "Size(bytes)", "NewSize(bytes)",
+    "ModifiedTime", "NewModifiedTime", "FullPath", "NewFullPath",
+]
+STATUSES = ("removed", "added", "modified", "renamed")
+
+# 清單中的一個檔案；各欄皆為字串，mtime 統一為 "YYYY-mm-dd HH:MM:SS"（不同輸出格式可互相比較）
+Entry = namedtuple("Entry", ["rel", "size", "mtime", "full"])
+
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_COLUMNS = ("Type", "Size(bytes)", "ModifiedTime", "RelativePath", "FullPath")
+
+
+def _time_text(val) -> str:
+    """把各格式的修改時間轉為到秒的字串（與 ListAllFilePath 的 CSV 輸出相同，捨去秒以下）。"""
+    if val is None or val == "":
+        return ""
+    if isinstance(val, datetime):
+        return val.strftime(_TIME_FORMAT)
+    if isinstance(val, (int, float)):
+        # Excel 序號：浮點誤差可能讓整秒變成 x.999999，先四捨五入到毫秒再捨去
+        dt = _EXCEL_EPOCH + timedelta(milliseconds=round(val * 86_400_000))
+        return dt.strftime(_TIME_FORMAT)
+    return str(val)
+
+
+def _text(val) -> str:
+    return "" if val is None else str(val)
+
+
+def _iter_table(path: Path) -> Iterator[list]:
+    """依副檔名逐列讀出清單（第一列為表頭；.xlsx 多個工作表時每個都有表頭列）。"""
+    suffix = path.suffix.lower()
+    if suffix in EXCEL_SUFFIXES:
+        yield from iter_xlsx_rows(path)
+    elif suffix in CSV_SUFFIXES:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            yield from csv.reader(f)
+    elif suffix in PARQUET_SUFFIXES + ARROW_SUFFIXES:
+        import pyarrow.parquet as pq
+        import pyarrow.ipc as ipc
+
+        yield list(_COLUMNS)
+        if suffix in PARQUET_SUFFIXES:
+            batches = pq.ParquetFile(path).iter_batches(columns=list(_COLUMNS))
+        else:
+            reader = ipc.open_file(path)
+            batches = (reader.get_batch(i).select(list(_COLUMNS)) for i in range(reader.num_record_batches))
+        for batch in batches:
+            yield from zip(*(batch.column(i).to_pylist() for i in range(len(_COLUMNS))))
+    else:
+        raise SystemExit(f"不支援的清單格式：{path}（請用 .xlsx / .csv / .parquet / .feather）")
+
+
+def read_inventory(path: Path) -> Iterator[tuple]:
+    """逐筆產出清單中的檔案列 (RelativePath, Size, ModifiedTime, FullPath)，皆為字串。"""
+    rows = _iter_table(path)
+    header = next(rows, None)
+    if header is None:
+        return
+    try:
+        i_type, i_size, i_mtime, i_rel, i_full = (header.index(c) for c in _COLUMNS)
+    except ValueError:
+        raise SystemExit(f"{path} 不是 ListAllFilePath 的清單（缺少 {', '.join(_COLUMNS)} 欄位）")
+    width = max(i_type, i_size, i_mtime, i_rel, i_full) + 1
+    if path.suffix.lower() in CSV_SUFFIXES:
+        # CSV 的值已是字串，修改時間也已是相同格式
+        for row in rows:
+            if len(row) >= width and row[i_type] == "File":
+                yield row[i_rel], row[i_size], row[i_mtime], row[i_full]
+        return
+    for row in rows:
+        if len(row) < width:
+            row = list(row) + [None] * (width - len(row))
+        if row[i_type] != "File":
+            continue  # 資料夾列、其他工作表的表頭列
+        yield _text(row[i_rel]), _text(row[i_size]), _time_text(row[i_mtime]), _text(row[i_full])
+
+
+def _read_records(f) -> List[List[str]]:
+    f.seek(0)
+    data = f.read()
+    return [r.split(_FS) for r in data.split(_RS)[:-1]]
+
+
+class _Spool:
+    """把紀錄（字串欄位）依鍵的雜湊分到多個匿名暫存檔，之後逐一分割區整批讀回（只在同一行程內使用）。"""
+
+    def __init__(self, parts: int = PARTITIONS):
+        self.parts = parts
+        self.files = [
+            tempfile.TemporaryFile("w+", encoding="utf-8", newline="", buffering=SPOOL_BUFFER)
+            for _ in range(parts)
+        ]
+
+    def add(self, key, fields):
+        self.files[hash(key) % self.parts].write(_FS.join(fields) + _RS)
+
+    def read(self, p: int) -> List[List[str]]:
+        with self.files[p] as f:
+            return _read_records(f)
+
+    def close(self):
+        for f in self.files:
+            f.close()
+
+
+# Windows 路徑不分大小寫；其他平台 RelativePath 直接當鍵
+_rel_key = os.path.normcase if os.name == "nt" else None
+
+
+def _part_file(work: Path, side: str, p: int) -> Path:
+    return work / f"{side}_{p:02d}.part"
+
+
+def spool_inventory(path: Path, work: Path, side: str) -> int:
+    """
+    讀取清單，依 RelativePath 分到 work 下的 PARTITIONS 個暫存檔，回傳檔案數。
+    分割用 crc32 而非 hash()：兩份清單可能在不同子行程分割，字串 hash() 每個行程都不同。
+    """
+    key = _rel_key
+    files = [
+        open(_part_file(work, side, p), "w", encoding="utf-8", newline="", buffering=SPOOL_BUFFER)
+        for p in range(PARTITIONS)
+    ]
+    n = 0
+    try:
+        for e in read_inventory(path):
+            k = key(e[0]) if key else e[0]
+            files[zlib.crc32(k.encode("utf-8", "surrogatepass")) % PARTITIONS].write(_FS.join(e) + _RS)
+            n += 1
+    finally:
+        for f in files:
+            f.close()
+    return n
+
+
+def join_partition(work: Path, p: int, ignore_mtime: bool):
+    """
+    比對一個分割區（可在子行程執行），回傳
+    (modified 的 [(前, 後)], 相同筆數, 只在前一份的紀錄, 只在後一份的紀錄)。
+    """
+    key = _rel_key
+    with open(_part_file(work, "before", p), "r", encoding="utf-8", newline="") as f:
+        left = _read_records(f)
+    with open(_part_file(work, "after", p), "r", encoding="utf-8", newline="") as f:
+        right = _read_records(f)
+    if key:
+        old = {}
+        for e in left:
+            old.setdefault(key(e[0]), e)
+    else:
+        # 同一路徑重複列出時保留第一筆
+        old = {e[0]: e for e in reversed(left)}
+    del left
+    modified = []
+    only_new = []
+    unchanged = 0
+    for e in right:
+        prev = old.pop(key(e[0]) if key else e[0], None)
+        if prev is None:
+            only_new.append(e)
+        elif prev[1] != e[1] or (not ignore_mtime and prev[2] != e[2]):
+            modified.append((prev, e))
+        else:
+            unchanged += 1
+    return modified, unchanged, list(old.values()), only_new
+
+
+class InventoryDiff:
+    """
+    用法：
+        diff = InventoryDiff(ignore_mtime=False, content=False, workers=4)
+        for status, old, new in diff.run(before_path, after_path):
+            ...                     # old / new 為 Entry 或 None
+        diff.counts                 # {"removed": n, ...}
+    """
+
+    def __init__(self, ignore_mtime: bool = False, content: bool = False,
+                 workers: int = DEFAULT_WORKERS, hash_workers: int = DEFAULT_HASH_WORKERS):
+        self.ignore_mtime = ignore_mtime
+        self.content = content
+        self.workers = max(1, workers)
+        self.hash_workers = max(1, hash_workers)
+        self.counts: Dict[str, int] = {s: 0 for s in STATUSES}
+        self.unchanged = 0
+        self.before = 0
+        self.after = 0
+        self.hash_errors: Dict[str, str] = {}
+
+    def _content_key(self, e: List[str]) -> str:
+        return e[1] if self.ignore_mtime else e[1] + _FS + e[2]
+
+    def _emit(self, status: str, old: Optional[List[str]], new: Optional[List[str]]):
+        self.counts[status] += 1
+        return status, (Entry(*old) if old else None), (Entry(*new) if new else None)
+
+    def run(self, before: Path, after: Path):
+        """比對兩份清單檔，產出 (狀態, 前一份 Entry 或 None, 後一份 Entry 或 None)。"""
+        with tempfile.TemporaryDirectory(prefix="inventory_diff_") as tmp:
+            work = Path(tmp)
+            if self.workers > 1:
+                with ProcessPoolExecutor(max_workers=self.workers) as ex:
+                    with PROFILE.span("read"):
+                        fb = ex.submit(spool_inventory, before, work, "before")
+                        fa = ex.submit(spool_inventory, after, work, "after")
+                        self.before, self.after = fb.result(), fa.result()
+                    joined = ex.map(join_partition, repeat(work), range(PARTITIONS), repeat(self.ignore_mtime))
+                    yield from self._merge(joined)
+            else:
+                with PROFILE.span("read"):
+                    self.before = spool_inventory(before, work, "before")
+                    self.after = spool_inventory(after, work, "after")
+                joined = map(join_partition, repeat(work), range(PARTITIONS), repeat(self.ignore_mtime))
+                yield from self._merge(joined)
+
+    def _merge(self, joined):
+        """收集各分割區的比對結果；未配對的紀錄依內容鍵重新分割後配對改名。"""
+        gone = _Spool()
+        new = _Spool()
+        try:
+            # 第一階段：同 RelativePath 比對，其餘依內容鍵分到第二組暫存檔
+            for modified, unchanged, only_old, only_new in PROFILE.iter("join", joined):
+                self.unchanged += unchanged
+                for e in only_old:
+                    gone.add(self._content_key(e), e)
+                for e in only_new:
+                    new.add(self._content_key(e), e)
+                for old, e in modified:
+                    yield self._emit("modified", old, e)
+
+            # 第二階段：同內容鍵的 removed / added 配對為 renamed
+            for p in range(PARTITIONS):
+                t = PROFILE.start()
+                groups = defaultdict(lambda: ([], []))
+                for e in gone.read(p):
+                    groups[self._content_key(e)][0].append(e)
+                for e in new.read(p):
+                    groups[self._content_key(e)][1].append(e)
+                results = []
+                for olds, news in groups.values():
+                    results.extend(self._pair(olds, news))
+                PROFILE.stop("rename", t)
+                yield from results
+        finally:
+            gone.close()
+            new.close()
+
+    def _pair(self, olds: List[List[str]], news: List[List[str]]):
+        if not olds or not news:
+            return [self._emit("removed", e, None) for e in olds] + [self._emit("added", None, e) for e in news]
+        if not self.content:
+            # 只有一對一時才視為改名，避免同大小同時間的多個檔案被任意配對
+            if len(olds) == 1 and len(news) == 1:
+                return [self._emit("renamed", olds[0], news[0])]
+            return [self._emit("removed", e, None) for e in olds] + [self._emit("added", None, e) for e in news]
+
+        digests = self._digests([e[3] for e in olds + news])
+        by_digest = defaultdict(deque)
+        for e in news:
+            by_digest[digests.get(e[3])].append(e)
+        out = []
+        for e in olds:
+            d = digests.get(e[3])
+            match = by_digest.get(d) if d is not None else None
+            if match:
+                out.append(self._emit("renamed", e, match.popleft()))
+            else:
+                out.append(self._emit("removed", e, None))
+        for d, rest in by_digest.items():
+            out.extend(self._emit("added", None, e) for e in rest)
+        return out
+
+    def _digests(self, paths: List[str]) -> Dict[str, str]:
+        """計算候選檔案的內容雜湊；讀取失敗的檔案不參與配對。"""
+        def safe(path):
+            try:
+                return path, file_digest(path)
+            except OSError as e:
+                return path, e
+
+        out = {}
+        t = PROFILE.start()
+        read = 0
+        with ThreadPoolExecutor(max_workers=min(self.hash_workers, len(paths))) as ex:
+            for path, res in ex.map(safe, paths):
+                if isinstance(res, Exception):
+                    self.hash_errors[path] = str(res)
+                else:
+                    out[path] = res[0]
+                    read += res[1]
+        PROFILE.stop("hash", t, read=read)
+        return out
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="比較兩份檔案清單（ListAllFilePath 輸出），列出新增、移除、修改、改名的檔案"
+    )
+    parser.add_argument("before", help="前一份清單（例：原始輸出清單.xlsx）")
+    parser.add_argument("after", help="後一份清單（例：合併後輸出清單.xlsx）")
+    parser.add_argument("-o", "--output", default=None,
+                        help="差異報告 CSV 路徑（預設為目前資料夾下的 inventory_diff_<時間>.csv）；"
+                             "同資料夾另輸出 <報告名>_<狀態>.txt 路徑清單")
+    parser.add_argument("--ignore-mtime", action="store_true",
+                        help="不比較修改時間：只依大小判斷修改，改名也只依大小配對（建議搭配 --content）")
+    parser.add_argument("--content", action="store_true",
+                        help="讀取候選檔案的實際內容（FullPath）計算雜湊來確認改名；兩份清單的檔案都必須可讀取")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"讀取與比對的子行程數（1 為不使用子行程），預設 {DEFAULT_WORKERS}")
+    parser.add_argument("--hash-workers", type=int, default=DEFAULT_HASH_WORKERS,
+                        help=f"--content 計算雜湊的執行緒數，預設 {DEFAULT_HASH_WORKERS}")
+    parser.add_argument("--no-lists", action="store_true", help="不輸出各狀態的路徑清單 .txt")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    PROFILE.configure(args, "DiffInventory")
+
+    before = Path(args.before).expanduser().resolve()
+    after = Path(args.after).expanduser().resolve()
+    for p in (before, after):
+        if not p.exists():
+            raise SystemExit(f"找不到清單檔：{p}")
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_path = (
+        Path(args.output).expanduser().resolve()
+        if args.output
+        else Path.cwd() / f"inventory_diff_{timestamp}.csv"
+    )
+
+    lists = {}
+    if not args.no_lists:
+        lists = {
+            s: open(out_path.with_name(f"{out_path.stem}_{s}.txt"), "w", encoding="utf-8")
+            for s in STATUSES
+        }
+
+    t0 = time.perf_counter()
+    diff = InventoryDiff(args.ignore_mtime, args.content, args.workers, args.hash_workers)
+    try:
+        with CsvStreamWriter(out_path, REPORT_FIELDS).open() as w:
+            for status, old, new in diff.run(before, after):
+                t = PROFILE.start()
+                w.writerow({
+                    "Status": status,
+                    "RelativePath": old.rel if old else "",
+                    "NewRelativePath": new.rel if new else "",
+                    "Size(bytes)": old.size if old else "",
+                    "NewSize(bytes)": new.size if new else "",
+                    "ModifiedTime": old.mtime if old else "",
+                    "NewModifiedTime": new.mtime if new else "",
+                    "FullPath": old.full if old else "",
+                    "NewFullPath": new.full if new else "",
+                })
+                if lists:
+                    lists[status].write((old or new).full + "\n")
+                PROFILE.stop("write", t)
+    finally:
+        for f in lists.values():
+            f.close()
+
+    print(f"前一份：{diff.before} 個檔案，後一份：{diff.after} 個檔案（{time.perf_counter() - t0:.1f} 秒）")
+    print(f"相同：{diff.unchanged}")
+    print(f"移除：{diff.counts['removed']}")
+    print(f"新增：{diff.counts['added']}")
+    print(f"修改：{diff.counts['modified']}")
+    print(f"改名：{diff.counts['renamed']}")
+    for path, err in diff.hash_errors.items():
+        print(f"  無法讀取：{path}（{err}）")
+    print(f"差異報告：{out_path}")
+    if lists:
+        print(f"路徑清單：{out_path.with_name(out_path.stem)}_<removed|added|modified|renamed>.txt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+共用的目錄掃描器（ListAllFilePath.py、VerifyDoc.py 使用）。
+  - 可同時掃描多個根目錄
+  - include / exclude 萬用字元篩選在掃描當下套用（被排除的資料夾不會再往下掃）
+  - max_depth 限制深度
+  - workers > 1 時以多執行緒同時 scandir（工作竊取：各執行緒先處理自己找到的子資料夾，
+    閒置時從其他執行緒的佇列另一端拿較上層的資料夾），適合延遲高的網路磁碟
+產出 (root, entry, is_dir, depth)。entry 為 os.DirEntry，其 stat() 結果會被快取，
+呼叫端重複呼叫 entry.stat(follow_symlinks=False) 不會再次存取檔案系統。
+workers=1 時的順序與原本的單執行緒 stack 掃描完全相同；workers > 1 時順序不固定。
+"""
+import os
+import queue
+import threading
+from collections import deque
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+WalkItem = Tuple[Path, os.DirEntry, bool, int]
+
+
+class WalkFilter:
+    """
+    篩選規則：樣式含 "/" 時比對相對路徑（posix 格式），否則只比對名稱。
+    exclude 同時套用在資料夾與檔案；include 只套用在檔案（資料夾仍會往下掃）。
+    """
+
+    def __init__(self, include: Optional[Sequence[str]] = None, exclude: Optional[Sequence[str]] = None):
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+
+    def __bool__(self):
+        return bool(self.include or self.exclude)
+
+    @staticmethod
+    def _match(patterns: List[str], name: str, rel: str) -> bool:
+        return any(fnmatch(rel if "/" in p else name, p) for p in patterns)
+
+    def excluded(self, name: str, rel: str) -> bool:
+        return bool(self.exclude) and self._match(self.exclude, name, rel)
+
+    def included(self, name: str, rel: str) -> bool:
+        return not self.include or self._match(self.include, name, rel)
+
+
+def _scan_dir(
+    root: Path, cur: str, rel_dir: str, depth: int, flt: WalkFilter, max_depth: Optional[int], prestat: bool
+) -> Tuple[List[WalkItem], List[Tuple[str, str, int]]]:
+    """掃描單一資料夾，回傳 (要產出的項目, 要再往下掃的子資料夾)。"""
+    items: List[WalkItem] = []
+    subdirs: List[Tuple[str, str, int]] = []
+    try:
+        with os.scandir(cur) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    # 權限不足/破損捷徑
+                    continue
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if flt:
+                    if flt.excluded(entry.name, rel):
+                        continue
+                    if not is_dir and not flt.included(entry.name, rel):
+                        continue
+                if prestat:
+                    # 在掃描執行緒先取得 stat（DirEntry 會快取），呼叫端不必再等網路往返
+                    try:
+                        entry.stat(follow_symlinks=False)
+                    except OSError:
+                        pass
+                items.append((root, entry, is_dir, depth))
+                if is_dir and (max_depth is None or depth < max_depth):
+                    subdirs.append((entry.path, rel, depth + 1))
+    except OSError:
+        # 略過無權限、瞬間被移除或讀取失敗的目錄（網路磁碟斷線時的 EIO、WinError 53/64 等）；
+        # 已讀到的項目照常產出
+        pass
+    return items, subdirs
+
+
+def _walk_serial(
+    roots: Sequence[Path], flt: WalkFilter, max_depth: Optional[int], prestat: bool
+) -> Iterator[WalkItem]:
+    for root in roots:
+        stack = [(str(root), "", 1)]
+        while stack:
+            cur, rel_dir, depth = stack.pop()
+            items, subdirs = _scan_dir(root, cur, rel_dir, depth, flt, max_depth, prestat)
+            yield from items
+            stack.extend(subdirs)
+
+
+class _StealingPool:
+    """每個執行緒一個 deque：自己從右端取（深度優先），竊取時從別人的左端取。"""
+
+    def __init__(
+        self, roots: Sequence[Path], workers: int, flt: WalkFilter, max_depth: Optional[int], prestat: bool
+    ):
+        self.flt = flt
+        self.max_depth = max_depth
+        self.prestat = prestat
+        self.workers = workers
+        self.deques = [deque() for _ in range(workers)]
+        for i, root in enumerate(roots):
+            self.deques[i % workers].append((root, str(root), "", 1))
+        self.pending = len(roots)
+        self.cond = threading.Condition()
+        self.out: "queue.Queue[Optional[List[WalkItem]]]" = queue.Queue(maxsize=workers * 64)
+        self.stopped = False
+        self.error: Optional[BaseException] = None
+
+    def _take(self, me: int):
+        own = self.deques[me]
+        if own:
+            return own.pop()
+        for k in range(1, self.workers):
+            other = self.deques[(me + k) % self.workers]
+            if other:
+                return other.popleft()
+        return None
+
+    def _worker(self, me: int):
+        try:
+            self._work(me)
+        except BaseException as e:
+            # 非預期的例外：停止掃描並交給呼叫端（run）重新拋出，避免其他執行緒永遠等待
+            with self.cond:
+                if self.error is None:
+                    self.error = e
+                self.stopped = True
+                self.cond.notify_all()
+
+    def _work(self, me: int):
+        while True:
+            with self.cond:
+                if self.stopped:
+                    return
+                task = self._take(me)
+                while task is None:
+                    if self.pending == 0 or self.stopped:
+                        self.cond.notify_all()
+                        return
+                    self.cond.wait()
+                    task = self._take(me)
+            root, cur, rel_dir, depth = task
+            subdirs = []
+            try:
+                items, subdirs = _scan_dir(root, cur, rel_dir, depth, self.flt, self.max_depth, self.prestat)
+                if items:
+                    self.out.put(items)
+            finally:
+                # 不論成功與否都要結算這個工作，否則 pending 永遠不會歸零
+                with self.cond:
+                    own = self.deques[me]
+                    for sub in subdirs:
+                        own.append((root, *sub))
+                    self.pending += len(subdirs) - 1
+                    self.cond.notify_all()
+
+    def run(self) -> Iterator[WalkItem]:
+        threads = [threading.Thread(target=self._worker, args=(i,), daemon=True) for i in range(self.workers)]
+        for t in threads:
+            t.start()
+
+        def closer():
+            for t in threads:
+                t.join()
+            self.out.put(None)
+
+        threading.Thread(target=closer, daemon=True).start()
+        try:
+            while True:
+                batch = self.out.get()
+                if batch is None:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                yield from batch
+        finally:
+            # 呼叫端提前結束時讓執行緒退出
+            with self.cond:
+                self.stopped = True
+                self.cond.notify_all()
+            # 清空輸出佇列，讓卡在 put 的執行緒能結束
+            while any(t.is_alive() for t in threads):
+                try:
+                    self.out.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+
+
+def _outermost(roots: List[Path]) -> List[Path]:
+    """根目錄互相包含時只保留最上層的，避免同一檔案產出兩次（保持原本順序）。"""
+    kept: List[Path] = []
+    for r in roots:
+        if r in kept or any(k in r.parents for k in roots):
+            continue
+        kept.append(r)
+    return kept
+
+
+def walk(
+    roots: Iterable[Path],
+    workers: int = 1,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    max_depth: Optional[int] = None,
+    prestat: bool = False,
+) -> Iterator[WalkItem]:
+    """
+    掃描一或多個根目錄，產出 (root, entry, is_dir, depth)；depth 從 1 起算（根目錄下第一層）。
+    prestat=True 時在掃描執行緒先做 stat，多執行緒時 stat 的延遲也能平行化。
+    """
+    roots = _outermost([Path(r) for r in roots])
+    flt = WalkFilter(include, exclude)
+    if workers <= 1:
+        yield from _walk_serial(roots, flt, max_depth, prestat)
+    else:
+        yield from _StealingPool(roots, workers, flt, max_depth, prestat).run()
+
+
+def safe_stat(entry: os.DirEntry):
+    try:
+        return entry.stat(follow_symlinks=False)
+    except (PermissionError, FileNotFoundError, OSError):
+        return None
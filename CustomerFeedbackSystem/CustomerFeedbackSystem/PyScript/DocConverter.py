@@ -0,0 +1,598 @@
+# 安裝套件（依轉檔方式）：com 需 pip install pywin32 與 Microsoft Word；soffice 需安裝 LibreOffice
+
+# -*- coding: utf-8 -*-
+"""
+.doc -> .docx/.docm 轉檔後端與多行程轉檔池（DocToDocx.py 使用）。
+  - ConverterBackend：轉檔後端介面（start / convert / close）
+      com      Word COM（Windows + Word），每個工作行程以 DispatchEx 啟動自己的 Word（輪流啟動，才能正確記下各自的 WINWORD.EXE）
+      soffice  LibreOffice headless（soffice --convert-to），每個工作行程使用獨立的使用者設定檔，可在 Linux 執行
+  - ConverterPool：多個工作行程，各自擁有一個後端實例；每份文件有逾時上限，
+    逾時或工作行程當掉時強制結束該行程（連同 Word/soffice），回報失敗後重新啟動一個新的工作行程，
+    不會因為一份卡住的文件拖住整批；可指定 verify，轉檔完成後在同一個工作行程立即檢查輸出
+    （檔案仍在快取中），失敗可自動重試；digest=True 時工作行程順便計算來源的內容雜湊（增量紀錄用）
+  - ConvertManifest：增量轉檔紀錄（來源 -> 輸出），重跑時只轉新增或變更的來源
+"""
+import csv
+import io
+import os
+import shutil
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from contextlib import contextmanager
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from ContentHash import file_digest
+from Profiler import PROFILE
+
+DEFAULT_WORKERS = 2
+DEFAULT_TIMEOUT = 300.0
+
+# 工作行程啟動 Word 時輪流持有的具名 mutex（同一個登入工作階段內有效）
+WORD_STARTUP_MUTEX = "Local\\DocConverter.WordStartup"
+WORD_STARTUP_WAIT = 120.0
+
+# Word SaveAs2 FileFormat：docx=12、docm=13
+WD_FORMAT_DOCX = 12
+WD_FORMAT_DOCM = 13
+
+
+class ConverterError(Exception):
+    pass
+
+
+class ConvertResult(NamedTuple):
+    key: int
+    src: Path
+    dst: Path
+    ok: bool
+    message: str
+    seconds: float = 0.0
+    kind: str = ""  # 有 verify 時為輸出檔的 VerifyDoc 判定
+    note: str = ""
+    attempts: int = 1
+    digest: str = ""  # digest=True 時為來源的內容雜湊（讀取失敗時為空字串）
+
+
+def convert_doc_to_docx(
+    word_app,
+    src_path: Path,
+    dst_path: Path,
+    macro_enabled: bool = False,
+) -> Tuple[bool, str]:
+    """
+    使用 Word COM 將 .doc 轉 .docx（或 .docm），回傳 (成功與否, 訊息)。
+    """
+    try:
+        file_format = WD_FORMAT_DOCM if macro_enabled else WD_FORMAT_DOCX
+
+        doc = word_app.Documents.Open(str(src_path))
+        # SaveAs2 可避免舊版相容問題
+        doc.SaveAs2(str(dst_path), FileFormat=file_format)
+        doc.Close(SaveChanges=False)
+        return True, "OK"
+    except Exception as e:
+        try:
+            # 若文件有開啟，確保關閉
+            doc.Close(SaveChanges=False)  # type: ignore
+        except Exception:
+            pass
+        return False, f"ERROR: {e}"
+
+
+class ConverterBackend:
+    """
+    轉檔後端介面。每個工作行程建立一個實例：start() -> 多次 convert() -> close()。
+    helper_pids() 回傳後端另外啟動、不屬於工作行程子行程的程式（例如 DCOM 啟動的 WINWORD.EXE），
+    逾時時會一併結束。
+    """
+
+    name = ""
+
+    def __init__(self, worker_id: int = 0, **options):
+        self.worker_id = worker_id
+        self.options = options
+
+    def start(self):
+        pass
+
+    def convert(self, src: Path, dst: Path, macro_enabled: bool = False):
+        """轉檔失敗時丟出例外。"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def helper_pids(self) -> List[int]:
+        return []
+
+
+def _word_pids() -> Set[int]:
+    """目前所有 WINWORD.EXE 的 PID（有 psutil 時用 psutil，否則用 tasklist）。"""
+    try:
+        import psutil
+        return {p.pid for p in psutil.process_iter(["name"]) if (p.info["name"] or "").lower() == "winword.exe"}
+    except ImportError:
+        pass
+    try:
+        out = subprocess.run(
+            ["tasklist", "/FI", "IMAGENAME eq WINWORD.EXE", "/FO", "CSV", "/NH"],
+            capture_output=True, text=True, timeout=30,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return set()
+    return {int(row[1]) for row in csv.reader(io.StringIO(out)) if len(row) > 1 and row[1].isdigit()}
+
+
+@contextmanager
+def _word_startup_lock():
+    """
+    同一時間只讓一個工作行程啟動 Word（跨行程的具名 mutex）。
+    helper PID 是啟動前後 WINWORD.EXE 的差集，多個工作行程同時啟動時差集會混到別人的 Word，
+    逾時結束時就會誤殺其他工作行程的 Word。
+    """
+    import win32event
+    handle = win32event.CreateMutex(None, False, WORD_STARTUP_MUTEX)
+    try:
+        rc = win32event.WaitForSingleObject(handle, int(WORD_STARTUP_WAIT * 1000))
+        if rc == win32event.WAIT_TIMEOUT:
+            raise ConverterError(f"等待其他工作行程啟動 Word 逾時（超過 {WORD_STARTUP_WAIT:g} 秒）")
+        # WAIT_ABANDONED：前一個持有者在啟動途中被結束，mutex 仍交給這個行程
+        try:
+            yield
+        finally:
+            win32event.ReleaseMutex(handle)
+    finally:
+        handle.Close()
+
+
+class ComBackend(ConverterBackend):
+    """Word COM。只有 Windows + 已安裝 Word 才可用。"""
+
+    name = "com"
+
+    def start(self):
+        try:
+            import pythoncom
+            import win32com.client as win32
+        except ImportError as e:
+            raise ConverterError("com 轉檔需要 pywin32：pip install pywin32") from e
+        pythoncom.CoInitialize()
+        with _word_startup_lock():
+            before = _word_pids()
+            try:
+                # DispatchEx：每個工作行程各自一個 Word，不共用同一個實例
+                self.word = win32.DispatchEx("Word.Application")
+            except Exception as e:
+                raise ConverterError(
+                    "無法啟動 Microsoft Word。請確認本機已安裝 Office/Word，且 Python/Office 位元數相容（建議皆為 64 位）。"
+                ) from e
+            self._pids = sorted(_word_pids() - before)
+        self.word.Visible = False
+        # 0 = wdAlertsNone
+        try:
+            self.word.DisplayAlerts = 0
+        except Exception:
+            pass
+
+    def convert(self, src: Path, dst: Path, macro_enabled: bool = False):
+        ok, msg = convert_doc_to_docx(self.word, src, dst, macro_enabled=macro_enabled)
+        if not ok:
+            raise ConverterError(msg)
+
+    def close(self):
+        try:
+            self.word.Quit()
+        except Exception:
+            pass
+        try:
+            import pythoncom
+            pythoncom.CoUninitialize()
+        except Exception:
+            pass
+
+    def helper_pids(self) -> List[int]:
+        return self._pids
+
+
+def find_soffice() -> Optional[str]:
+    for name in ("soffice", "libreoffice"):
+        found = shutil.which(name)
+        if found:
+            return found
+    if os.name == "nt":
+        for base in (os.environ.get("ProgramFiles"), os.environ.get("ProgramFiles(x86)")):
+            if base:
+                cand = Path(base) / "LibreOffice" / "program" / "soffice.exe"
+                if cand.exists():
+                    return str(cand)
+    return None
+
+
+class SofficeBackend(ConverterBackend):
+    """
+    LibreOffice headless：soffice --convert-to docx。
+    每個工作行程使用自己的使用者設定檔（-env:UserInstallation），多個 soffice 才能同時執行。
+    選項：soffice=執行檔路徑
+    """
+
+    name = "soffice"
+    FILTERS = {
+        False: ("docx", "MS Word 2007 XML"),
+        True: ("docm", "MS Word 2007 XML VBA"),
+    }
+
+    def start(self):
+        self.binary = self.options.get("soffice") or find_soffice()
+        if not self.binary:
+            raise ConverterError("找不到 LibreOffice（soffice），請安裝或以 --soffice 指定執行檔路徑")
+        self.workdir = Path(tempfile.mkdtemp(prefix=f"soffice_w{self.worker_id}_"))
+        self.profile = self.workdir / "profile"
+        self.outdir = self.workdir / "out"
+        self.outdir.mkdir()
+
+    def convert(self, src: Path, dst: Path, macro_enabled: bool = False):
+        ext, filter_name = self.FILTERS[macro_enabled]
+        cmd = [
+            self.binary,
+            f"-env:UserInstallation={self.profile.as_uri()}",
+            "--headless", "--norestore", "--nologo", "--nodefault", "--nolockcheck",
+            "--convert-to", f"{ext}:{filter_name}",
+            "--outdir", str(self.outdir),
+            str(src),
+        ]
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        produced = self.outdir / f"{src.stem}.{ext}"
+        if not produced.exists():
+            detail = (proc.stderr or proc.stdout).decode(errors="replace").strip()
+            raise ConverterError(f"soffice 未產生輸出（結束碼 {proc.returncode}）：{detail}")
+        shutil.move(str(produced), str(dst))
+
+    def close(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+BACKENDS = {
+    ComBackend.name: ComBackend,
+    SofficeBackend.name: SofficeBackend,
+}
+
+
+def default_backend() -> str:
+    return "com" if sys.platform == "win32" else "soffice"
+
+
+def _worker_main(backend_cls, options: dict, worker_id: int, conn, verify, digest: bool = False):
+    if os.name == "posix":
+        # 自成一個行程群組，逾時時可連同 soffice 子行程一起結束
+        os.setsid()
+    backend = backend_cls(worker_id=worker_id, **options)
+    try:
+        backend.start()
+    except Exception as e:
+        conn.send(("fatal", str(e)))
+        return
+    conn.send(("ready", backend.helper_pids()))
+    try:
+        while True:
+            task = conn.recv()
+            if task is None:
+                break
+            key, src, dst, macro_enabled = task
+            t0 = time.perf_counter()
+            kind = note = src_digest = ""
+            verify_secs = 0.0
+            try:
+                backend.convert(Path(src), Path(dst), macro_enabled)
+                ok, msg = True, "OK"
+            except Exception as e:
+                ok, msg = False, f"ERROR: {e}"
+            if ok and verify is not None:
+                # 剛寫完的輸出仍在快取中，立即檢查是否真的是 DOCX/DOCM
+                t1 = time.perf_counter()
+                ok, kind, note = verify(Path(dst), macro_enabled)
+                verify_secs = time.perf_counter() - t1
+                if not ok:
+                    msg = f"ERROR: 輸出驗證失敗：{kind} {note}".rstrip()
+            if ok and digest:
+                # 來源剛被轉檔程式讀過，在工作行程計算雜湊，主行程不必再讀一次
+                try:
+                    src_digest = file_digest(src)[0]
+                except OSError:
+                    pass
+            conn.send(("done", (key, ok, msg, time.perf_counter() - t0, kind, note, verify_secs, src_digest)))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        backend.close()
+
+
+def _kill_tree(proc: Process, helper_pids: Iterable[int]):
+    """結束工作行程與其子行程（soffice）以及後端另外啟動的程式（WINWORD.EXE）。"""
+    if os.name == "posix":
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    else:
+        try:
+            import psutil
+            for child in psutil.Process(proc.pid).children(recursive=True):
+                child.kill()
+        except Exception:
+            pass
+    for pid in helper_pids:
+        try:
+            os.kill(pid, signal.SIGTERM)  # Windows 上為 TerminateProcess
+        except OSError:
+            pass
+    proc.kill()
+    proc.join(10)
+
+
+class _Worker:
+    def __init__(self, worker_id: int, backend_cls, options: dict, verify, digest: bool = False):
+        self.worker_id = worker_id
+        self.conn, child = Pipe()
+        self.proc = Process(
+            target=_worker_main, args=(backend_cls, options, worker_id, child, verify, digest), daemon=True
+        )
+        self.proc.start()
+        child.close()
+        self.spawned = time.monotonic()
+        self.ready = False
+        self.helper_pids: List[int] = []
+        self.task: Optional[tuple] = None
+        self.started = 0.0
+
+
+class ConverterPool:
+    """
+    用法：
+        pool = ConverterPool(SofficeBackend, workers=4, timeout=300)
+        for r in pool.run((i, src, dst, macro_enabled) for ...):
+            print(r.key, r.ok, r.message)
+    結果依完成順序產出（以 key 對應原本的項目）。
+    verify(dst, macro_enabled) -> (是否通過, kind, note) 須為可 pickle 的模組層級函式。
+    retries > 0 時，轉檔失敗、驗證失敗、逾時或程序當掉的文件會重新排入，最多再試 retries 次。
+    digest=True 時成功的結果附上來源的內容雜湊（ConvertResult.digest，供 ConvertManifest.record 使用）。
+    """
+
+    def __init__(
+        self,
+        backend_cls,
+        options: Optional[dict] = None,
+        workers: int = DEFAULT_WORKERS,
+        timeout: float = DEFAULT_TIMEOUT,
+        poll: float = 0.5,
+        verify: Optional[Callable[[Path, bool], Tuple[bool, str, str]]] = None,
+        retries: int = 0,
+        digest: bool = False,
+    ):
+        self.backend_cls = backend_cls
+        self.options = options or {}
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.poll = poll
+        self.verify = verify
+        self.retries = max(0, retries)
+        self.digest = digest
+        self.restarts = 0
+        self.retried = 0
+        self._attempts: Dict[int, int] = {}
+        self._retry: deque = deque()
+
+    def _spawn(self, worker_id: int) -> _Worker:
+        return _Worker(worker_id, self.backend_cls, self.options, self.verify, self.digest)
+
+    @staticmethod
+    def _profile(task: tuple, convert_secs: float, verify_secs: float):
+        """--profile：轉檔與驗證耗時由工作行程回報，讀寫量以來源與輸出檔大小計。"""
+        _, src, dst, _ = task
+        sizes = []
+        for p in (src, dst):
+            try:
+                sizes.append(os.path.getsize(p))
+            except OSError:
+                sizes.append(0)
+        PROFILE.record("convert", convert_secs, read=sizes[0], written=sizes[1])
+        if verify_secs:
+            PROFILE.record("verify", verify_secs)
+
+    def _result(
+        self, task: tuple, ok: bool, msg: str, secs: float, kind: str = "", note: str = "", digest: str = ""
+    ) -> Optional[ConvertResult]:
+        """失敗且尚可重試時重新排入並回傳 None。"""
+        key, src, dst, _ = task
+        n = self._attempts[key] = self._attempts.get(key, 0) + 1
+        if not ok and n <= self.retries:
+            self.retried += 1
+            self._retry.append(task)
+            return None
+        del self._attempts[key]
+        return ConvertResult(key, Path(src), Path(dst), ok, msg, secs, kind, note, n, digest)
+
+    def run(self, tasks: Iterable[Tuple[int, Path, Path, bool]]) -> Iterator[ConvertResult]:
+        it = iter(tasks)
+        exhausted = False
+        workers: List[_Worker] = [self._spawn(i) for i in range(self.workers)]
+        try:
+            while True:
+                for w in workers:
+                    if not w.ready or w.task is not None:
+                        continue
+                    if self._retry:
+                        w.task = self._retry.popleft()
+                    elif not exhausted:
+                        task = next(it, None)
+                        if task is None:
+                            exhausted = True
+                            continue
+                        key, src, dst, macro_enabled = task
+                        w.task = (key, str(src), str(dst), macro_enabled)
+                    else:
+                        continue
+                    w.started = time.monotonic()
+                    w.conn.send(w.task)
+                if exhausted and not self._retry and all(w.task is None for w in workers):
+                    return
+
+                by_conn = {w.conn: w for w in workers}
+                for conn in wait(list(by_conn), timeout=self.poll):
+                    w = by_conn[conn]
+                    try:
+                        kind, payload = conn.recv()
+                    except (EOFError, OSError):
+                        continue  # 行程已結束，下面的存活檢查會處理
+                    if kind == "ready":
+                        w.ready = True
+                        w.helper_pids = payload
+                    elif kind == "fatal":
+                        raise ConverterError(f"轉檔程式無法啟動：{payload}")
+                    elif kind == "done":
+                        key, ok, msg, secs, out_kind, note, verify_secs, digest = payload
+                        task, w.task = w.task, None
+                        if PROFILE.enabled:
+                            self._profile(task, secs - verify_secs, verify_secs)
+                        r = self._result(task, ok, msg, secs, out_kind, note, digest)
+                        if r is not None:
+                            yield r
+
+                now = time.monotonic()
+                for i, w in enumerate(workers):
+                    # 只判斷一次：行程可能在兩次 is_alive() 之間結束，處理中的文件會被當成閒置而遺失
+                    alive = w.proc.is_alive()
+                    if w.task is not None and now - w.started > self.timeout:
+                        reason = f"ERROR: 逾時（超過 {self.timeout:g} 秒），已結束並重新啟動轉檔程序"
+                    elif w.task is not None and not alive:
+                        reason = f"ERROR: 轉檔程序異常結束（結束碼 {w.proc.exitcode}），已重新啟動"
+                    elif not w.ready and now - w.spawned > self.timeout:
+                        raise ConverterError(f"轉檔程式啟動逾時（超過 {self.timeout:g} 秒）")
+                    elif not w.ready and not alive:
+                        raise ConverterError(f"轉檔程式啟動失敗（結束碼 {w.proc.exitcode}）")
+                    elif not alive:
+                        # 閒置中結束：直接補一個新的工作行程
+                        workers[i] = self._spawn(w.worker_id)
+                        self.restarts += 1
+                        continue
+                    else:
+                        continue
+                    task = w.task
+                    PROFILE.record("convert-lost", now - w.started)
+                    _kill_tree(w.proc, w.helper_pids)
+                    self.restarts += 1
+                    workers[i] = self._spawn(w.worker_id)
+                    r = self._result(task, False, reason, now - w.started)
+                    if r is not None:
+                        yield r
+        finally:
+            for w in workers:
+                try:
+                    w.conn.send(None)
+                except (OSError, ValueError):
+                    pass
+            deadline = time.monotonic() + 30
+            for w in workers:
+                w.proc.join(max(0.0, deadline - time.monotonic()))
+                if w.proc.is_alive():
+                    _kill_tree(w.proc, w.helper_pids)
+
+
+class ConvertManifest:
+    """
+    以 SQLite 保存增量轉檔紀錄：來源 (path, size, mtime_ns, 內容雜湊) -> 輸出 (path, size, mtime_ns)。
+    check() 判斷來源是否需要重新轉檔：
+      valid    來源與輸出都和紀錄相符，略過
+      replace  來源已變更或輸出不見/被改過，沿用同一個輸出檔名重新轉檔（轉完再原子性取代）
+      new      沒有紀錄（或輸出格式不同），配發新的輸出檔名
+    來源只有修改時間變了、大小相同時，比對內容雜湊，內容沒變就只更新紀錄不重轉。
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS outputs ("
+            "src TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT, "
+            "dst TEXT, dst_size INTEGER, dst_mtime_ns INTEGER, converted_at REAL)"
+        )
+        self.conn.commit()
+        self.entries: Dict[str, tuple] = {
+            row[0]: row[1:] for row in self.conn.execute(
+                "SELECT src, size, mtime_ns, hash, dst, dst_size, dst_mtime_ns FROM outputs"
+            )
+        }
+        self._dirty = 0
+
+    @staticmethod
+    def _key(src: Path) -> str:
+        return os.path.normcase(str(src))
+
+    def outputs(self) -> List[Path]:
+        """紀錄中所有的輸出檔（配發新檔名時須避開）。"""
+        return [Path(e[3]) for e in self.entries.values()]
+
+    def check(self, src: Path, st: os.stat_result, target_ext: str) -> Tuple[str, Optional[Path]]:
+        row = self.entries.get(self._key(src))
+        if row is None:
+            return "new", None
+        size, mtime_ns, digest, dst, dst_size, dst_mtime_ns = row
+        dst = Path(dst)
+        if dst.suffix.lower() != target_ext:
+            return "new", None
+        try:
+            dst_st = dst.stat()
+        except OSError:
+            return "replace", dst
+        out_ok = dst_st.st_size == dst_size and dst_st.st_mtime_ns == dst_mtime_ns
+
+        if size == st.st_size and mtime_ns == st.st_mtime_ns:
+            src_same = True
+        elif size == st.st_size and digest:
+            # 只有修改時間不同（例如重新複製過），內容相同就不必重轉
+            try:
+                src_same = file_digest(src)[0] == digest
+            except OSError:
+                src_same = False
+            if src_same:
+                self._put(src, st, digest, dst, dst_size, dst_mtime_ns)
+        else:
+            src_same = False
+        return ("valid" if src_same and out_ok else "replace"), dst
+
+    def record(self, src: Path, st: os.stat_result, dst: Path, digest: str):
+        """轉檔成功後記錄；digest 為工作行程算好的來源內容雜湊（ConvertResult.digest），這裡不再讀取來源。"""
+        try:
+            dst_st = dst.stat()
+        except OSError:
+            return
+        self._put(src, st, digest, dst, dst_st.st_size, dst_st.st_mtime_ns)
+
+    def _put(self, src: Path, st, digest: str, dst: Path, dst_size: int, dst_mtime_ns: int):
+        key = self._key(src)
+        self.entries[key] = (st.st_size, st.st_mtime_ns, digest, str(dst), dst_size, dst_mtime_ns)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, st.st_size, st.st_mtime_ns, digest, str(dst), dst_size, dst_mtime_ns, time.time()),
+        )
+        self._dirty += 1
+        if self._dirty >= 100:
+            # 定期提交，執行中斷時已完成的轉檔不會遺失
+            self.conn.commit()
+            self._dirty = 0
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def partial_path(dst: Path) -> Path:
+    """重新轉檔時的暫存輸出（foo.docx -> foo.partial.docx），成功後再以 os.replace 取代原檔。"""
+    return dst.with_name(f"{dst.stem}.partial{dst.suffix}")
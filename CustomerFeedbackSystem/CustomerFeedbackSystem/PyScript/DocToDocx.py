@@ -1,105 +1,57 @@
-# 安裝套件：pip install openpyxl pywin32
+# 安裝套件：pip install pywin32（--backend com，需 Word）；Linux 請安裝 LibreOffice（--backend soffice）
 # 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\DocToDocx.py "C:\Users\peter\OneDrive\Desktop\待轉換清單.xlsx" -o "C:\Users\peter\OneDrive\Desktop\GMP文件庫(轉換doc後)" -s 1 -c A
 
 
 # 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\DocToDocx.py "C:\Users\peter\OneDrive\Desktop\重新轉docx.xlsx" -o "C:\Users\peter\OneDrive\Desktop\GMP文件庫(轉換doc後)" -s 1 -c A
+# 用法：python3 DocToDocx.py /data/待轉換清單.xlsx -o /data/GMP文件庫(轉換doc後) --backend soffice --workers 4 --timeout 300
 
 
 # -*- coding: utf-8 -*-
 import argparse
 import os
+from itertools import chain
 from pathlib import Path
-from typing import Iterable, Union, Tuple
-from openpyxl import load_workbook
-from openpyxl.utils import column_index_from_string
-
-# 只有 Windows + 已安裝 Word 才可用
-try:
-    import win32com.client as win32
-    from win32com.client import constants
-except Exception as e:
-    # 延後到執行轉檔時再提示也行，但這裡先提醒
-    pass
-
-
-def read_paths_from_excel(
-    excel_path: Path,
-    sheet: Union[int, str] = 1,
-    col_letter: str = "A",
-    skip_header: bool = False,  # 可選：若第1列是標題可略過
-):
-    """
-    從 Excel 指定工作表與欄位抓出每一列的完整檔案路徑字串，轉為 Path。
-    空白列、None、自動略過；去除前後空白與引號。
-    """
-    wb = load_workbook(excel_path, read_only=True, data_only=True)
-    ws = wb.worksheets[sheet - 1] if isinstance(sheet, int) else wb[sheet]
-
-    col_letter = col_letter.upper().strip()
-    col_idx = column_index_from_string(col_letter)
-
-    for idx, row in enumerate(
-        ws.iter_rows(min_col=col_idx, max_col=col_idx, values_only=True), start=1
-    ):
-        if skip_header and idx == 1:
-            continue
-        val = row[0]
-        if val is None:
-            continue
-        s = str(val).strip().strip('"').strip("'")
-        if not s:
-            continue
-        yield Path(s)
-
-
-
-def unique_target_path(dst_dir: Path, base_name: str, ext: str) -> Path:
-    """
-    產生不重覆的輸出路徑：若 foo.docx 已存在，就變成 foo (2).docx、foo (3).docx ...
-    """
-    p = dst_dir / f"{base_name}{ext}"
-    if not p.exists():
-        return p
+from shutil import copy2
+from typing import Union
+
+from CopyEngine import NameIndex
+from CsvStream import CsvStreamWriter
+from DocConverter import (
+    BACKENDS, DEFAULT_TIMEOUT, DEFAULT_WORKERS, ConvertManifest, ConverterError, ConverterPool,
+    default_backend, partial_path,
+)
+from PathList import read_path_list
+from Preflight import DEFAULT_SCAN_WORKERS, preflight
+from Profiler import PROFILE, add_profile_arguments
+from Progress import Progress, add_progress_arguments
+from VerifyDoc import verify_converted
+
+# 綜合結果報告（--report）的欄位
+REPORT_FIELDS = ["Source", "Output", "Status", "Kind", "Note", "Attempts", "Seconds", "Message"]
+# 狀態列各結果的顯示名稱
+PROGRESS_LABELS = {
+    "converted": "已轉檔", "up-to-date": "輸出仍有效", "copied": "已複製", "skipped": "略過",
+    "missing": "不存在", "quarantined": "已隔離", "failed": "失敗",
+}
+
+
+def quarantine(path: Path, q_dir: Path) -> Path:
+    """把驗證/轉檔失敗的輸出移到隔離資料夾（同名時加上 (2)、(3) ...），回傳新路徑。"""
+    q_dir.mkdir(parents=True, exist_ok=True)
+    target = q_dir / path.name
     i = 2
-    while True:
-        q = dst_dir / f"{base_name} ({i}){ext}"
-        if not q.exists():
-            return q
+    while target.exists():
+        target = q_dir / f"{path.stem} ({i}){path.suffix}"
         i += 1
-
-
-def convert_doc_to_docx(
-    word_app,
-    src_path: Path,
-    dst_path: Path,
-    macro_enabled: bool = False,
-) -> Tuple[bool, str]:
-    """
-    使用 Word COM 將 .doc 轉 .docx（或 .docm），回傳 (成功與否, 訊息)。
-    """
-    try:
-        # 常數：docx=12, docm=13
-        file_format = 13 if macro_enabled else 12
-
-        doc = word_app.Documents.Open(str(src_path))
-        # SaveAs2 可避免舊版相容問題
-        doc.SaveAs2(str(dst_path), FileFormat=file_format)
-        doc.Close(SaveChanges=False)
-        return True, "OK"
-    except Exception as e:
-        try:
-            # 若文件有開啟，確保關閉
-            doc.Close(SaveChanges=False)  # type: ignore
-        except Exception:
-            pass
-        return False, f"ERROR: {e}"
+    os.replace(path, target)
+    return target
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="根據 Excel 內的檔案完整路徑清單，將 .doc 轉為 .docx 並另存在新資料夾。"
     )
-    parser.add_argument("excel", help="Excel 檔（.xlsx/.xlsm），A 欄放完整檔案路徑")
+    parser.add_argument("excel", help="路徑清單：Excel 檔（.xlsx/.xlsm）或 CSV 的指定欄位，或每行一個路徑的文字檔")
     parser.add_argument(
         "-o", "--outdir", required=True, help="輸出資料夾（會自動建立）"
     )
@@ -124,12 +76,40 @@ def main():
     )
     
     parser.add_argument("--skip-header", action="store_true", help="A 欄首列是標題時啟用")
-    
+    parser.add_argument("--encoding", default="utf-8-sig", help="CSV/文字清單的編碼，預設 utf-8-sig（Big5 請用 cp950）")
+    parser.add_argument("--no-preflight", action="store_true", help="不做清單預檢，邊讀清單邊轉檔（逐檔檢查是否存在）")
+    parser.add_argument("--scan-workers", type=int, default=DEFAULT_SCAN_WORKERS,
+                        help=f"預檢時同時掃描的資料夾數，預設 {DEFAULT_SCAN_WORKERS}")
+    parser.add_argument("--keep-duplicates", action="store_true",
+                        help="清單重複列出的路徑仍逐次轉檔（另存 foo (2).docx），預設只轉一次")
+    parser.add_argument("--preflight-report", help="預檢報告 CSV 輸出路徑（不存在/不是檔案/重複列出）")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=default_backend(),
+                        help="轉檔方式：com（Word，Windows）或 soffice（LibreOffice headless），預設 %(default)s")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"同時轉檔的工作行程數（每個各自一個 Word/soffice），預設 {DEFAULT_WORKERS}")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"單一文件轉檔逾時秒數，逾時即結束該工作行程並重新啟動，預設 {DEFAULT_TIMEOUT:g}")
+    parser.add_argument("--soffice", help="soffice 執行檔路徑（預設自動尋找）")
+    parser.add_argument("--incremental", action="store_true",
+                        help="增量模式：依轉檔紀錄略過輸出仍有效的來源，只轉新增或變更的 .doc（變更者原地取代輸出）")
+    parser.add_argument("--manifest",
+                        help="增量轉檔紀錄檔路徑（預設為輸出資料夾旁的 <資料夾名>.convert_manifest.sqlite）")
+    parser.add_argument("--no-verify", action="store_true",
+                        help="轉檔後不檢查輸出（預設每個輸出寫完立即以 VerifyDoc 確認是真的 DOCX/DOCM）")
+    parser.add_argument("--retries", type=int, default=1,
+                        help="轉檔或驗證失敗、逾時時重試次數，預設 1")
+    parser.add_argument("--quarantine",
+                        help="重試後仍失敗的輸出移往的資料夾（預設為輸出資料夾旁的 <資料夾名>_quarantine）")
+    parser.add_argument("--report", help="綜合結果報告 CSV（轉檔、驗證、略過、預檢問題，每列一筆）")
+    add_profile_arguments(parser)
+
+    add_progress_arguments(parser)
     args = parser.parse_args()
+    PROFILE.configure(args, "DocToDocx")
 
     excel_path = Path(args.excel).expanduser().resolve()
     if not excel_path.exists():
-        raise SystemExit(f"找不到 Excel 檔：{excel_path}")
+        raise SystemExit(f"找不到清單檔：{excel_path}")
 
     out_dir = Path(args.outdir).expanduser().resolve()
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -141,86 +121,224 @@ def main():
     else:
         sheet_arg = args.sheet
 
-    # 讀取路徑清單
-    paths = list(read_paths_from_excel(excel_path, sheet=sheet_arg, col_letter=args.column, skip_header=args.skip_header))
-    if not paths:
-        raise SystemExit("Excel 指定欄位沒有可用的路徑資料。")
+    # 讀取路徑清單（邊讀邊轉檔，不必等整份清單讀完）
+    paths = PROFILE.iter("list", read_path_list(
+        excel_path, sheet=sheet_arg, col_letter=args.column, skip_header=args.skip_header, encoding=args.encoding
+    ))
+    first = next(paths, None)
+    if first is None:
+        raise SystemExit("清單指定欄位沒有可用的路徑資料。")
+    paths = chain([first], paths)
 
-    # 啟動 Word（隱藏、關閉警告）
-    try:
-        word = win32.Dispatch("Word.Application")
-    except Exception as e:
-        raise SystemExit(
-            "無法啟動 Microsoft Word。請確認本機已安裝 Office/Word，且 Python/Office 位元數相容（建議皆為 64 位）。"
-        ) from e
-
-    word.Visible = False
-    # 0 = wdAlertsNone
-    try:
-        word.DisplayAlerts = 0
-    except Exception:
-        pass
-
-    total = len(paths)
+    total = 0
     converted = 0
     skipped = 0
     failed = 0
-
-    for i, src in enumerate(paths, start=1):
-        print(f"[{i}/{total}] 處理：{src}")
-        if not src.exists():
-            print("  -> 路徑不存在，略過。")
-            failed += 1
-            continue
-
-        ext = src.suffix.lower()
-        if ext == ".doc":
-            # 目標路徑：同名但副檔名 .docx 或 .docm
-            base = src.stem
-            target_ext = ".docm" if args.macro_enabled else ".docx"
-            dst = unique_target_path(out_dir, base, target_ext)
-
-            ok, msg = convert_doc_to_docx(
-                word, src, dst, macro_enabled=args.macro_enabled
-            )
-            if ok:
-                converted += 1
-                print(f"  -> 轉檔成功：{dst}")
-            else:
-                failed += 1
-                print(f"  -> 轉檔失敗：{msg}")
-
-        elif ext == ".docx":
-            if args.copy_docx:
-                dst = unique_target_path(out_dir, src.stem, ".docx")
-                try:
-                    # 複製已是 docx 的檔案（可選）
-                    from shutil import copy2
-                    copy2(src, dst)
-                    skipped += 1
-                    print(f"  -> 已是 .docx，複製到：{dst}")
-                except Exception as e:
+    duplicated = 0
+    up_to_date = 0
+    quarantined = 0
+    checked = False
+    known_stats = {}
+    q_dir = (
+        Path(args.quarantine).expanduser().resolve()
+        if args.quarantine
+        else out_dir.with_name(f"{out_dir.name}_quarantine")
+    )
+    result_log = None
+    if args.report:
+        result_log = CsvStreamWriter(Path(args.report).expanduser().resolve(), REPORT_FIELDS).open()
+
+    def log(src: Path, status: str, output=None, kind="", note="", attempts="", seconds="", message=""):
+        if result_log is not None:
+            result_log.writerow({
+                "Source": str(src), "Output": str(output or ""), "Status": status, "Kind": kind, "Note": note,
+                "Attempts": attempts, "Seconds": seconds, "Message": message,
+            })
+
+    progress = Progress.from_args(args, PROGRESS_LABELS)
+    if not args.no_preflight:
+        # 每個資料夾 scandir 一次，先排除不存在/資料夾/重複的列，網路路徑不必逐檔等待逾時
+        with PROFILE.span("preflight"):
+            report = preflight(paths, workers=args.scan_workers, keep_duplicates=args.keep_duplicates)
+        report.print_summary()
+        if args.preflight_report:
+            report.write_csv(Path(args.preflight_report).expanduser().resolve())
+            print(f"預檢報告：{args.preflight_report}")
+        total = report.total
+        failed += len(report.missing)
+        skipped += len(report.directories)
+        if not args.keep_duplicates:
+            duplicated = sum(n - 1 for n in report.duplicates.values())
+        paths = [p for p, _ in report.valid]
+        known_stats = report.stats
+        checked = True
+        for p in report.missing:
+            log(p, "missing")
+            progress.log("missing", p)
+        for p in report.directories:
+            log(p, "not-file")
+            progress.log("not-file", p)
+        for p, n in report.duplicates.items():
+            log(p, "duplicate", note=f"{n} 次")
+            progress.log("duplicate", p, count=n)
+
+    index = NameIndex(out_dir)
+    target_ext = ".docm" if args.macro_enabled else ".docx"
+    planned = {}
+    manifest = None
+    if args.incremental:
+        manifest_path = (
+            Path(args.manifest).expanduser().resolve()
+            if args.manifest
+            else out_dir.with_name(f"{out_dir.name}.convert_manifest.sqlite")
+        )
+        manifest = ConvertManifest(manifest_path)
+        print(f"增量模式：{manifest_path}（{len(manifest.entries)} 筆紀錄）")
+        # 紀錄中的輸出檔名保留給原來源，新來源不會配到
+        for out in manifest.outputs():
+            if out.parent == out_dir:
+                index.add(out, 0)
+
+    def doc_tasks():
+        """依清單順序處理非 .doc 的項目，.doc 則配好輸出檔名後交給轉檔池。"""
+        nonlocal total, skipped, failed, up_to_date
+        for i, src in enumerate(paths, start=1):
+            label = f"[{i}/{len(paths)}]" if checked else f"[{i}]"
+            if not checked:
+                total = i
+                if not src.exists():
+                    progress.say(f"{label} 處理：{src}")
+                    progress.event("missing", src, "  -> 路徑不存在，略過。")
                     failed += 1
-                    print(f"  -> 複製失敗：{e}")
+                    log(src, "missing")
+                    continue
+
+            ext = src.suffix.lower()
+            if ext == ".doc":
+                st = None
+                decision = "new"
+                if manifest is not None:
+                    try:
+                        st = known_stats.get(src) or src.stat()
+                    except OSError as e:
+                        progress.say(f"{label} 處理：{src}")
+                        progress.event("failed", src, f"  -> 無法讀取來源：{e}", message=str(e))
+                        failed += 1
+                        log(src, "failed", message=str(e))
+                        continue
+                    with PROFILE.span("manifest"):
+                        decision, dst = manifest.check(src, st, target_ext)
+                    if decision == "valid":
+                        up_to_date += 1
+                        progress.event("up-to-date", src, dst=dst)
+                        log(src, "up-to-date", dst)
+                        continue
+                if decision == "replace":
+                    # 先轉到暫存檔，成功後才取代舊輸出；失敗時舊輸出保持不變
+                    final = dst
+                    dst = partial_path(final)
+                else:
+                    # 目標路徑：同名但副檔名 .docx 或 .docm（在主行程配發，平行轉檔也不會撞名）
+                    final = dst = index.unique_path(src.stem, target_ext)
+                planned[i] = (label, st, final)
+                yield i, src, dst, args.macro_enabled
+                continue
+
+            progress.say(f"{label} 處理：{src}")
+            if ext == ".docx":
+                if args.copy_docx:
+                    dst = index.unique_path(src.stem, ".docx")
+                    try:
+                        # 複製已是 docx 的檔案（可選）
+                        t = PROFILE.start()
+                        copy2(src, dst)
+                        size = known_stats[src].st_size if src in known_stats else 0
+                        PROFILE.stop("copy-docx", t, read=size, written=size)
+                        skipped += 1
+                        progress.event("copied", src, f"  -> 已是 .docx，複製到：{dst}", dst=dst)
+                        log(src, "copied", dst)
+                    except Exception as e:
+                        failed += 1
+                        progress.event("failed", src, f"  -> 複製失敗：{e}", dst=dst, message=str(e))
+                        log(src, "failed", dst, message=str(e))
+                else:
+                    skipped += 1
+                    progress.event("skipped", src, "  -> 已是 .docx，略過。", message="已是 .docx")
+                    log(src, "skipped", message="已是 .docx")
             else:
                 skipped += 1
-                print("  -> 已是 .docx，略過。")
-        else:
-            skipped += 1
-            print("  -> 非 .doc/.docx，略過。")
+                progress.event("skipped", src, "  -> 非 .doc/.docx，略過。", message="非 .doc/.docx")
+                log(src, "skipped", message="非 .doc/.docx")
 
-    # 關閉 Word
+    options = {"soffice": args.soffice} if args.backend == "soffice" else {}
+    pool = ConverterPool(
+        BACKENDS[args.backend], options, workers=args.workers, timeout=args.timeout,
+        verify=None if args.no_verify else verify_converted, retries=args.retries, digest=manifest is not None,
+    )
+    progress.start(len(paths) if checked else None)
     try:
-        word.Quit()
-    except Exception:
-        pass
+        for r in PROFILE.iter("wait", pool.run(doc_tasks())):
+            label, st, final = planned.pop(r.key)
+            progress.say(f"{label} 處理：{r.src}")
+            if r.ok and r.dst != final:
+                try:
+                    os.replace(r.dst, final)
+                except OSError as e:
+                    r = r._replace(ok=False, message=f"ERROR: 無法取代舊輸出：{e}")
+            attempts = f"{r.attempts}"
+            secs = f"{r.seconds:.1f}"
+            if r.ok:
+                converted += 1
+                progress.event("converted", r.src, f"  -> 轉檔成功：{final}（{r.seconds:.1f} 秒）",
+                               dst=final, kind=r.kind, note=r.note, attempts=r.attempts, seconds=round(r.seconds, 2))
+                log(r.src, "converted", final, r.kind, r.note, attempts, secs)
+                if manifest is not None:
+                    with PROFILE.span("manifest"):
+                        manifest.record(r.src, st, final, r.digest)
+                continue
+
+            failed += 1
+            text = f"  -> 轉檔失敗：{r.message}"
+            fields = dict(kind=r.kind, note=r.note, attempts=r.attempts, seconds=round(r.seconds, 2), message=r.message)
+            if r.dst.exists():
+                # 不合格的輸出不留在輸出資料夾（取代模式下舊輸出保持不變）
+                try:
+                    moved = quarantine(r.dst, q_dir)
+                    quarantined += 1
+                    progress.event("quarantined", r.src, f"{text}\n  -> 已移至隔離資料夾：{moved}", dst=moved, **fields)
+                    log(r.src, "quarantined", moved, r.kind, r.note, attempts, secs, r.message)
+                    continue
+                except OSError as e:
+                    text += f"\n  -> 無法移至隔離資料夾：{e}"
+            progress.event("failed", r.src, text, dst=final, **fields)
+            log(r.src, "failed", final, r.kind, r.note, attempts, secs, r.message)
+    except ConverterError as e:
+        raise SystemExit(str(e))
+    finally:
+        progress.close()
+        if manifest is not None:
+            manifest.close()
+        if result_log is not None:
+            result_log.close()
 
     print("\n==== 結果 ====")
     print(f"總計：{total}")
     print(f"成功轉檔：{converted}")
     print(f"略過：{skipped}")
+    if manifest is not None:
+        print(f"輸出仍有效略過：{up_to_date}")
+    if duplicated:
+        print(f"重複列出略過：{duplicated}")
     print(f"失敗：{failed}")
+    if quarantined:
+        print(f"失敗輸出已隔離：{quarantined}（{q_dir}）")
+    if pool.retried:
+        print(f"重試：{pool.retried} 次")
+    if pool.restarts:
+        print(f"轉檔程序重新啟動：{pool.restarts} 次")
     print(f"輸出資料夾：{out_dir}")
+    if result_log is not None:
+        print(f"結果報告：{args.report}")
 
 
 if __name__ == "__main__":
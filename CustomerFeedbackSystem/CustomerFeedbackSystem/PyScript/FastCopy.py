@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+核心輔助的檔案複製（CopyEngine 使用），行為與 shutil.copy2 相同（內容 + copystat 中繼資料），
+但資料搬移盡量在核心內完成，不經過使用者空間緩衝區：
+  1. reflink（ioctl FICLONE）：Btrfs / XFS(reflink=1) 等支援時，只複製區塊參照，幾乎不花時間
+  2. os.copy_file_range：核心內複製；NFS 4.2 / SMB3 可能轉為伺服器端複製
+  3. os.sendfile：核心內複製（舊核心或跨檔案系統時）
+  4. 以上都不支援時（例如 Windows）改用 shutil.copyfileobj
+某個方式在某對 (來源裝置, 目的裝置) 上回報不支援後，之後同一對裝置就不再嘗試。
+"""
+import errno
+import os
+import shutil
+import stat
+import threading
+from collections import Counter
+from typing import Dict, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# linux/fs.h：_IOW(0x94, 9, int)
+FICLONE = 0x40049409
+CHUNK = 64 * 1024 * 1024
+
+# 視為「此方式不支援」而改用下一種方式的錯誤碼
+_UNSUPPORTED = {
+    errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.ENOTTY, errno.EBADF,
+    errno.EPERM, errno.EOPNOTSUPP, getattr(errno, "ENOTSUP", errno.EOPNOTSUPP),
+}
+
+_disabled: Dict[Tuple[int, int], Set[str]] = {}
+_lock = threading.Lock()
+# 各方式實際使用次數，供量測與紀錄
+stats: Counter = Counter()
+
+
+def _reflink(sfd: int, dfd: int, size: int):
+    fcntl.ioctl(dfd, FICLONE, sfd)
+
+
+def _check_copied(name: str, copied: int, size: int):
+    # 第一次呼叫就回傳 0：此檔案系統實際上不支援（例如部分 FUSE），當作不支援改用下一種方式
+    if copied == 0:
+        raise OSError(errno.ENOSYS, f"{name} 未複製任何資料")
+    if copied != size:
+        raise OSError(errno.EIO, f"{name} 複製了 {copied} bytes，來源為 {size} bytes（複製期間被修改？）")
+
+
+def _copy_file_range(sfd: int, dfd: int, size: int):
+    copied = 0
+    while True:
+        n = os.copy_file_range(sfd, dfd, CHUNK)
+        if n == 0:
+            break
+        copied += n
+    _check_copied("copy_file_range", copied, size)
+
+
+def _sendfile(sfd: int, dfd: int, size: int):
+    offset = 0
+    while True:
+        n = os.sendfile(dfd, sfd, offset, CHUNK)
+        if n == 0:
+            break
+        offset += n
+    _check_copied("sendfile", offset, size)
+    os.lseek(dfd, offset, os.SEEK_SET)
+
+
+def _methods():
+    if fcntl is not None and hasattr(fcntl, "ioctl") and os.name == "posix":
+        yield "reflink", _reflink
+    if hasattr(os, "copy_file_range"):
+        yield "copy_file_range", _copy_file_range
+    if hasattr(os, "sendfile") and os.name == "posix":
+        yield "sendfile", _sendfile
+
+
+def copy_fd(sfd: int, dfd: int, size: int, devices: Tuple[int, int]) -> str:
+    """把 sfd 的內容寫入（空的）dfd，回傳實際使用的方式。"""
+    with _lock:
+        disabled = _disabled.setdefault(devices, set())
+    if size > 0:
+        for name, fn in _methods():
+            if name in disabled:
+                continue
+            try:
+                fn(sfd, dfd, size)
+                return name
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                with _lock:
+                    disabled.add(name)
+                # 可能已寫入部分內容：歸零後改用下一種方式
+                os.lseek(sfd, 0, os.SEEK_SET)
+                os.lseek(dfd, 0, os.SEEK_SET)
+                os.ftruncate(dfd, 0)
+    with open(sfd, "rb", closefd=False) as fsrc, open(dfd, "wb", closefd=False) as fdst:
+        shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+    return "userspace"
+
+
+def fast_copy2(src, dst, *, follow_symlinks: bool = True):
+    """與 shutil.copy2 相同的介面與結果（dst 可為資料夾），回傳目的路徑。"""
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    if not follow_symlinks and os.path.islink(src):
+        return shutil.copy2(src, dst, follow_symlinks=False)
+
+    with open(src, "rb", buffering=0) as fsrc:
+        st = os.fstat(fsrc.fileno())
+        if not stat.S_ISREG(st.st_mode):
+            return shutil.copy2(src, dst)
+        try:
+            dst_st = os.stat(dst)
+        except OSError:
+            dst_st = None
+        if dst_st is not None and os.path.samestat(st, dst_st):
+            raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+        with open(dst, "wb", buffering=0) as fdst:
+            dst_dev = os.fstat(fdst.fileno()).st_dev
+            method = copy_fd(fsrc.fileno(), fdst.fileno(), st.st_size, (st.st_dev, dst_dev))
+    with _lock:
+        stats[method] += 1
+    shutil.copystat(src, dst)
+    return dst
+
+
+# CopyOthers --copy-backend 可選的實作
+COPY_BACKENDS = {
+    "auto": fast_copy2,
+    "copy2": shutil.copy2,
+}
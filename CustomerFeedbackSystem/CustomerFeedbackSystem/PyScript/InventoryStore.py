@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+精簡的記憶體內檔案清單（ListAllFilePath.py 使用）：整份清單必須留在記憶體時（例如 --hash 要先看過所有檔案大小），
+以欄式陣列保存，取代每個項目一個十欄 list（兩個 datetime、RelativePath / Parent / FullPath 字串與 Path 物件）：
+  - 名稱：UTF-8 串接在同一個 bytearray，另以位移陣列索引
+  - 上層資料夾：存資料夾編號（array 'i'），每個資料夾的相對路徑只存一次
+  - 大小、修改/建立時間、深度：typed array（'q'、'd'、'H'）
+  - RelativePath、Parent、FullPath 與 datetime 在 row() / rows() 匯出時才產生，欄位與 entry_row 完全相同
+每個項目約 50 bytes（十欄 list 約 1 KB）。
+可依相對路徑查詢（find）或列出資料夾內容（children）；索引在第一次查詢時建立，
+find 另外為查過的資料夾建立「名稱 → 項目編號」字典，之後同一資料夾的查詢不必逐一比對名稱。
+
+用法：
+    store = InventoryStore(root)
+    for _, entry, is_dir, _ in walk([root], prestat=True):
+        store.add(entry, is_dir)
+    export_to_csv_stream(store.rows(), HEADERS, out_path)
+    store.row(store.find("部門01/文件_0000001.docx"))
+"""
+import os
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from DirWalker import safe_stat
+
+# size 欄位：資料夾或無法 stat 時
+_NO_SIZE = -1
+
+
+class InventoryStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        root_str = str(self.root)
+        self._prefix = root_str if root_str.endswith(os.sep) else root_str + os.sep
+        self._names = bytearray()
+        self._offsets = array("Q", [0])
+        self._parent = array("i")
+        self._is_dir = bytearray()
+        self._size = array("q")
+        self._mtime = array("d")
+        self._ctime = array("d")
+        self._depth = array("H")
+        # 資料夾編號 → 相對路徑（posix 格式；0 為根目錄）
+        self._dirs: List[str] = [""]
+        self._dir_ids: Dict[str, int] = {"": 0}
+        # 依資料夾分組的項目編號（counting sort），第一次查詢時建立
+        self._index: Optional[Tuple[array, array]] = None
+        # 資料夾編號 → {名稱（UTF-8）: 項目編號}，find 查到該資料夾時才建立
+        self._lookup: Dict[int, Dict[bytes, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def _dir_id(self, rel_dir: str) -> int:
+        d = self._dir_ids.get(rel_dir)
+        if d is None:
+            d = len(self._dirs)
+            self._dirs.append(rel_dir)
+            self._dir_ids[rel_dir] = d
+        return d
+
+    def add(self, entry: os.DirEntry, is_dir: bool, st: Optional[os.stat_result] = None) -> int:
+        """加入 DirWalker 產出的一個項目（必須在 root 底下），回傳項目編號；st 省略時以 safe_stat 取得。"""
+        if st is None:
+            st = safe_stat(entry)
+        name = entry.name
+        path = entry.path
+        rel_dir = path[len(self._prefix):len(path) - len(name) - 1]
+        if os.sep != "/":
+            rel_dir = rel_dir.replace(os.sep, "/")
+        if is_dir:
+            # 子項目可能先於資料夾本身加入（多執行緒掃描），兩邊都以相對路徑取得同一個編號
+            self._dir_id(f"{rel_dir}/{name}" if rel_dir else name)
+        self._parent.append(self._dir_id(rel_dir))
+        self._names += name.encode("utf-8", "surrogateescape")
+        self._offsets.append(len(self._names))
+        self._is_dir.append(1 if is_dir else 0)
+        self._size.append(_NO_SIZE if (is_dir or st is None) else st.st_size)
+        self._mtime.append(st.st_mtime if st else 0.0)
+        self._ctime.append(st.st_ctime if st else 0.0)
+        self._depth.append(rel_dir.count("/") + 2 if rel_dir else 1)
+        self._index = None
+        if self._lookup:
+            self._lookup = {}
+        return len(self._parent) - 1
+
+    # ---- 單一欄位 ----
+
+    def name(self, i: int) -> str:
+        return self._names[self._offsets[i]:self._offsets[i + 1]].decode("utf-8", "surrogateescape")
+
+    def is_dir(self, i: int) -> bool:
+        return bool(self._is_dir[i])
+
+    def size(self, i: int) -> Optional[int]:
+        size = self._size[i]
+        return None if size == _NO_SIZE else size
+
+    def rel_path(self, i: int) -> str:
+        rel_dir = self._dirs[self._parent[i]]
+        return f"{rel_dir}/{self.name(i)}" if rel_dir else self.name(i)
+
+    def full_path(self, i: int) -> str:
+        rel = self.rel_path(i)
+        return self._prefix + (rel if os.sep == "/" else rel.replace("/", os.sep))
+
+    # ---- 匯出 ----
+
+    def row(self, i: int) -> List[Any]:
+        """與 entry_row 相同欄位（順序同 HEADERS）的資料列。"""
+        name = self.name(i)
+        rel_dir = self._dirs[self._parent[i]]
+        rel = f"{rel_dir}/{name}" if rel_dir else name
+        is_dir = self._is_dir[i]
+        size = self._size[i]
+        mtime = self._mtime[i]
+        ctime = self._ctime[i]
+        return [
+            name,
+            "Folder" if is_dir else "File",
+            "" if is_dir else Path(name).suffix.lower(),
+            None if size == _NO_SIZE else size,
+            datetime.fromtimestamp(mtime) if mtime else None,
+            datetime.fromtimestamp(ctime) if ctime else None,
+            rel,
+            rel_dir or "/",
+            self._depth[i],
+            self._prefix + (rel if os.sep == "/" else rel.replace("/", os.sep)),
+        ]
+
+    def rows(self) -> Iterator[List[Any]]:
+        """依加入順序逐列產生（每列用完即可釋放），可直接交給 export_to_* 匯出。"""
+        for i in range(len(self._parent)):
+            yield self.row(i)
+
+    def files(self, shared_size_only: bool = False) -> Iterator[Tuple[str, int]]:
+        """
+        產出檔案的 (FullPath, 大小)，供 DuplicateFinder 使用。
+        shared_size_only=True 時只產出與其他檔案大小相同者（大小唯一的檔案不可能重複，不必產生路徑字串）。
+        """
+        shared = None
+        if shared_size_only:
+            shared = set()
+            prev = None
+            for size in sorted(s for s in self._size if s != _NO_SIZE):
+                if size == prev:
+                    shared.add(size)
+                prev = size
+        for i, size in enumerate(self._size):
+            if size == _NO_SIZE or self._is_dir[i] or (shared is not None and size not in shared):
+                continue
+            yield self.full_path(i), size
+
+    def total_size(self) -> int:
+        return sum(s for s in self._size if s != _NO_SIZE)
+
+    # ---- 查詢 ----
+
+    def _children_index(self) -> Tuple[array, array]:
+        if self._index is None:
+            ndirs = len(self._dirs)
+            start = array("i", bytes(4 * (ndirs + 1)))
+            for p in self._parent:
+                start[p + 1] += 1
+            for d in range(ndirs):
+                start[d + 1] += start[d]
+            fill = array("i", start)
+            order = array("i", bytes(4 * len(self._parent)))
+            for i, p in enumerate(self._parent):
+                order[fill[p]] = i
+                fill[p] += 1
+            self._index = (start, order)
+        return self._index
+
+    def children(self, rel_dir: str = "") -> List[int]:
+        """資料夾（相對路徑，posix 格式；"" 為根目錄）底下一層的項目編號；資料夾不存在時為空清單。"""
+        d = self._dir_ids.get(rel_dir.strip("/"))
+        if d is None:
+            return []
+        start, order = self._children_index()
+        return order[start[d]:start[d + 1]].tolist()
+
+    def find(self, rel_path: str) -> Optional[int]:
+        """依相對路徑（posix 格式）找項目編號，找不到時為 None。"""
+        rel_dir, _, name = rel_path.strip("/").rpartition("/")
+        d = self._dir_ids.get(rel_dir)
+        if d is None:
+            return None
+        names = self._lookup.get(d)
+        if names is None:
+            start, order = self._children_index()
+            names = {}
+            for i in order[start[d]:start[d + 1]]:
+                names.setdefault(bytes(self._names[self._offsets[i]:self._offsets[i + 1]]), i)
+            self._lookup[d] = names
+        return names.get(name.encode("utf-8", "surrogateescape"))
@@ -1,4 +1,4 @@
-# 安裝套件：pip install openpyxl
+# 不需額外套件（.xlsx 以內建串流寫出器輸出）
 # 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\ListAllFilePath.py "C:\Users\peter\OneDrive\Desktop\GMP文件庫(2020NEW)" -o "C:\Users\peter\OneDrive\Desktop\原始輸出清單.xlsx"
 
 # 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\ListAllFilePath.py "C:\Users\peter\OneDrive\Desktop\GMP文件庫(合併與重新命名)" -o "C:\Users\peter\OneDrive\Desktop\合併後輸出清單.xlsx"
@@ -6,89 +6,230 @@
 # -*- coding: utf-8 -*-
 import argparse
 import os
+import pickle
+import tempfile
 from pathlib import Path
 from datetime import datetime
-from typing import Iterator, Tuple, List, Any
+from typing import Any, Dict, Iterable, List, Optional
+
+from ContentHash import DuplicateFinder
+from CsvStream import CsvStreamWriter
+from DirWalker import walk, safe_stat
+from InventoryStore import InventoryStore
+from Profiler import PROFILE, add_profile_arguments
+from Progress import Progress, add_progress_arguments
+from XlsxStream import XlsxStreamWriter, EXCEL_MAX_ROWS
+from ArrowStream import ArrowStreamWriter, COLUMNAR_SUFFIXES
+
+# 輸出欄位（順序同 entry_row）
+HEADERS = [
+    "Name",
+    "Type",
+    "Extension",
+    "Size(bytes)",
+    "ModifiedTime",
+    "CreatedTime",
+    "RelativePath",
+    "Parent",
+    "Depth",
+    "FullPath",
+]
+
+# 欄式輸出（Parquet/Feather）各欄型別；重複值多的欄位用字典編碼
+ARROW_COLUMN_TYPES = {
+    "Name": "string",
+    "Type": "category",
+    "Extension": "category",
+    "Size(bytes)": "int64",
+    "ModifiedTime": "timestamp",
+    "CreatedTime": "timestamp",
+    "RelativePath": "string",
+    "Parent": "category",
+    "Depth": "int32",
+    "FullPath": "string",
+}
+
+def export_to_excel(rows: Iterable[List[Any]], headers: List[str], out_path: Path) -> int:
+    """
+    以串流方式寫出 Excel：rows 可為產生器，邊產生邊寫入，不在記憶體保留整份清單。
+    欄寬與日期格式在同一趟計算；超過單一工作表上限時自動分到下一個工作表。
+    回傳工作表數。
+    """
+    with XlsxStreamWriter(out_path, headers, sheet_title="Inventory") as w:
+        for r in rows:
+            w.append(r)
+    return len(w.sheets)
+
+
+def export_to_columnar(rows: Iterable[List[Any]], headers: List[str], out_path: Path,
+                       column_types: Optional[Dict[str, str]] = None) -> int:
+    """以批次寫出 Parquet / Feather（依副檔名），回傳資料列數；column_types 可補充其他欄位的型別。"""
+    types = {**ARROW_COLUMN_TYPES, **(column_types or {})}
+    fields = [(h, types.get(h, "string")) for h in headers]
+    with ArrowStreamWriter(out_path, fields) as w:
+        for r in rows:
+            w.append(r)
+    return w.rows
+
+
+def entry_row(root: Path, entry: os.DirEntry, is_dir: bool, st: Optional[os.stat_result] = None) -> List[Any]:
+    """將一個 DirEntry 轉為輸出欄位（順序同 headers）；st 省略時以 safe_stat 取得。"""
+    if st is None:
+        t = PROFILE.start()
+        st = safe_stat(entry)
+        PROFILE.stop("stat", t)
+    name = entry.name
 
-try:
-    import openpyxl
-    from openpyxl import Workbook
-    from openpyxl.utils import get_column_letter
-except ImportError as e:
-    raise SystemExit("請先安裝 openpyxl： pip install openpyxl") from e
+    full_path = Path(entry.path)
+    try:
+        rel = full_path.relative_to(root)
+    except ValueError:
+        # 理論上不會發生，但以防萬一
+        rel = full_path
+
+    depth = len(rel.parts)
+    parent = rel.parent.as_posix() if rel.parent != Path(".") else "/"
+
+    # 基本欄位
+    typ = "Folder" if is_dir else "File"
+    ext = ("" if is_dir else Path(name).suffix).lower()
+    size = (None if is_dir else (st.st_size if st else None))
+
+    mtime = datetime.fromtimestamp(st.st_mtime) if (st and st.st_mtime) else None
+    ctime = datetime.fromtimestamp(st.st_ctime) if (st and st.st_ctime) else None
+
+    return [
+        name,
+        typ,
+        ext,
+        size,
+        mtime,
+        ctime,
+        rel.as_posix(),
+        parent,
+        depth,
+        str(full_path),
+    ]
 
 
-def iter_entries(root: Path) -> Iterator[Tuple[Path, os.DirEntry, bool]]:
+def export_to_csv_stream(rows: Iterable[List[Any]], headers: List[str], out_path: Path, resume: bool = False):
     """
-    以 os.scandir 遞迴掃描，比 os.walk 在大量檔案時更快。
-    產出 (current_dir, entry, is_dir)。
+    邊掃描邊寫出 CSV，不在記憶體累積資料列；resume=True 時保留已寫出的列並接續。
+    回傳 (資料夾數, 檔案數, 檔案總大小)。
     """
-    stack = [root]
-    while stack:
-        current = stack.pop()
-        try:
-            with os.scandir(current) as it:
-                for entry in it:
-                    try:
-                        is_dir = entry.is_dir(follow_symlinks=False)
-                    except OSError:
-                        # 權限不足/破損捷徑
-                        continue
-                    yield current, entry, is_dir
-                    if is_dir:
-                        stack.append(Path(entry.path))
-        except (PermissionError, FileNotFoundError):
-            # 略過無權限或瞬間被移除的目錄
-            continue
-
-
-def safe_stat(entry: os.DirEntry):
-    try:
-        return entry.stat(follow_symlinks=False)
-    except (PermissionError, FileNotFoundError, OSError):
-        return None
-
-
-def excel_autofit(ws):
-    # 粗略自動欄寬：取每欄字元長度上限（含標題）
-    for col_idx, col_cells in enumerate(ws.columns, start=1):
-        max_len = 0
-        for cell in col_cells:
-            val = cell.value
-            if val is None:
+    i_type = headers.index("Type")
+    i_size = headers.index("Size(bytes)")
+    i_rel = headers.index("RelativePath")
+    folders = files = total_size = 0
+    done = set()
+    writer = CsvStreamWriter(out_path, headers, resume=resume)
+    for row in writer.existing_rows():
+        done.add(row["RelativePath"])
+        if row["Type"] == "Folder":
+            folders += 1
+        else:
+            files += 1
+            total_size += int(row["Size(bytes)"] or 0)
+    if done:
+        print(f"接續上次執行：已輸出 {len(done)} 筆")
+
+    with writer.open():
+        for row in rows:
+            if done and row[i_rel] in done:
                 continue
-            text = str(val)
-            if len(text) > max_len:
-                max_len = len(text)
-        # 預留一些空間
-        ws.column_dimensions[get_column_letter(col_idx)].width = min(max_len + 2, 80)
+            if row[i_type] == "Folder":
+                folders += 1
+            else:
+                files += 1
+                total_size += row[i_size] or 0
+            writer.writerow({
+                h: (v.strftime("%Y-%m-%d %H:%M:%S") if isinstance(v, datetime) else v)
+                for h, v in zip(headers, row)
+            })
+    return folders, files, total_size
+
+
+def hash_rows(rows: Iterable[List[Any]], headers: List[str], workers: int = 8):
+    """
+    內容雜湊階段：先把資料列暫存到磁碟（不佔記憶體），同時收集檔案大小；
+    以 DuplicateFinder 找出可能重複的檔案並計算雜湊後，再逐列補上 ContentHash 欄位。
+    ContentHash 空白代表依大小或抽樣已可確定內容唯一，未完整讀取。
+    回傳 (補上雜湊的資料列產生器, DuplicateFinder)。
+    """
+    i_type = headers.index("Type")
+    i_size = headers.index("Size(bytes)")
+    i_full = headers.index("FullPath")
+    spool = tempfile.TemporaryFile()
+    files = []
+    for row in rows:
+        pickle.dump(row, spool, pickle.HIGHEST_PROTOCOL)
+        if row[i_type] == "File":
+            files.append((row[i_full], row[i_size]))
+
+    finder = DuplicateFinder(workers=workers)
+    digests = finder.run(files)
+    del files
+
+    def replay():
+        with spool:
+            spool.seek(0)
+            while True:
+                try:
+                    row = pickle.load(spool)
+                except EOFError:
+                    return
+                row.append(digests.get(row[i_full], ""))
+                yield row
+
+    return replay(), finder
+
+
+def hash_inventory(store: InventoryStore, workers: int = 8):
+    """
+    同 hash_rows，但資料列來自 InventoryStore：不必把資料列暫存到磁碟，
+    且只對大小與其他檔案相同者產生路徑交給 DuplicateFinder。
+    回傳 (補上雜湊的資料列產生器, DuplicateFinder)。
+    """
+    finder = DuplicateFinder(workers=workers)
+    digests = finder.run(store.files(shared_size_only=True))
+    # run() 只看到大小相同的檔案；讀取比例以全部檔案計算
+    finder.bytes_total = store.total_size()
 
+    def rows():
+        for row in store.rows():
+            row.append(digests.get(row[-1], ""))
+            yield row
 
-def export_to_excel(rows: List[List[Any]], headers: List[str], out_path: Path):
-    wb: Workbook = Workbook()
-    ws = wb.active
-    ws.title = "Inventory"
+    return rows(), finder
 
-    ws.append(headers)
-    for r in rows:
-        ws.append(r)
 
-    # 凍結首列 & 篩選
-    ws.freeze_panes = "A2"
-    ws.auto_filter.ref = ws.dimensions
+def collect_inventory(root: Path, entries: Iterable, progress: Progress) -> InventoryStore:
+    """把掃描結果收進 InventoryStore（同 track_rows 逐筆回報進度）。"""
+    store = InventoryStore(root)
+    for _, entry, is_dir, _ in entries:
+        i = store.add(entry, is_dir)
+        kind = "Folder" if is_dir else "File"
+        progress.event(kind, entry.path, f"{kind:6s} | {entry.path}", size=store.size(i))
+    return store
 
-    excel_autofit(ws)
 
-    # 將日期欄位套格式
-    date_cols = {"ModifiedTime", "CreatedTime"}
-    for col_idx, header in enumerate(headers, start=1):
-        if header in date_cols:
-            for row_idx in range(2, ws.max_row + 1):
-                cell = ws.cell(row=row_idx, column=col_idx)
-                if isinstance(cell.value, datetime):
-                    cell.number_format = "yyyy-mm-dd hh:mm:ss"
+def track_rows(rows: Iterable[List[Any]], headers: List[str], progress: Progress):
+    """逐列回報進度（資料夾/檔案計數、--log 逐筆記錄、--verbose 逐筆列印），資料列原樣傳下去。"""
+    i_type = headers.index("Type")
+    i_full = headers.index("FullPath")
+    i_size = headers.index("Size(bytes)")
+    for row in rows:
+        kind = row[i_type]
+        progress.event(kind, row[i_full], f"{kind:6s} | {row[i_full]}", size=row[i_size])
+        yield row
 
-    wb.save(out_path)
+
+def write_duplicate_report(finder: DuplicateFinder, out_path: Path):
+    """輸出重複檔案群組 CSV（依可節省空間由大到小）。"""
+    with CsvStreamWriter(out_path, ["GroupId", "Size(bytes)", "ContentHash", "FullPath"]).open() as w:
+        for gid, (size, digest, paths) in enumerate(finder.groups, start=1):
+            for p in paths:
+                w.writerow({"GroupId": gid, "Size(bytes)": size, "ContentHash": digest, "FullPath": p})
 
 
 def main():
@@ -97,9 +238,29 @@ def main():
     )
     parser.add_argument("target", type=str, help="要掃描的資料夾路徑")
     parser.add_argument(
-        "-o", "--output", type=str, default=None, help="輸出 Excel 檔（.xlsx）路徑"
+        "-o", "--output", type=str, default=None,
+        help="輸出檔路徑：.xlsx 為 Excel；.csv 為串流寫出（適合超大量檔案）；"
+             ".parquet/.feather 為欄式格式（需 pyarrow，供 pandas 快速讀取）",
+    )
+    parser.add_argument(
+        "--resume", action="store_true", help="CSV 輸出時接續上次中斷的執行（保留已寫出的列）"
+    )
+    parser.add_argument(
+        "--scan-workers", type=int, default=1,
+        help="同時掃描資料夾的執行緒數（網路磁碟建議 8~32；>1 時輸出順序不固定），預設 1",
     )
+    parser.add_argument("--include", action="append", help="只列出符合的檔案（萬用字元，可重複指定），例：*.doc")
+    parser.add_argument("--exclude", action="append", help="排除符合的資料夾/檔案（萬用字元，可重複指定），例：~$*")
+    parser.add_argument("--max-depth", type=int, default=None, help="最大掃描深度（根目錄下第一層為 1）")
+    parser.add_argument(
+        "--hash", action="store_true",
+        help="計算內容雜湊（ContentHash 欄）並另外輸出重複檔案清單（*_重複檔案.csv）",
+    )
+    parser.add_argument("--hash-workers", type=int, default=8, help="計算雜湊的執行緒數，預設 8")
+    add_profile_arguments(parser)
+    add_progress_arguments(parser)
     args = parser.parse_args()
+    PROFILE.configure(args, "ListAllFilePath")
 
     root = Path(args.target).expanduser().resolve()
     if not root.exists() or not root.is_dir():
@@ -111,67 +272,63 @@ def main():
         if args.output
         else Path.cwd() / f"folder_inventory_{timestamp}.xlsx"
     )
-    if out_path.suffix.lower() != ".xlsx":
+    if out_path.suffix.lower() not in (".xlsx", ".csv") + COLUMNAR_SUFFIXES:
         out_path = out_path.with_suffix(".xlsx")
 
-    headers = [
-        "Name",
-        "Type",
-        "Extension",
-        "Size(bytes)",
-        "ModifiedTime",
-        "CreatedTime",
-        "RelativePath",
-        "Parent",
-        "Depth",
-        "FullPath",
-    ]
+    headers = list(HEADERS)
 
-    rows: List[List[Any]] = []
-    root_len = len(str(root))
+    walk_opts = dict(
+        workers=args.scan_workers, include=args.include, exclude=args.exclude, max_depth=args.max_depth
+    )
 
-    for current, entry, is_dir in iter_entries(root):
-        st = safe_stat(entry)
-        name = entry.name
-
-        full_path = Path(entry.path)
-        try:
-            rel = full_path.relative_to(root)
-        except ValueError:
-            # 理論上不會發生，但以防萬一
-            rel = full_path
-
-        depth = len(rel.parts)
-        parent = rel.parent.as_posix() if rel.parent != Path(".") else "/"
-
-        # 基本欄位
-        typ = "Folder" if is_dir else "File"
-        ext = ("" if is_dir else Path(name).suffix).lower()
-        size = (None if is_dir else (st.st_size if st else None))
-
-        mtime = datetime.fromtimestamp(st.st_mtime) if (st and st.st_mtime) else None
-        ctime = datetime.fromtimestamp(st.st_ctime) if (st and st.st_ctime) else None
-
-        rows.append(
-            [
-                name,
-                typ,
-                ext,
-                size,
-                mtime,
-                ctime,
-                rel.as_posix(),
-                parent,
-                depth,
-                str(full_path),
-            ]
-        )
-
-    # Excel 行數上限提示
-    if len(rows) + 1 > 1_048_576:
-        print("警告：資料列超過 Excel 上限，部分資料可能無法完整寫入。請改用 CSV 匯出流程。")
-
-    export_to_excel(rows, headers, out_path)
+    entries = PROFILE.iter("walk", walk([root], prestat=True, **walk_opts))
+    progress = Progress.from_args(args, {"Folder": "資料夾", "File": "檔案"})
+    progress.start()
+
+    if args.hash:
+        # 雜湊要先看過所有檔案大小：清單以精簡格式（InventoryStore）留在記憶體，雜湊完再逐列匯出
+        with PROFILE.span("inventory"):
+            store = collect_inventory(root, entries, progress)
+        with PROFILE.span("hash") as span:
+            rows, finder = hash_inventory(store, workers=args.hash_workers)
+            span.read = finder.bytes_read
+        progress.close()
+        headers = headers + ["ContentHash"]
+        report = out_path.with_name(f"{out_path.stem}_重複檔案.csv")
+        write_duplicate_report(finder, report)
+        ratio = finder.bytes_read / finder.bytes_total if finder.bytes_total else 0
+        print(f"重複群組：{len(finder.groups)}，可節省空間：{finder.wasted_bytes} bytes")
+        print(f"雜湊讀取：{finder.bytes_read} / {finder.bytes_total} bytes（{ratio:.1%}）")
+        for path, err in finder.errors.items():
+            print(f"  無法讀取：{path}（{err}）")
+        print(f"重複檔案清單：{report}")
+    else:
+        rows = PROFILE.iter("row", (entry_row(root, entry, is_dir) for _, entry, is_dir, _ in entries))
+        rows = track_rows(rows, headers, progress)
+
+    if out_path.suffix.lower() == ".csv":
+        with PROFILE.span("export"):
+            folders, files, total_size = export_to_csv_stream(rows, headers, out_path, resume=args.resume)
+        progress.close()
+        PROFILE.add_bytes("export", written=out_path.stat().st_size)
+        print(f"資料夾：{folders}，檔案：{files}，檔案總大小：{total_size} bytes")
+        print(f"已完成，輸出檔：{out_path}")
+        return
+
+    if out_path.suffix.lower() in COLUMNAR_SUFFIXES:
+        with PROFILE.span("export"):
+            count = export_to_columnar(rows, headers, out_path)
+        progress.close()
+        PROFILE.add_bytes("export", written=out_path.stat().st_size)
+        print(f"已完成，共 {count} 筆，輸出檔：{out_path}")
+        return
+
+    with PROFILE.span("export"):
+        sheets = export_to_excel(rows, headers, out_path)
+    progress.close()
+    PROFILE.add_bytes("export", written=out_path.stat().st_size)
+    if sheets > 1:
+        print(f"資料列超過 Excel 單一工作表上限（{EXCEL_MAX_ROWS:,} 列），已分成 {sheets} 個工作表。")
     print(f"已完成，輸出檔：{out_path}")
 
 
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+輕量 Word OOXML 判斷（VerifyDoc.py 使用），不建立 zipfile.ZipFile、不列出整個 namelist：
+  - 由檔尾 End of Central Directory 找到中央目錄，一次讀入後以 bytes.find 只搜尋
+    [Content_Types].xml 與 word/document.xml 兩個項目（內含上千個圖片的 DOCX 也不必逐項建立 ZipInfo）
+  - [Content_Types].xml 分段解壓縮，找到主文件的 ContentType 就停止
+  - 辨識 DOCX / DOCM / DOTX / DOTM；ISO/IEC 29500 Strict 另在 Note 標示 "Strict"
+    （Strict 與 Transitional 的 ContentType 相同，差別在 word/document.xml 根元素的命名空間，只解壓開頭一小段判斷）
+ZIP64、加密或非 deflate/stored 等少見情況回傳 None，由呼叫端改用 zipfile 判斷。
+"""
+import os
+import struct
+import zlib
+from typing import Optional, Tuple
+
+CONTENT_TYPES = b"[Content_Types].xml"
+MAIN_PART = b"word/document.xml"
+
+# 主文件 ContentType → Kind（依 [Content_Types].xml 中先出現者判定）
+WORD_MAIN_TYPES = {
+    b"application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml": "DOCX",
+    b"application/vnd.ms-word.document.macroEnabled.main+xml": "DOCM",
+    b"application/vnd.openxmlformats-officedocument.wordprocessingml.template.main+xml": "DOTX",
+    b"application/vnd.ms-word.template.macroEnabledTemplate.main+xml": "DOTM",
+}
+STRICT_NS = b"http://purl.oclc.org/ooxml/wordprocessingml/main"
+
+_EOCD_SIG = b"PK\x05\x06"
+_CDH_SIG = b"PK\x01\x02"
+_LFH_SIG = b"PK\x03\x04"
+_EOCD_SIZE = 22
+_CDH_SIZE = 46
+_LFH_SIZE = 30
+# EOCD 之後最多可接 65535 bytes 的註解
+_TAIL_MAX = _EOCD_SIZE + 0xFFFF
+_ZIP64_MARK = 0xFFFFFFFF
+
+INFLATE_CHUNK = 16 * 1024
+# 判斷 Strict 時只解壓 word/document.xml 開頭這麼多（根元素的命名空間宣告都在最前面）
+STRICT_PROBE = 4 * 1024
+
+_PATTERN_TAIL = max(len(t) for t in WORD_MAIN_TYPES) - 1
+
+
+class _Entry:
+    __slots__ = ("method", "flags", "csize", "usize", "offset")
+
+    def __init__(self, method, flags, csize, usize, offset):
+        self.method = method
+        self.flags = flags
+        self.csize = csize
+        self.usize = usize
+        self.offset = offset
+
+
+def _central_directory(f) -> Optional[Tuple[bytes, int]]:
+    """回傳 (中央目錄內容, 檔案前置資料位移)；ZIP64 或結構異常時回傳 None。"""
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    if size < _EOCD_SIZE:
+        return None
+    # 多數 ZIP 沒有註解：先只讀最後 22 bytes
+    f.seek(size - _EOCD_SIZE)
+    tail = f.read(_EOCD_SIZE)
+    pos = 0 if tail.startswith(_EOCD_SIG) else -1
+    tail_start = size - _EOCD_SIZE
+    if pos < 0:
+        tail_start = max(0, size - _TAIL_MAX)
+        f.seek(tail_start)
+        tail = f.read()
+        pos = tail.rfind(_EOCD_SIG)
+        if pos < 0 or len(tail) - pos < _EOCD_SIZE:
+            return None
+    _, _, _, _, count, cd_size, cd_offset, _ = struct.unpack("<4s4H2LH", tail[pos:pos + _EOCD_SIZE])
+    if count == 0xFFFF or cd_size == _ZIP64_MARK or cd_offset == _ZIP64_MARK:
+        return None
+    eocd_at = tail_start + pos
+    # 自解壓檔等在 ZIP 前面加了資料時，紀錄中的位移都要加上這段長度
+    concat = eocd_at - cd_size - cd_offset
+    if concat < 0:
+        return None
+    f.seek(cd_offset + concat)
+    cd = f.read(cd_size)
+    if len(cd) != cd_size:
+        return None
+    return cd, concat
+
+
+def _find_entry(cd: bytes, name: bytes) -> Optional[_Entry]:
+    """在中央目錄中尋找名稱完全相符的項目（確認前面是中央目錄標頭，避免誤中其他欄位內容）。"""
+    start = 0
+    while True:
+        pos = cd.find(name, start)
+        if pos < 0:
+            return None
+        start = pos + 1
+        h = pos - _CDH_SIZE
+        if h < 0 or cd[h:h + 4] != _CDH_SIG:
+            continue
+        (_, _, _, flags, method, _, _, _, csize, usize,
+         name_len, _, _, _, _, _, offset) = struct.unpack("<4s6H3L5H2L", cd[h:pos])
+        if name_len != len(name):
+            continue
+        if csize == _ZIP64_MARK or usize == _ZIP64_MARK or offset == _ZIP64_MARK:
+            return None
+        return _Entry(method, flags, csize, usize, offset)
+
+
+def _iter_inflate(f, entry: _Entry, concat: int):
+    """分段產出項目解壓後的內容；不支援的壓縮方式或加密時拋出 ValueError。"""
+    if entry.flags & 0x1:
+        raise ValueError("ZIP 項目已加密")
+    if entry.method not in (0, 8):
+        raise ValueError(f"不支援的壓縮方式 {entry.method}")
+    f.seek(entry.offset + concat)
+    lfh = f.read(_LFH_SIZE)
+    if len(lfh) < _LFH_SIZE or not lfh.startswith(_LFH_SIG):
+        raise ValueError("本地檔頭不正確")
+    name_len, extra_len = struct.unpack("<2H", lfh[26:30])
+    f.seek(name_len + extra_len, os.SEEK_CUR)
+
+    remaining = entry.csize
+    d = zlib.decompressobj(-15) if entry.method == 8 else None
+    while remaining > 0:
+        chunk = f.read(min(INFLATE_CHUNK, remaining))
+        if not chunk:
+            raise ValueError("檔案被截斷")
+        remaining -= len(chunk)
+        out = d.decompress(chunk) if d is not None else chunk
+        if out:
+            yield out
+        if d is not None and d.eof:
+            return
+    if d is not None:
+        out = d.flush()
+        if out:
+            yield out
+
+
+def _main_kind(f, entry: _Entry, concat: int) -> Optional[str]:
+    """分段解壓 [Content_Types].xml，找到第一個 Word 主文件 ContentType 即停止。"""
+    carry = b""
+    for out in _iter_inflate(f, entry, concat):
+        buf = carry + out
+        best = None
+        for ct, kind in WORD_MAIN_TYPES.items():
+            pos = buf.find(ct)
+            if pos >= 0 and (best is None or pos < best[0]):
+                best = (pos, kind)
+        if best is not None:
+            return best[1]
+        carry = buf[-_PATTERN_TAIL:]
+    return None
+
+
+def _is_strict(f, entry: _Entry, concat: int) -> bool:
+    head = b""
+    for out in _iter_inflate(f, entry, concat):
+        head += out
+        if len(head) >= STRICT_PROBE:
+            break
+    return STRICT_NS in head[:STRICT_PROBE]
+
+
+def sniff_word_ooxml(f) -> Optional[Tuple[bool, str, str]]:
+    """
+    以已開啟的檔案物件判斷 ZIP 是否為 Word OOXML。
+    回傳 (是否為 Word, Kind 或失敗原因, Note)；無法以快速路徑判斷時回傳 None。
+    """
+    found = _central_directory(f)
+    if found is None:
+        return None
+    cd, concat = found
+    ct_entry = _find_entry(cd, CONTENT_TYPES)
+    main_entry = _find_entry(cd, MAIN_PART)
+    if ct_entry is None or main_entry is None:
+        # 名稱大小寫不同（OPC 不分大小寫）或 ZIP64 項目：交給 zipfile
+        lowered = cd.lower()
+        if CONTENT_TYPES.lower() in lowered and MAIN_PART in lowered:
+            return None
+        return False, "缺少必要檔", ""
+    try:
+        kind = _main_kind(f, ct_entry, concat)
+        if kind is None:
+            return False, "不是 Word OOXML", ""
+        note = "Strict" if _is_strict(f, main_entry, concat) else ""
+    except (ValueError, zlib.error):
+        return None
+    return True, kind, note
@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+讀取路徑清單（CopyOthers.py、DocToDocx.py 共用），依副檔名決定格式：
+  .xlsx / .xlsm  直接在 zip 內以 expat 串流解析工作表 XML，只取指定欄位（不需 openpyxl；日期儲存格為 Excel 序號）；
+                 iter_xlsx_rows 另可讀出整列（DiffInventory.py 讀取 ListAllFilePath 的清單）
+  .csv           指定欄位（欄位字母，A = 第 1 欄）
+  其他（.txt 等）每行一個路徑
+回傳產生器，邊讀邊產出，呼叫端可以在清單還沒讀完前就開始處理。
+每個值都會去除前後空白與引號；空白列略過。
+"""
+import csv
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Union
+from xml.parsers import expat
+
+EXCEL_SUFFIXES = (".xlsx", ".xlsm")
+CSV_SUFFIXES = (".csv",)
+READ_CHUNK = 1024 * 1024
+
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def column_index(col_letter: str) -> int:
+    """欄位字母轉為 1 起算的欄號（A=1、Z=26、AA=27）。"""
+    idx = 0
+    for ch in col_letter.upper().strip():
+        if not "A" <= ch <= "Z":
+            raise ValueError(f"欄位字母不正確：{col_letter}")
+        idx = idx * 26 + ord(ch) - 64
+    if idx == 0:
+        raise ValueError(f"欄位字母不正確：{col_letter}")
+    return idx
+
+
+def clean_value(val) -> Optional[str]:
+    """去除前後空白與引號；空值回傳 None。"""
+    if val is None:
+        return None
+    s = str(val).strip().strip('"').strip("'")
+    return s or None
+
+
+def _local(name: str) -> str:
+    # 有些工具會以 x:c 之類帶前綴的名稱寫出
+    return name.rpartition(":")[2] if ":" in name else name
+
+
+def _number_text(text: str):
+    """與 openpyxl 相同的數值轉換，讓 str() 後的結果一致。"""
+    try:
+        return float(text) if ("." in text or "E" in text or "e" in text) else int(text)
+    except ValueError:
+        return text
+
+
+def _sheet_part(zf: zipfile.ZipFile, sheet: Union[int, str]) -> str:
+    """由 workbook.xml 與其 rels 找出工作表（1 起算的索引或名稱）對應的 zip 內路徑。"""
+    wb = ET.fromstring(zf.read("xl/workbook.xml"))
+    sheets = [(s.get("name"), s.get(f"{_NS_REL}id")) for s in wb.iter(f"{_NS_MAIN}sheet")]
+    if isinstance(sheet, int):
+        if not 1 <= sheet <= len(sheets):
+            raise ValueError(f"找不到工作表：第 {sheet} 個（共 {len(sheets)} 個）")
+        rid = sheets[sheet - 1][1]
+    else:
+        rid = next((r for name, r in sheets if name == sheet), None)
+        if rid is None:
+            raise ValueError(f"找不到工作表：{sheet}")
+
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.iter(f"{_NS_PKG_REL}Relationship"):
+        if rel.get("Id") == rid:
+            target = rel.get("Target")
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return posixpath.normpath(posixpath.join("xl", target))
+    raise ValueError(f"workbook.xml.rels 中找不到 {rid}")
+
+
+def _feed(parser, stream, out: list) -> Iterator:
+    """分段餵給 expat，每段解析完就把累積的結果交出去。"""
+    while True:
+        chunk = stream.read(READ_CHUNK)
+        if not chunk:
+            parser.Parse(b"", True)
+            yield from out
+            out.clear()
+            return
+        parser.Parse(chunk, False)
+        if out:
+            yield from out
+            out.clear()
+
+
+def _shared_strings(zf: zipfile.ZipFile) -> List[str]:
+    """讀取共用字串表（略過注音 rPh 內容，與 Excel 顯示一致）。"""
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    strings: List[str] = []
+    parts: List[str] = []
+    state = {"in_t": False, "rph": 0}
+
+    def start(name, attrs):
+        name = _local(name)
+        if name == "si":
+            parts.clear()
+        elif name == "rPh":
+            state["rph"] += 1
+        elif name == "t" and not state["rph"]:
+            state["in_t"] = True
+
+    def end(name):
+        name = _local(name)
+        if name == "si":
+            strings.append("".join(parts))
+        elif name == "rPh":
+            state["rph"] -= 1
+        elif name == "t":
+            state["in_t"] = False
+
+    def chars(data):
+        if state["in_t"]:
+            parts.append(data)
+
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = chars
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _ in _feed(parser, f, []):
+            pass
+    return strings
+
+
+def iter_xlsx_column(
+    excel_path: Path, sheet: Union[int, str] = 1, col_letter: str = "A", skip_header: bool = False
+) -> Iterator[str]:
+    """
+    串流讀出 .xlsx 指定工作表、指定欄位的每個儲存格值（轉為字串，空儲存格略過）。
+    與 openpyxl 版唯一的差異：不解析 styles.xml，日期格式的儲存格產出 Excel 序號（例如 "45292.0"），
+    openpyxl 版則是 "2024-01-01 00:00:00"。路徑欄位不會是日期，兩者讀出的路徑相同。
+    """
+    target_col = column_index(col_letter)
+    with zipfile.ZipFile(excel_path) as zf:
+        part = _sheet_part(zf, sheet)
+        sst = _shared_strings(zf)
+
+        out: List[str] = []
+        st = {"row": 0, "col": 0, "hit": False, "type": "n", "collect": False}
+        parts: List[str] = []
+        col_cache = {}
+
+        def start(name, attrs):
+            name = _local(name)
+            if name == "c":
+                ref = attrs.get("r")
+                if ref:
+                    letters = ref.rstrip("0123456789")
+                    col = col_cache.get(letters)
+                    if col is None:
+                        col = col_cache[letters] = column_index(letters)
+                    st["col"] = col
+                else:
+                    st["col"] += 1
+                st["hit"] = st["col"] == target_col and not (skip_header and st["row"] == 1)
+                if st["hit"]:
+                    st["type"] = attrs.get("t", "n")
+                    parts.clear()
+            elif name == "row":
+                r = attrs.get("r")
+                st["row"] = int(r) if r else st["row"] + 1
+                st["col"] = 0
+            elif st["hit"] and name in ("v", "t"):
+                st["collect"] = True
+
+        def end(name):
+            name = _local(name)
+            if name in ("v", "t"):
+                st["collect"] = False
+            elif name == "c" and st["hit"]:
+                st["hit"] = False
+                if not parts:
+                    return
+                text = "".join(parts)
+                kind = st["type"]
+                if kind == "s":
+                    val = sst[int(text)]
+                elif kind == "n":
+                    val = _number_text(text)
+                elif kind == "b":
+                    val = text == "1"
+                else:  # inlineStr / str / e
+                    val = text
+                out.append(val)
+
+        def chars(data):
+            if st["collect"]:
+                parts.append(data)
+
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = chars
+        with zf.open(part) as f:
+            for val in _feed(parser, f, out):
+                yield str(val)
+
+
+def _sheet_count(zf: zipfile.ZipFile) -> int:
+    wb = ET.fromstring(zf.read("xl/workbook.xml"))
+    return sum(1 for _ in wb.iter(f"{_NS_MAIN}sheet"))
+
+
+def iter_xlsx_rows(excel_path: Path, sheet: Optional[Union[int, str]] = None) -> Iterator[List[Any]]:
+    """
+    串流讀出 .xlsx 工作表的每一列（含表頭列），值依儲存格型別轉換，中間的空儲存格為 None。
+    日期儲存格維持 Excel 序號（float），不解析樣式。sheet=None 時依序讀出所有工作表
+    （ListAllFilePath 超過單一工作表上限時會分成多個工作表，每個都有表頭列）。
+    """
+    with zipfile.ZipFile(excel_path) as zf:
+        sheets = range(1, _sheet_count(zf) + 1) if sheet is None else [sheet]
+        sst = _shared_strings(zf)
+        for sh in sheets:
+            part = _sheet_part(zf, sh)
+            out: List[List[Any]] = []
+            st = {"row": [], "col": 0, "type": "n", "collect": False}
+            parts: List[str] = []
+            col_cache = {}
+
+            def start(name, attrs):
+                name = _local(name)
+                if name == "c":
+                    ref = attrs.get("r")
+                    if ref:
+                        letters = ref.rstrip("0123456789")
+                        col = col_cache.get(letters)
+                        if col is None:
+                            col = col_cache[letters] = column_index(letters)
+                        st["col"] = col
+                    else:
+                        st["col"] += 1
+                    st["type"] = attrs.get("t", "n")
+                    parts.clear()
+                elif name == "row":
+                    st["row"] = []
+                    st["col"] = 0
+                elif name in ("v", "t"):
+                    st["collect"] = True
+
+            def end(name):
+                name = _local(name)
+                if name in ("v", "t"):
+                    st["collect"] = False
+                elif name == "c":
+                    if not parts:
+                        return
+                    text = "".join(parts)
+                    kind = st["type"]
+                    if kind == "s":
+                        val = sst[int(text)]
+                    elif kind == "n":
+                        val = _number_text(text)
+                    elif kind == "b":
+                        val = text == "1"
+                    else:  # inlineStr / str / e
+                        val = text
+                    row = st["row"]
+                    missing = st["col"] - 1 - len(row)
+                    if missing > 0:
+                        row.extend([None] * missing)
+                    row.append(val)
+                elif name == "row":
+                    out.append(st["row"])
+
+            def chars(data):
+                if st["collect"]:
+                    parts.append(data)
+
+            parser = expat.ParserCreate()
+            parser.buffer_text = True
+            parser.StartElementHandler = start
+            parser.EndElementHandler = end
+            parser.CharacterDataHandler = chars
+            with zf.open(part) as f:
+                yield from _feed(parser, f, out)
+
+
+def iter_xlsx_column_openpyxl(
+    excel_path: Path, sheet: Union[int, str] = 1, col_letter: str = "A", skip_header: bool = False
+) -> Iterator[str]:
+    """原本的 openpyxl read-only 讀法（保留作為比較基準與備援）。"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet - 1] if isinstance(sheet, int) else wb[sheet]
+        col_idx = column_index(col_letter)
+        for idx, row in enumerate(ws.iter_rows(min_col=col_idx, max_col=col_idx, values_only=True), start=1):
+            if skip_header and idx == 1:
+                continue
+            if row and row[0] is not None:
+                yield str(row[0])
+    finally:
+        wb.close()
+
+
+def iter_csv_column(
+    csv_path: Path, col_letter: str = "A", skip_header: bool = False, encoding: str = "utf-8-sig"
+) -> Iterator[str]:
+    col = column_index(col_letter) - 1
+    with open(csv_path, "r", encoding=encoding, newline="") as f:
+        for idx, row in enumerate(csv.reader(f), start=1):
+            if skip_header and idx == 1:
+                continue
+            if col < len(row):
+                yield row[col]
+
+
+def iter_text_lines(txt_path: Path, skip_header: bool = False, encoding: str = "utf-8-sig") -> Iterator[str]:
+    with open(txt_path, "r", encoding=encoding) as f:
+        for idx, line in enumerate(f, start=1):
+            if skip_header and idx == 1:
+                continue
+            yield line
+
+
+def read_path_list(
+    list_path: Path,
+    sheet: Union[int, str] = 1,
+    col_letter: str = "A",
+    skip_header: bool = False,
+    encoding: str = "utf-8-sig",
+    engine: str = "fast",
+) -> Iterator[Path]:
+    """
+    依副檔名讀取路徑清單，逐一產出 Path。
+    engine="openpyxl" 時 Excel 改用原本的 openpyxl 讀法。
+    """
+    suffix = list_path.suffix.lower()
+    if suffix in EXCEL_SUFFIXES:
+        reader = iter_xlsx_column_openpyxl if engine == "openpyxl" else iter_xlsx_column
+        values = reader(list_path, sheet, col_letter, skip_header)
+    elif suffix in CSV_SUFFIXES:
+        values = iter_csv_column(list_path, col_letter, skip_header, encoding)
+    else:
+        values = iter_text_lines(list_path, skip_header, encoding)
+
+    for val in values:
+        s = clean_value(val)
+        if s is not None:
+            yield Path(s)
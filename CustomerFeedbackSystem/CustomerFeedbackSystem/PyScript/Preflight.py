@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+清單預檢（CopyOthers.py、DocToDocx.py 使用）：在複製/轉檔前一次檢查整份路徑清單。
+  - 依上層資料夾分組，每個資料夾只 scandir 一次（多執行緒），不再逐檔 exists()/is_file()
+    網路磁碟上數萬筆清單若只分布在數百個資料夾，往返次數從數萬次降為數百次
+  - 同一資料夾只列了一個檔案時直接 stat 該檔（比列出整個資料夾便宜）
+  - 預先產出報告：不存在、是資料夾、重複列出的路徑
+  - 只把有效的來源交給後續處理，並附上 stat 結果（CopyEngine 不必再 stat 一次）
+"""
+import os
+import stat
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from CsvStream import CsvStreamWriter
+
+DEFAULT_SCAN_WORKERS = 8
+# 同一資料夾列出的檔案數達此值才改用 scandir
+SCANDIR_MIN = 2
+
+
+def _key(path: Path) -> str:
+    # Windows 路徑不分大小寫
+    return os.path.normcase(str(path))
+
+
+def _scan_parent(parent: str, names: List[str]) -> Dict[str, Optional[os.stat_result]]:
+    """回傳 {normcase 名稱: stat 結果}；不存在的名稱不會出現在結果中。"""
+    found: Dict[str, Optional[os.stat_result]] = {}
+    if len(names) < SCANDIR_MIN:
+        for name in names:
+            try:
+                found[os.path.normcase(name)] = os.stat(os.path.join(parent, name))
+            except OSError:
+                pass
+        return found
+
+    wanted = {os.path.normcase(n) for n in names}
+    try:
+        with os.scandir(parent) as it:
+            for entry in it:
+                key = os.path.normcase(entry.name)
+                if key not in wanted:
+                    continue
+                try:
+                    # Windows 上 scandir 已帶回 stat 資訊，不會再次存取網路
+                    found[key] = entry.stat()
+                except OSError:
+                    found[key] = None
+    except OSError:
+        # 上層資料夾不存在或無權限：其下所有檔案都視為不存在
+        pass
+    return found
+
+
+class PreflightReport:
+    """
+    valid       [(Path, stat)]，依清單順序、已去除重複
+    missing     [Path] 不存在（或無法存取）
+    directories [Path] 是資料夾（或其他非一般檔案）
+    duplicates  {Path: 出現次數}（第 2 次起的列不會出現在 valid）
+    """
+
+    def __init__(self):
+        self.valid: List[Tuple[Path, os.stat_result]] = []
+        self.missing: List[Path] = []
+        self.directories: List[Path] = []
+        self.duplicates: Dict[Path, int] = {}
+        self.total = 0
+        self.parents = 0
+
+    @property
+    def stats(self) -> Dict[Path, os.stat_result]:
+        return {p: st for p, st in self.valid}
+
+    def print_summary(self, limit: int = 20):
+        print(f"清單預檢：共 {self.total} 列，{self.parents} 個資料夾")
+        print(f"  有效：{len(self.valid)}")
+        for label, items in (
+            ("不存在", self.missing),
+            ("不是檔案（資料夾等）", self.directories),
+            ("重複列出", list(self.duplicates)),
+        ):
+            if not items:
+                continue
+            print(f"  {label}：{len(items)}")
+            for p in items[:limit]:
+                extra = f"（{self.duplicates[p]} 次）" if label == "重複列出" else ""
+                print(f"    {p}{extra}")
+            if len(items) > limit:
+                print(f"    ...（其餘 {len(items) - limit} 筆）")
+
+    def write_csv(self, out_path: Path):
+        with CsvStreamWriter(out_path, ["Status", "Count", "Path"]).open() as w:
+            for p in self.missing:
+                w.writerow({"Status": "missing", "Count": 1, "Path": str(p)})
+            for p in self.directories:
+                w.writerow({"Status": "directory", "Count": 1, "Path": str(p)})
+            for p, n in self.duplicates.items():
+                w.writerow({"Status": "duplicate", "Count": n, "Path": str(p)})
+
+
+def preflight(
+    paths: Iterable[Path], workers: int = DEFAULT_SCAN_WORKERS, keep_duplicates: bool = False
+) -> PreflightReport:
+    """
+    檢查整份清單。keep_duplicates=True 時重複列出的路徑仍保留在 valid（維持原本會另存 foo (2) 的行為），
+    但仍會列在 duplicates 報告中。
+    """
+    report = PreflightReport()
+    rows: List[Path] = []
+    seen: Dict[str, int] = {}
+    # normcase(上層資料夾) -> (第一次出現時的上層資料夾路徑, 名稱清單)；大小寫不同的同一資料夾只掃描一次
+    by_parent: "OrderedDict[str, Tuple[str, List[str]]]" = OrderedDict()
+    for p in paths:
+        report.total += 1
+        key = _key(p)
+        n = seen[key] = seen.get(key, 0) + 1
+        if n == 1:
+            parent = str(p.parent)
+            by_parent.setdefault(_key(p.parent), (parent, []))[1].append(p.name)
+        elif not keep_duplicates:
+            continue
+        rows.append(p)
+    report.parents = len(by_parent)
+
+    parents = list(by_parent)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        listings = dict(zip(parents, ex.map(lambda d: _scan_parent(*by_parent[d]), parents)))
+
+    for p in rows:
+        found = listings[_key(p.parent)]
+        key = os.path.normcase(p.name)
+        if key not in found:
+            report.missing.append(p)
+            continue
+        st = found[key]
+        if st is None:
+            report.missing.append(p)
+        elif stat.S_ISREG(st.st_mode):
+            report.valid.append((p, st))
+        else:
+            report.directories.append(p)
+
+    reported = set()
+    for p in rows:
+        key = _key(p)
+        n = seen.get(key, 0)
+        if n > 1 and key not in reported:
+            reported.add(key)
+            report.duplicates[p] = n
+    return report
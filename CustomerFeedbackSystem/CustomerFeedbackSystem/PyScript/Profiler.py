@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+PyScript 工具共用的效能量測（--profile），找出時間花在掃描、stat、檔頭判斷、ZIP/OLE 解析、複製、轉檔或寫出：
+  - 分階段統計：次數、總耗時、自身耗時（扣除巢狀的其他階段）、平均、p95、讀取/寫入位元組、每秒件數
+  - 可選 cProfile（.prof，可用 pstats / snakeviz 檢視，只含主執行緒）
+    或取樣式剖析（涵蓋所有執行緒，輸出 collapsed stacks，可直接交給 flamegraph.pl / speedscope）
+  - 可輸出 JSON 摘要，方便比較不同執行
+未開啟時 PROFILE.enabled 為 False：start() 回傳 None、stop()/record() 立即返回、iter() 原樣回傳，幾乎沒有額外成本。
+
+用法：
+    from Profiler import PROFILE, add_profile_arguments
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    PROFILE.configure(args, "CopyOthers")      # 結束時（含 SystemExit）自動印出報告
+    t = PROFILE.start(); copy(...); PROFILE.stop("copy", t, read=size, written=size)
+    rows = PROFILE.iter("walk", rows)           # 計入每次取得下一筆所花的時間
+"""
+import atexit
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+# 每個階段保留的耗時樣本數上限（蓄水池抽樣），p95 以此估計
+MAX_SAMPLES = 100_000
+DEFAULT_SAMPLE_INTERVAL_MS = 5.0
+
+
+def add_profile_arguments(parser):
+    group = parser.add_argument_group("效能量測")
+    group.add_argument("--profile", action="store_true",
+                       help="結束時列出各階段的次數、耗時（總計/平均/p95）、讀寫量與每秒件數")
+    group.add_argument("--profile-json", help="各階段統計另存為 JSON（隱含 --profile）")
+    group.add_argument("--profile-dump",
+                       help="剖析結果輸出路徑（隱含 --profile）：cprofile 模式為 .prof，sample 模式為 collapsed stacks 文字檔")
+    group.add_argument("--profile-mode", choices=("cprofile", "sample"), default="cprofile",
+                       help="--profile-dump 使用的剖析方式：cprofile（只含主執行緒）或 sample（定時取樣所有執行緒），預設 cprofile")
+    group.add_argument("--profile-interval", type=float, default=DEFAULT_SAMPLE_INTERVAL_MS,
+                       help=f"sample 模式的取樣間隔（毫秒），預設 {DEFAULT_SAMPLE_INTERVAL_MS:g}")
+
+
+class _Stage:
+    __slots__ = ("count", "total", "self_time", "read", "written", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.self_time = 0.0
+        self.read = 0
+        self.written = 0
+        self.samples = []
+
+    def add(self, secs: float, self_secs: float, read: int, written: int):
+        self.count += 1
+        self.total += secs
+        self.self_time += self_secs
+        self.read += read
+        self.written += written
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(secs)
+        else:
+            j = random.randrange(self.count)
+            if j < MAX_SAMPLES:
+                self.samples[j] = secs
+
+    def summary(self, wall: float) -> dict:
+        samples = sorted(self.samples)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "self_seconds": self.self_time,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p95_ms": p95 * 1000,
+            "bytes_read": self.read,
+            "bytes_written": self.written,
+            # 以牆鐘時間計算：多執行緒同時進行的階段也能反映實際吞吐量
+            "per_second": self.count / wall if wall > 0 else 0.0,
+        }
+
+
+class _Span:
+    """with PROFILE.span("export") as s: ...; s.written = n"""
+    __slots__ = ("profiler", "name", "token", "read", "written")
+
+    def __init__(self, profiler: "Profiler", name: str, read: int, written: int):
+        self.profiler = profiler
+        self.name = name
+        self.token = None
+        self.read = read
+        self.written = written
+
+    def __enter__(self):
+        self.token = self.profiler.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.stop(self.name, self.token, self.read, self.written)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ("read", "written")
+
+    def __init__(self):
+        self.read = 0
+        self.written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Sampler(threading.Thread):
+    """定時取樣所有執行緒的呼叫堆疊，統計成 collapsed stacks（"thread;外層;...;內層 次數"）。"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._halt = threading.Event()
+
+    def run(self):
+        me = threading.get_ident()
+        while not self._halt.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._halt.set()
+        self.join()
+
+    def dump(self, path: Path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in self.counts.most_common():
+                f.write(f"{stack} {n}\n")
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.tool = ""
+        self.stages: Dict[str, _Stage] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._t0 = 0.0
+        self._cpu0 = 0.0
+        self._json_path: Optional[Path] = None
+        self._dump_path: Optional[Path] = None
+        self._cprofile = None
+        self._sampler: Optional[_Sampler] = None
+        self._finished = False
+
+    def configure(self, args, tool: str = ""):
+        """依 add_profile_arguments 的參數啟用；啟用後於程式結束時自動呼叫 finish()。"""
+        if not (args.profile or args.profile_json or args.profile_dump):
+            return
+        self.enabled = True
+        self.tool = tool or Path(sys.argv[0]).stem
+        self._json_path = Path(args.profile_json).expanduser().resolve() if args.profile_json else None
+        self._dump_path = Path(args.profile_dump).expanduser().resolve() if args.profile_dump else None
+        if self._dump_path is not None:
+            if args.profile_mode == "sample":
+                self._sampler = _Sampler(max(args.profile_interval, 0.1) / 1000)
+                self._sampler.start()
+            else:
+                import cProfile
+                self._cprofile = cProfile.Profile()
+                self._cprofile.enable()
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        atexit.register(self.finish)
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self):
+        """開始計時；回傳的 token 交給 stop()。未啟用時回傳 None。"""
+        if not self.enabled:
+            return None
+        token = [time.perf_counter(), 0.0]
+        self._stack().append(token)
+        return token
+
+    def _pop(self, token) -> float:
+        secs = time.perf_counter() - token[0]
+        stack = self._stack()
+        if stack and stack[-1] is token:
+            stack.pop()
+        else:
+            # 例外跳過了 stop()，或生成器交錯：由後往前找到同一個 token 移除
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i] is token:
+                    del stack[i]
+                    break
+        if stack:
+            stack[-1][1] += secs
+        return secs
+
+    def stop(self, name: str, token, read: int = 0, written: int = 0):
+        if token is None:
+            return
+        secs = self._pop(token)
+        self.record(name, secs, secs - token[1], read, written)
+
+    def cancel(self, token):
+        """結束計時但不記錄（時間仍計入外層階段的總耗時，不計入其自身耗時）。"""
+        if token is not None:
+            self._pop(token)
+
+    def record(self, name: str, secs: float, self_secs: Optional[float] = None, read: int = 0, written: int = 0):
+        """直接記錄一筆耗時（例如子行程回報的轉檔秒數）。"""
+        if not self.enabled:
+            return
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = _Stage()
+            stage.add(secs, secs if self_secs is None else self_secs, read, written)
+
+    def add_bytes(self, name: str, read: int = 0, written: int = 0):
+        """只累加讀寫量（不增加次數），例如輸出檔寫完後補上檔案大小。"""
+        if not self.enabled:
+            return
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = _Stage()
+            stage.read += read
+            stage.written += written
+
+    def span(self, name: str, read: int = 0, written: int = 0):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, read, written)
+
+    def iter(self, name: str, iterable: Iterable) -> Iterable:
+        """包裝產生器：每取得一筆記錄一次耗時（未啟用時原樣回傳）。"""
+        if not self.enabled:
+            return iterable
+        return self._timed_iter(name, iterable)
+
+    def _timed_iter(self, name: str, iterable: Iterable):
+        it = iter(iterable)
+        while True:
+            token = self.start()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.cancel(token)
+                return
+            except BaseException:
+                self.cancel(token)
+                raise
+            self.stop(name, token)
+            yield item
+
+    def summary(self) -> dict:
+        wall = time.perf_counter() - self._t0
+        with self._lock:
+            stages = {name: s.summary(wall) for name, s in self.stages.items()}
+        return {
+            "tool": self.tool,
+            "argv": sys.argv[1:],
+            "wall_seconds": wall,
+            "cpu_seconds": time.process_time() - self._cpu0,
+            "stages": stages,
+        }
+
+    def print_report(self, summary: dict):
+        print(f"\n==== 效能量測：{summary['tool']}（牆鐘 {summary['wall_seconds']:.2f} 秒，"
+              f"CPU {summary['cpu_seconds']:.2f} 秒）====")
+        print(f"{'階段':12s} {'次數':>9s} {'總秒數':>9s} {'自身秒數':>9s} {'平均ms':>9s} {'p95ms':>9s}"
+              f" {'讀取MB':>9s} {'寫入MB':>9s} {'每秒':>9s}")
+        by_self = sorted(summary["stages"].items(), key=lambda kv: kv[1]["self_seconds"], reverse=True)
+        for name, s in by_self:
+            print(f"{name:12s} {s['count']:>9,d} {s['total_seconds']:>9.2f} {s['self_seconds']:>9.2f}"
+                  f" {s['mean_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['bytes_read'] / 1e6:>9.1f}"
+                  f" {s['bytes_written'] / 1e6:>9.1f} {s['per_second']:>9,.0f}")
+
+    def finish(self):
+        if not self.enabled or self._finished:
+            return
+        self._finished = True
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        summary = self.summary()
+        self.print_report(summary)
+        if self._json_path is not None:
+            with open(self._json_path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            print(f"效能量測 JSON：{self._json_path}")
+        if self._dump_path is not None:
+            if self._cprofile is not None:
+                self._cprofile.dump_stats(str(self._dump_path))
+            else:
+                self._sampler.dump(self._dump_path)
+            print(f"剖析結果：{self._dump_path}")
+
+
+# 各模組共用同一個實例；只有主程式呼叫 configure() 後才會開始記錄
+PROFILE = Profiler()
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+PyScript 工具共用的進度顯示與逐檔記錄（取代每個檔案印一到兩行的主控台輸出）：
+  - 主控台只保留一行狀態：已處理/總數、百分比、每秒件數、預估剩餘時間、各結果計數；
+    終端機上定時原地更新，輸出導向檔案或管線時改為每隔一段時間印一行
+  - 逐檔事件（--log）以 JSON lines 緩衝寫入，每行一筆：
+    {"t": 時間戳, "i": 序號, "event": 結果, "path": 來源路徑, ...其他欄位}
+  - --verbose 恢復原本逐檔印出處理過程的行為（此時不顯示狀態列）
+大量檔案時主控台（尤其 Windows 主控台、SSH 終端機）本身就會拖慢執行，預設模式幾乎不產生主控台輸出。
+
+用法：
+    from Progress import Progress, add_progress_arguments
+    add_progress_arguments(parser)
+    progress = Progress.from_args(args, {"copied": "已複製", "failed": "失敗"})
+    progress.start(total)                                   # total 未知時傳 None
+    progress.say(f"[{i}/{total}] 處理：{src}")               # 只在 --verbose 時印出
+    progress.event("copied", src, f"  -> 已複製到：{dst}", dst=dst)
+    progress.close()                                        # 印出最後狀態並寫完記錄檔
+"""
+import json
+import sys
+import threading
+import time
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional
+
+# 終端機上狀態列的更新間隔（秒）
+TTY_INTERVAL = 0.5
+# 輸出不是終端機（導向檔案、管線）時，每隔幾秒印一行狀態
+PIPE_INTERVAL = 10.0
+# 記錄檔寫入緩衝大小
+LOG_BUFFER = 1024 * 1024
+
+
+def add_progress_arguments(parser):
+    group = parser.add_argument_group("進度與記錄")
+    group.add_argument("-v", "--verbose", action="store_true",
+                       help="逐檔印出處理過程（原本的輸出方式；大量檔案時主控台輸出會拖慢執行）")
+    group.add_argument("--log", help="逐檔事件記錄檔（JSON lines，每行一筆，緩衝寫入）")
+    group.add_argument("--progress-interval", type=float, default=None,
+                       help=f"狀態列更新間隔（秒），預設終端機 {TTY_INTERVAL:g}、非終端機 {PIPE_INTERVAL:g}")
+
+
+def _display_width(text: str) -> int:
+    """主控台顯示寬度（全形字佔兩格），用於覆蓋上一次較長的狀態列。"""
+    return sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text)
+
+
+def _format_eta(secs: float) -> str:
+    secs = int(secs)
+    h, rem = divmod(secs, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}"
+
+
+class Progress:
+    def __init__(self, labels: Optional[Dict[str, str]] = None, verbose: bool = False,
+                 log_path: Optional[Path] = None, interval: Optional[float] = None, stream=None):
+        """
+        labels：結果代碼 → 狀態列顯示名稱（依此順序顯示；未列出的代碼以原名顯示）。
+        """
+        self.labels = dict(labels or {})
+        self.verbose = verbose
+        self.stream = stream or sys.stdout
+        try:
+            self.tty = self.stream.isatty()
+        except (AttributeError, ValueError):
+            self.tty = False
+        if interval is None:
+            interval = TTY_INTERVAL if self.tty else PIPE_INTERVAL
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.done = 0
+        self.total: Optional[int] = None
+        self.log_path = log_path
+        self._log = None
+        if log_path is not None:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._log = open(log_path, "w", encoding="utf-8", buffering=LOG_BUFFER)
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self._next = self._t0 + self.interval
+        self._shown = 0
+        self._finished = False
+
+    @classmethod
+    def from_args(cls, args, labels: Optional[Dict[str, str]] = None, verbose: Optional[bool] = None) -> "Progress":
+        """依 add_progress_arguments 的參數建立；verbose 可由呼叫端強制指定。"""
+        log_path = Path(args.log).expanduser().resolve() if args.log else None
+        return cls(labels, args.verbose if verbose is None else verbose, log_path, args.progress_interval)
+
+    def start(self, total: Optional[int] = None):
+        """開始計時；total 為預計處理的件數（未知時為 None，不顯示百分比與剩餘時間）。"""
+        with self._lock:
+            self.total = total
+            self._t0 = time.perf_counter()
+            self._next = self._t0 + self.interval
+
+    def say(self, text: str):
+        """只在 --verbose 時印出的訊息（例如「[i/total] 處理：...」）。"""
+        if self.verbose:
+            print(text, file=self.stream)
+
+    def log(self, event: str, path, **fields):
+        """只寫入記錄檔、不計入進度（例如預檢時已排除的項目）。"""
+        if self._log is None:
+            return
+        with self._lock:
+            self._write(event, path, fields)
+
+    def event(self, event: str, path, text: Optional[str] = None, **fields):
+        """
+        記錄一件處理完成：累加計數、寫入記錄檔；--verbose 時印出 text，否則視需要更新狀態列。
+        fields 為記錄檔的其他欄位（Path 等會轉成字串）。
+        """
+        with self._lock:
+            self.done += 1
+            self.counts[event] += 1
+            if self._log is not None:
+                self._write(event, path, fields)
+            if self.verbose:
+                if text:
+                    print(text, file=self.stream)
+                return
+            if self._finished:
+                return
+            now = time.perf_counter()
+            if now >= self._next:
+                self._next = now + self.interval
+                self._render(now)
+
+    def _write(self, event: str, path, fields: dict):
+        rec = {"t": round(time.time(), 3), "i": self.done, "event": event, "path": str(path)}
+        rec.update(fields)
+        self._log.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+
+    def status_line(self, now: Optional[float] = None) -> str:
+        elapsed = (now or time.perf_counter()) - self._t0
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        if self.total:
+            head = f"[{self.done:,}/{self.total:,}] {self.done / self.total:6.1%} {rate:,.0f} 件/秒"
+            if rate > 0 and self.done < self.total:
+                head += f" 剩餘 {_format_eta((self.total - self.done) / rate)}"
+        else:
+            head = f"[{self.done:,}] {rate:,.0f} 件/秒"
+        names = list(self.labels) + sorted(k for k in self.counts if k not in self.labels)
+        parts = [f"{self.labels.get(k, k)} {self.counts[k]:,}" for k in names if self.counts[k]]
+        return f"{head} | {' '.join(parts)}" if parts else head
+
+    def _render(self, now: float):
+        line = self.status_line(now)
+        if self.tty:
+            width = _display_width(line)
+            self.stream.write("\r" + line + " " * max(0, self._shown - width))
+            self._shown = width
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def finish(self):
+        """印出最後狀態（--verbose 時不印）；記錄檔保持開啟，長時間執行的工具之後仍可 log()。"""
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+            if not self.verbose and self.done:
+                now = time.perf_counter()
+                self._render(now)
+                if self.tty:
+                    self.stream.write("\n")
+                print(f"處理 {self.done:,} 件，耗時 {now - self._t0:.1f} 秒", file=self.stream)
+
+    def flush(self):
+        """把緩衝中的記錄寫到記錄檔（長時間執行時定期呼叫）。"""
+        if self._log is not None:
+            with self._lock:
+                self._log.flush()
+
+    def close(self):
+        """印出最後狀態並關閉記錄檔；可重複呼叫。"""
+        self.finish()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+                print(f"逐檔記錄：{self.log_path}", file=self.stream)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
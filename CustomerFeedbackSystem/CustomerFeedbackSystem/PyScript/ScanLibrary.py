@@ -0,0 +1,227 @@
+# 不需額外套件（.parquet/.feather 輸出需 pyarrow）
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\ScanLibrary.py "C:\Users\peter\OneDrive\Desktop\GMP文件庫(合併與重新命名)" -o "C:\Users\peter\OneDrive\Desktop\清單與驗證結果.xlsx" --count-docm-as-docx
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\ScanLibrary.py "D:\GMP文件庫" -o "D:\清單與驗證結果.csv" --workers 16 --scan-workers 16 --deep-ole --hash
+
+# -*- coding: utf-8 -*-
+"""
+一次掃描同時完成 ListAllFilePath.py（檔案清單）與 VerifyDoc.py（Word 格式檢查），輸出一份以路徑合併好的報告：
+  - 只走訪一次資料夾樹；每個 DirEntry 只 stat 一次（iter_items 取得後放在 ScanItem.st，各階段直接沿用）
+  - 每個檔案只開啟一次（classify 讀檔頭後，ZIP/OLE 解析沿用同一個檔案物件）
+  - 各欄位由可組合的階段（stage）產生，依序接在同一列：
+      inventory  ListAllFilePath 的清單欄位
+      verify     Kind / IsDocx / Note（--deep-ole 另加 Encrypted、Macros、WordVersion、Integrity）
+    --hash 另外加上 ContentHash（同 ListAllFilePath --hash：先依大小篩選，只讀可能重複的檔案）
+  - 輸出格式同 ListAllFilePath：.xlsx / .csv / .parquet / .feather
+資料夾列的 verify 欄位為空白。
+"""
+import argparse
+import stat
+from collections import Counter, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Sequence
+
+from ArrowStream import COLUMNAR_SUFFIXES
+from DirWalker import safe_stat, walk
+from ListAllFilePath import (
+    HEADERS, entry_row, export_to_columnar, export_to_csv_stream, export_to_excel, hash_rows,
+    write_duplicate_report,
+)
+from Profiler import PROFILE, add_profile_arguments
+from Progress import Progress, add_progress_arguments
+from VerifyDoc import DocDetails, classify
+from XlsxStream import EXCEL_MAX_ROWS
+
+# 掃描到的一個項目；st 為 iter_items 取得的 stat（沿用掃描執行緒的 DirEntry 快取，失敗時為 None），各階段不再 stat
+ScanItem = namedtuple("ScanItem", ["root", "entry", "is_dir", "st"])
+
+# 欄式輸出時 verify 欄位的型別（重複值多，用字典編碼）
+VERIFY_COLUMN_TYPES = {
+    "Kind": "category", "IsDocx": "category",
+    "Encrypted": "category", "Macros": "category", "WordVersion": "category", "Integrity": "category",
+}
+
+
+class Stage:
+    """階段：columns 為此階段產生的欄位，process() 回傳同樣順序的值（資料夾也會呼叫）。"""
+    columns: List[str] = []
+
+    def process(self, item: ScanItem) -> List[Any]:
+        raise NotImplementedError
+
+
+class InventoryStage(Stage):
+    """ListAllFilePath 的清單欄位。"""
+    columns = list(HEADERS)
+
+    def process(self, item: ScanItem) -> List[Any]:
+        return entry_row(item.root, item.entry, item.is_dir, item.st)
+
+
+class VerifyStage(Stage):
+    """VerifyDoc 的判定欄位；只對一般檔案執行 classify。"""
+
+    def __init__(self, deep_ole: bool = False, count_docm_as_docx: bool = False):
+        self.deep_ole = deep_ole
+        self.count_docm_as_docx = count_docm_as_docx
+        self.columns = ["Kind", "IsDocx", "Note"] + (list(DocDetails._fields) if deep_ole else [])
+
+    def process(self, item: ScanItem) -> List[Any]:
+        if item.is_dir:
+            is_file = False
+        elif item.st is not None:
+            is_file = stat.S_ISREG(item.st.st_mode)
+        else:
+            try:
+                is_file = item.entry.is_file(follow_symlinks=False)
+            except OSError:
+                is_file = False
+        if not is_file:
+            return [""] * len(self.columns)
+        kind, note, _, details = classify(Path(item.entry.path), self.deep_ole)
+        is_docx = (kind == "DOCX") or (self.count_docm_as_docx and kind == "DOCM")
+        row = [kind, "Y" if is_docx else "N", note]
+        if self.deep_ole:
+            row.extend(details)
+        return row
+
+
+def iter_items(roots: Sequence[Path], **walk_opts) -> Iterator[ScanItem]:
+    for root, entry, is_dir, _ in walk(roots, prestat=True, **walk_opts):
+        t = PROFILE.start()
+        st = safe_stat(entry)
+        PROFILE.stop("stat", t)
+        yield ScanItem(root, entry, is_dir, st)
+
+
+def run_stages(items: Iterable[ScanItem], stages: Sequence[Stage], workers: int = 1) -> Iterator[List[Any]]:
+    """
+    每個項目依序經過各階段，產出合併後的資料列（順序同掃描順序）。
+    workers > 1 時整列在執行緒池產生（讀檔的延遲可平行化），最多預先排入 workers * 4 列。
+    """
+    def build(item: ScanItem) -> List[Any]:
+        row = []
+        for stage in stages:
+            row.extend(stage.process(item))
+        return row
+
+    if workers <= 1:
+        for item in items:
+            yield build(item)
+        return
+
+    max_pending = workers * 4
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for item in items:
+            pending.append(ex.submit(build, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="一次掃描資料夾，同時輸出檔案清單與 Word 格式檢查結果（合併成一份報告）"
+    )
+    parser.add_argument("targets", nargs="+", help="要掃描的資料夾（可指定多個）")
+    parser.add_argument(
+        "-o", "--output", default=None,
+        help="輸出檔路徑：.xlsx / .csv（串流寫出）/ .parquet / .feather（需 pyarrow），"
+             "預設為目前資料夾下的 library_scan_<時間>.xlsx",
+    )
+    parser.add_argument("--workers", type=int, default=1,
+                        help="平行檢查檔案的執行緒數（網路磁碟建議 8~32），預設 1")
+    parser.add_argument("--scan-workers", type=int, default=1,
+                        help="同時掃描資料夾的執行緒數（>1 時輸出順序不固定），預設 1")
+    parser.add_argument("--include", action="append", help="只列出符合的檔案（萬用字元，可重複指定），例：*.doc*")
+    parser.add_argument("--exclude", action="append", help="排除符合的資料夾/檔案（萬用字元，可重複指定），例：~$*")
+    parser.add_argument("--max-depth", type=int, default=None, help="最大掃描深度（根目錄下第一層為 1）")
+    parser.add_argument("--count-docm-as-docx", action="store_true", help="將 DOCM 視為通過（IsDocx 為 Y）")
+    parser.add_argument("--deep-ole", action="store_true",
+                        help="深入檢查舊版 .doc：另輸出 Encrypted、Macros、WordVersion、Integrity 欄位")
+    parser.add_argument("--hash", action="store_true",
+                        help="計算內容雜湊（ContentHash 欄）並另外輸出重複檔案清單（*_重複檔案.csv）")
+    parser.add_argument("--hash-workers", type=int, default=8, help="計算雜湊的執行緒數，預設 8")
+    add_profile_arguments(parser)
+    add_progress_arguments(parser)
+    args = parser.parse_args()
+    PROFILE.configure(args, "ScanLibrary")
+
+    roots = [Path(t).expanduser().resolve() for t in args.targets]
+    for root in roots:
+        if not root.exists() or not root.is_dir():
+            raise SystemExit(f"找不到資料夾：{root}")
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_path = (
+        Path(args.output).expanduser().resolve()
+        if args.output
+        else Path.cwd() / f"library_scan_{timestamp}.xlsx"
+    )
+    if out_path.suffix.lower() not in (".xlsx", ".csv") + COLUMNAR_SUFFIXES:
+        out_path = out_path.with_suffix(".xlsx")
+
+    stages = [InventoryStage(), VerifyStage(args.deep_ole, args.count_docm_as_docx)]
+    headers = [c for stage in stages for c in stage.columns]
+    i_type = headers.index("Type")
+    i_kind = headers.index("Kind")
+    i_full = headers.index("FullPath")
+    i_size = headers.index("Size(bytes)")
+
+    items = PROFILE.iter("walk", iter_items(
+        roots, workers=args.scan_workers, include=args.include, exclude=args.exclude, max_depth=args.max_depth
+    ))
+    kinds: Counter = Counter()
+    totals = Counter()
+    progress = Progress.from_args(args, {"Folder": "資料夾", "DOCX": "DOCX", "DOC(legacy)": "DOC"})
+
+    def tracked(rows):
+        for row in rows:
+            kind = row[i_kind] or row[i_type]
+            if row[i_kind]:
+                kinds[kind] += 1
+            totals[row[i_type]] += 1
+            totals["bytes"] += row[i_size] or 0
+            progress.event(kind, row[i_full], f"{kind:11s} | {row[i_full]}")
+            yield row
+
+    progress.start()
+    rows = tracked(PROFILE.iter("row", run_stages(items, stages, args.workers)))
+
+    if args.hash:
+        with PROFILE.span("hash") as span:
+            rows, finder = hash_rows(rows, headers, workers=args.hash_workers)
+            span.read = finder.bytes_read
+        progress.close()
+        headers = headers + ["ContentHash"]
+        report = out_path.with_name(f"{out_path.stem}_重複檔案.csv")
+        write_duplicate_report(finder, report)
+        print(f"重複群組：{len(finder.groups)}，可節省空間：{finder.wasted_bytes} bytes")
+        print(f"重複檔案清單：{report}")
+
+    suffix = out_path.suffix.lower()
+    sheets = 1
+    with PROFILE.span("export"):
+        if suffix == ".csv":
+            export_to_csv_stream(rows, headers, out_path)
+        elif suffix in COLUMNAR_SUFFIXES:
+            export_to_columnar(rows, headers, out_path, VERIFY_COLUMN_TYPES)
+        else:
+            sheets = export_to_excel(rows, headers, out_path)
+    progress.close()
+    PROFILE.add_bytes("export", written=out_path.stat().st_size)
+
+    print("\n=== 統計 ===")
+    print(f"資料夾：{totals['Folder']}，檔案：{totals['File']}，檔案總大小：{totals['bytes']} bytes")
+    for k, v in sorted(kinds.items(), key=lambda kv: -kv[1]):
+        print(f"{k:11s}: {v}")
+    if sheets > 1:
+        print(f"資料列超過 Excel 單一工作表上限（{EXCEL_MAX_ROWS:,} 列），已分成 {sheets} 個工作表。")
+    print(f"已完成，輸出檔：{out_path}")
+
+
+if __name__ == "__main__":
+    main()
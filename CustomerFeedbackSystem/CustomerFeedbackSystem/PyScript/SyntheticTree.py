@@ -0,0 +1,351 @@
+# 不需額外套件
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\SyntheticTree.py D:\bench\tree_10k --files 10000 --depth 3 --fanout 8
+# 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\SyntheticTree.py D:\bench\tree_100k --files 100000 --mix docx=40,docm=5,doc=25,rtf=5,junk=25 --median-kb 48
+
+# -*- coding: utf-8 -*-
+"""
+產生可重現的測試文件樹（Benchmark.py suite 使用，也可單獨執行）：
+  - 資料夾深度、分支數、檔案數可調整；檔案大小依對數常態分布（中位數、離散度、上限）
+  - 內容是真的 DOCX / DOCM（ZIP + [Content_Types].xml）、舊版 DOC（OLE + FIB，部分加密或含巨集）、
+    RTF 與垃圾檔（副檔名故意取 .docx/.doc 等），VerifyDoc 可判斷出各自的類型
+  - 同時輸出路徑清單 list.xlsx / list.csv / list.txt（FullPath、Kind 兩欄），供 CopyOthers / DocToDocx / PathList 使用
+  - 相同參數與 seed 產生完全相同的樹；已存在且參數相同時直接沿用（synthetic.json 記錄參數與統計）
+每個檔案內容都不同（檔尾或保留區寫入序號），內容雜湊不會把整批視為重複。
+"""
+import argparse
+import io
+import json
+import math
+import random
+import struct
+import zipfile
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from CsvStream import CsvStreamWriter
+from XlsxStream import XlsxStreamWriter
+
+MANIFEST_NAME = "synthetic.json"
+LIST_HEADERS = ["FullPath", "Kind"]
+DEFAULT_MIX = "docx=40,docm=5,doc=25,rtf=5,junk=25"
+
+# 各類型可能的副檔名（垃圾檔與 RTF 故意取容易誤認的副檔名）
+EXTENSIONS = {
+    "docx": [".docx"],
+    "docm": [".docm"],
+    "doc": [".doc"],
+    "rtf": [".rtf", ".doc"],
+    "junk": [".docx", ".doc", ".pdf", ".txt"],
+}
+# 各類型最小檔案大小（bytes）
+MIN_SIZE = {"docx": 1024, "docm": 1024, "doc": 12 * 1024, "rtf": 256, "junk": 16}
+# 大小以 2^(1/4) 為級距量化，同一級距共用範本，只改寫序號
+SIZE_STEPS_PER_DOUBLING = 4
+
+WORD_MAIN_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml",
+    "docm": "application/vnd.ms-word.document.macroEnabled.main+xml",
+}
+
+# ---- OLE（Compound File）----
+_SS = 512
+_FATSECT = 0xFFFFFFFD
+_ENDOFCHAIN = 0xFFFFFFFE
+_FREESECT = 0xFFFFFFFF
+_NOSTREAM = 0xFFFFFFFF
+# nFib 0x00C1 + fibRgCswNew 的 nFibNew
+DOC_VERSIONS = [0x00C1, 0x00D9, 0x0101, 0x010C, 0x0112]
+# WordDocument 資料流中寫入序號的位置（FIB 之後）
+DOC_SALT_OFFSET = 0x400
+MAX_DOC_STREAM = 6 * 1024 * 1024
+
+
+def make_cfb(streams: List[Tuple[str, bytes]], storages: Tuple[str, ...] = ()) -> Tuple[bytes, Dict[str, int]]:
+    """
+    產生版本 3（512 bytes 磁區）的 Compound File，所有資料流都放在一般 FAT（不足 4096 bytes 會補齊）。
+    回傳 (內容, {資料流名稱: 在檔案中的起始位移})。
+    """
+    per = _SS // 4
+    entries = [("Root Entry", 5, b"")] + [(n, 1, b"") for n in storages]
+    entries += [(n, 2, d.ljust(4096, b"\0")) for n, d in streams]
+    ndir = -(-len(entries) * 128 // _SS)
+    data_secs = sum(-(-len(d) // _SS) for _, t, d in entries if t == 2)
+    nfat = 1
+    while nfat * per < nfat + ndir + data_secs:
+        nfat += 1
+    if nfat > 109:
+        raise ValueError("資料流過大（超過標頭 DIFAT 可容納的 FAT 磁區數）")
+
+    fat = [_FREESECT] * (nfat * per)
+    for i in range(nfat):
+        fat[i] = _FATSECT
+    for i in range(ndir):
+        fat[nfat + i] = nfat + i + 1 if i < ndir - 1 else _ENDOFCHAIN
+    sec = nfat + ndir
+    starts, blobs, offsets = [], [], {}
+    for name, etype, data in entries:
+        if etype != 2:
+            starts.append(_ENDOFCHAIN)
+            continue
+        k = -(-len(data) // _SS)
+        starts.append(sec)
+        offsets[name] = (sec + 1) * _SS
+        for j in range(k):
+            fat[sec + j] = sec + j + 1 if j < k - 1 else _ENDOFCHAIN
+        blobs.append(data.ljust(k * _SS, b"\0"))
+        sec += k
+
+    dir_bytes = io.BytesIO()
+    for idx, (name, etype, data) in enumerate(entries):
+        raw = name.encode("utf-16-le") + b"\0\0"
+        # 根目錄的子項目以 right 指標串成一列（退化但合法的紅黑樹，讀取器由根項目的 child 走訪）
+        right = idx + 1 if 1 <= idx < len(entries) - 1 else _NOSTREAM
+        child = 1 if idx == 0 and len(entries) > 1 else _NOSTREAM
+        dir_bytes.write(raw.ljust(64, b"\0"))
+        dir_bytes.write(struct.pack("<HBB3I", len(raw), etype, 1, _NOSTREAM, right, child))
+        dir_bytes.write(b"\0" * 36)
+        dir_bytes.write(struct.pack("<IQ", starts[idx], len(data)))
+    directory = dir_bytes.getvalue().ljust(ndir * _SS, b"\0")
+
+    head = b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1" + b"\0" * 16
+    head += struct.pack("<5H", 0x3E, 3, 0xFFFE, 9, 6) + b"\0" * 6
+    head += struct.pack("<9I", 0, nfat, nfat, 0, 4096, _ENDOFCHAIN, 0, _ENDOFCHAIN, 0)
+    head += b"".join(struct.pack("<I", i if i < nfat else _FREESECT) for i in range(109))
+    fat_bytes = b"".join(struct.pack("<I", v) for v in fat)
+    return head + fat_bytes + directory + b"".join(blobs), offsets
+
+
+def make_fib(version: int, encrypted: bool = False) -> bytes:
+    """最小的 Word 97 以後 FIB：FibBase + 空的 fibRgW/fibRgLw/fibRgFcLcb + nFibNew。"""
+    flags = 0x0100 if encrypted else 0
+    fib = struct.pack("<5HH", 0xA5EC, 0x00C1, 0, 0x0409, 0, flags).ljust(32, b"\0")
+    fib += struct.pack("<H", 14) + b"\0" * 28
+    fib += struct.pack("<H", 22) + b"\0" * 88
+    fib += struct.pack("<H", 0x5D) + b"\0" * (0x5D * 8)
+    if version > 0x00C1:
+        fib += struct.pack("<HHH", 2, version, 0)
+    else:
+        fib += struct.pack("<H", 0)
+    return fib
+
+
+def make_doc(size: int, version: int = 0x00C1, encrypted: bool = False, macros: bool = False) -> Tuple[bytes, int]:
+    """回傳 (舊版 .doc 內容, 序號寫入位置)。"""
+    # 標頭 DIFAT 最多容納 109 個 FAT 磁區（約 7 MB），再大改用較小的資料流
+    body = make_fib(version, encrypted).ljust(min(max(size - 8 * 1024, 4096), MAX_DOC_STREAM), b"\0")
+    storages = ("Macros",) if macros else ()
+    data, offsets = make_cfb([("WordDocument", body), ("1Table", b"\x01" * 512)], storages)
+    return data, offsets["WordDocument"] + DOC_SALT_OFFSET
+
+
+def make_ooxml_doc(size: int, kind: str = "docx", rng: random.Random = None) -> bytes:
+    """回傳 DOCX/DOCM 內容：以一個不壓縮的 media 項目補到指定大小；zip 註解為空（之後寫入序號）。"""
+    rng = rng or random.Random(0)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(
+            "[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Default Extension="bin" ContentType="application/octet-stream"/>'
+            f'<Override PartName="/word/document.xml" ContentType="{WORD_MAIN_TYPES[kind]}"/>'
+            '</Types>',
+        )
+        zf.writestr(
+            "_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+            'officeDocument" Target="word/document.xml"/></Relationships>',
+        )
+        zf.writestr(
+            "word/document.xml",
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+            + "<w:p><w:r><w:t>測試文件內容</w:t></w:r></w:p>" * 20
+            + "</w:body></w:document>",
+        )
+        pad = size - buf.tell() - 400
+        if pad > 0:
+            zf.writestr("word/media/pad.bin", rng.randbytes(pad), zipfile.ZIP_STORED)
+    return buf.getvalue()
+
+
+def make_rtf(size: int) -> bytes:
+    head = b"{\\rtf1\\ansi\\deff0{\\fonttbl{\\f0 Times New Roman;}}\\f0\\fs24 "
+    return head + b"Synthetic RTF document. " * max(1, (size - len(head)) // 24) + b"}"
+
+
+def _bucket(size: int) -> int:
+    step = round(math.log2(max(size, 1)) * SIZE_STEPS_PER_DOUBLING)
+    return int(2 ** (step / SIZE_STEPS_PER_DOUBLING))
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """"docx=40,doc=25,junk=35" → 權重（未列出的類型為 0）。"""
+    mix = {}
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        kind, _, weight = item.partition("=")
+        kind = kind.strip().lower()
+        if kind not in EXTENSIONS:
+            raise ValueError(f"不支援的檔案類型：{kind}（可用：{', '.join(EXTENSIONS)}）")
+        mix[kind] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("類型比例不可全為 0")
+    return mix
+
+
+def iter_dirs(root: Path, depth: int, fanout: int) -> List[Path]:
+    """依寬度優先列出 root 之下 depth 層、每層 fanout 個子資料夾（含 root）。"""
+    dirs = [root]
+    level = [root]
+    for d in range(1, depth + 1):
+        level = [p / f"{'部門' if d == 1 else '資料夾'}{j:02d}" for p in level for j in range(fanout)]
+        dirs.extend(level)
+    return dirs
+
+
+class _Templates:
+    """依 (類型, 大小級距, 變化) 快取範本；每個檔案只需複製範本並寫入序號。"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self._cache: Dict[tuple, Tuple[bytes, int]] = {}
+
+    def get(self, kind: str, size: int, variant: tuple) -> Tuple[bytes, int]:
+        key = (kind, _bucket(size), variant)
+        hit = self._cache.get(key)
+        if hit is None:
+            size = key[1]
+            if kind in ("docx", "docm"):
+                hit = make_ooxml_doc(size, kind, rng=self.rng), -1
+            elif kind == "doc":
+                hit = make_doc(size, *variant)
+            elif kind == "rtf":
+                hit = make_rtf(size), -1
+            else:
+                # 垃圾檔開頭固定為文字，不會被誤認為 ZIP/OLE/RTF
+                hit = b"JUNK" + self.rng.randbytes(max(size - 4, 0)), -1
+            self._cache[key] = hit
+        return hit
+
+
+def _salted(kind: str, data: bytes, salt_at: int, i: int) -> bytes:
+    tag = f"#{i:09d}".encode()
+    if kind in ("docx", "docm"):
+        # 範本的 zip 註解為空：改寫 EOCD 的註解長度並附加序號
+        return data[:-2] + struct.pack("<H", len(tag)) + tag
+    if kind == "doc":
+        return data[:salt_at] + tag + data[salt_at + len(tag):]
+    if kind == "rtf":
+        return data[:-1] + b" " + tag + b"}"
+    return data[:4] + tag + data[4 + len(tag):]
+
+
+def iter_plan(files: int, mix: Dict[str, float], median_kb: float, sigma: float, max_kb: float,
+              seed: int) -> Iterator[Tuple[int, str, str, int, tuple]]:
+    """依序產出 (序號, 類型, 副檔名, 大小, 變化)；同一 seed 結果相同。"""
+    rng = random.Random(seed)
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+    mu = math.log(median_kb * 1024)
+    for i in range(files):
+        kind = rng.choices(kinds, weights)[0]
+        size = int(min(rng.lognormvariate(mu, sigma), max_kb * 1024))
+        size = max(size, MIN_SIZE[kind])
+        ext = rng.choice(EXTENSIONS[kind])
+        variant = ()
+        if kind == "doc":
+            # 約 5% 加密、5% 含巨集
+            variant = (rng.choice(DOC_VERSIONS), rng.random() < 0.05, rng.random() < 0.05)
+        yield i, kind, ext, size, variant
+
+
+def generate(root: Path, files: int, depth: int = 3, fanout: int = 8, mix: str = DEFAULT_MIX,
+             median_kb: float = 32, sigma: float = 1.0, max_kb: float = 4096, seed: int = 1,
+             force: bool = False) -> dict:
+    """
+    產生測試樹與路徑清單，回傳 synthetic.json 的內容。
+    root 下：tree/（文件樹）、list.xlsx、list.csv、list.txt、synthetic.json。
+    """
+    params = {
+        "files": files, "depth": depth, "fanout": fanout, "mix": mix,
+        "median_kb": median_kb, "sigma": sigma, "max_kb": max_kb, "seed": seed,
+    }
+    manifest_path = root / MANIFEST_NAME
+    if not force and manifest_path.exists():
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        if old.get("params") == params:
+            return old
+
+    weights = parse_mix(mix)
+    tree = root / "tree"
+    dirs = iter_dirs(tree, depth, fanout)
+    for d in dirs:
+        d.mkdir(parents=True, exist_ok=True)
+
+    templates = _Templates(random.Random(seed + 1))
+    kinds: Counter = Counter()
+    total_bytes = 0
+    csv_writer = CsvStreamWriter(root / "list.csv", LIST_HEADERS).open()
+    with XlsxStreamWriter(root / "list.xlsx", LIST_HEADERS, sheet_title="清單") as xlsx, \
+            open(root / "list.txt", "w", encoding="utf-8") as txt:
+        for i, kind, ext, size, variant in iter_plan(files, weights, median_kb, sigma, max_kb, seed):
+            data, salt_at = templates.get(kind, size, variant)
+            path = dirs[i % len(dirs)] / f"文件_{i:07d}{ext}"
+            with open(path, "wb") as f:
+                f.write(_salted(kind, data, salt_at, i))
+            kinds[kind] += 1
+            total_bytes += len(data)
+            full = str(path)
+            xlsx.append([full, kind])
+            csv_writer.writerow({"FullPath": full, "Kind": kind})
+            txt.write(full + "\n")
+    csv_writer.close()
+
+    manifest = {
+        "params": params,
+        "dirs": len(dirs),
+        "kinds": dict(kinds),
+        "total_bytes": total_bytes,
+        "tree": str(tree),
+        "lists": {ext: str(root / f"list{ext}") for ext in (".xlsx", ".csv", ".txt")},
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="產生可重現的測試文件樹與路徑清單（效能量測用）")
+    parser.add_argument("root", help="輸出資料夾（其下建立 tree/ 與 list.xlsx/.csv/.txt）")
+    parser.add_argument("--files", type=int, default=10_000, help="檔案數，預設 10000")
+    parser.add_argument("--depth", type=int, default=3, help="資料夾深度，預設 3")
+    parser.add_argument("--fanout", type=int, default=8, help="每層子資料夾數，預設 8")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"類型比例（docx/docm/doc/rtf/junk），預設 {DEFAULT_MIX}")
+    parser.add_argument("--median-kb", type=float, default=32, help="檔案大小中位數（KB），預設 32")
+    parser.add_argument("--size-sigma", type=float, default=1.0, help="檔案大小對數常態分布的離散度，預設 1.0")
+    parser.add_argument("--max-kb", type=float, default=4096, help="單檔大小上限（KB），預設 4096")
+    parser.add_argument("--seed", type=int, default=1, help="亂數種子，預設 1")
+    parser.add_argument("--force", action="store_true", help="即使參數相同也重新產生")
+    args = parser.parse_args()
+
+    root = Path(args.root).expanduser().resolve()
+    root.mkdir(parents=True, exist_ok=True)
+    m = generate(root, args.files, args.depth, args.fanout, args.mix, args.median_kb,
+                 args.size_sigma, args.max_kb, args.seed, args.force)
+    print(f"資料夾：{m['dirs']}，檔案：{sum(m['kinds'].values())}，總大小：{m['total_bytes']} bytes")
+    for kind, n in sorted(m["kinds"].items()):
+        print(f"  {kind:5s}: {n}")
+    print(f"文件樹：{m['tree']}")
+    for path in m["lists"].values():
+        print(f"路徑清單：{path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,141 +1,627 @@
-# 安裝套件：pip install olefile
+# 不需額外套件（OLE 目錄以內建精簡讀取器解析）
 # 用法：python D:\系統資料\project\itriDoc\CustomerFeedbackSystem\CustomerFeedbackSystem\PyScript\VerifyDoc.py "C:\Users\peter\OneDrive\Desktop\GMP文件庫(合併與重新命名)" --csv "C:\Users\peter\OneDrive\Desktop\doc驗證結果.csv" --count-docm-as-docx
 
 # -*- coding: utf-8 -*-
 import argparse
 import os
 from pathlib import Path
-import csv
+import sqlite3
 import zipfile
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
-# 可更準確辨識舊版 .doc（OLE 結構內要有 WordDocument）
-try:
-    import olefile  # pip install olefile
-    HAS_OLEFILE = True
-except Exception:
-    HAS_OLEFILE = False
+from CsvStream import CsvStreamWriter
+from DirWalker import walk, safe_stat
+from OoxmlSniff import WORD_MAIN_TYPES, sniff_word_ooxml
+from Profiler import PROFILE, add_profile_arguments
+from Progress import Progress, add_progress_arguments
 
 ZIP_MAGIC = b"PK\x03\x04"
 ZIP_EMPTY_MAGIC = b"PK\x05\x06"  # 空 ZIP
 OLE_MAGIC = b"\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1"
 
+# 讀一次檔頭即可涵蓋 magic 判斷與 OLE 標頭（OLE 標頭固定 512 bytes）
+HEAD_SIZE = 512
+
+def magic_from_head(head: bytes) -> str:
+    """由已讀取的檔頭判斷：zip / ole / rtf / unknown"""
+    if head.startswith(ZIP_MAGIC) or head.startswith(ZIP_EMPTY_MAGIC):
+        return "zip"
+    if head.startswith(OLE_MAGIC):
+        return "ole"
+    if head[:200].lstrip().startswith(b"{\\rtf"):
+        return "rtf"
+    return "unknown"
+
 def sniff_magic(path: Path) -> str:
     """檔頭偵測：zip / ole / rtf / unknown"""
     try:
         with open(path, "rb") as f:
-            head8 = f.read(8)
-            f.seek(0)
-            head200 = f.read(200).lstrip()
+            head = f.read(HEAD_SIZE)
     except Exception:
         return "unknown"
-    if head8.startswith(ZIP_MAGIC) or head8.startswith(ZIP_EMPTY_MAGIC):
-        return "zip"
-    if head8.startswith(OLE_MAGIC):
-        return "ole"
-    if head200.startswith(b"{\\rtf"):
-        return "rtf"
-    return "unknown"
+    return magic_from_head(head)
+
+def _docx_from_zipfile(f) -> tuple[bool, str, str]:
+    """以 zipfile 完整解析判斷（OoxmlSniff 無法處理的 ZIP64、加密等情況使用）。"""
+    try:
+        with zipfile.ZipFile(f, "r") as zf:
+            names = {n.lower(): n for n in zf.namelist()}
+            if "[content_types].xml" not in names or "word/document.xml" not in names:
+                return False, "缺少必要檔", ""
+            data = zf.read(names["[content_types].xml"])
+    except Exception as e:
+        return False, f"ZIP 解析失敗：{e}", ""
+
+    found = [(data.find(ct), kind) for ct, kind in WORD_MAIN_TYPES.items() if ct in data]
+    if found:
+        return True, min(found)[1], ""
+    return False, "不是 Word OOXML", ""
+
+def _docx_from_zip(f) -> tuple[bool, str, str]:
+    """
+    以已開啟的檔案物件判斷 ZIP 是否為 Word OOXML，回傳 (是否為 Word, Kind 或失敗原因, Note)。
+    先以 OoxmlSniff 只讀中央目錄與 [Content_Types].xml 開頭，無法判斷時才改用 zipfile。
+    """
+    try:
+        result = sniff_word_ooxml(f)
+    except OSError as e:
+        return False, f"ZIP 解析失敗：{e}", ""
+    if result is None:
+        f.seek(0)
+        result = _docx_from_zipfile(f)
+    return result
 
 def is_real_docx_or_docm(path: Path) -> tuple[bool, str]:
     """
-    檢查是否為真 DOCX/DOCM：
+    檢查是否為真 Word OOXML：
       - ZIP 結構
       - 內含 [Content_Types].xml 與 word/document.xml
-      - Main ContentType 判定為 DOCX 或 DOCM
+      - Main ContentType 判定為 DOCX / DOCM / DOTX / DOTM
+    回傳 (是否為 Word, Kind 或失敗原因)。
     """
     try:
-        with zipfile.ZipFile(path, "r") as zf:
-            names = set(zf.namelist())
-            if "[Content_Types].xml" not in names or "word/document.xml" not in names:
-                return False, "缺少必要檔"
-            data = zf.read("[Content_Types].xml").decode("utf-8", errors="ignore")
+        with open(path, "rb") as f:
+            ok, kind, _ = _docx_from_zip(f)
+            return ok, kind
     except Exception as e:
         return False, f"ZIP 解析失敗：{e}"
 
-    if "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml" in data:
-        return True, "DOCX"
-    if "application/vnd.ms-word.document.macroEnabled.main+xml" in data:
-        return True, "DOCM"
-    return False, "不是 Word OOXML"
+# OLE（Compound File）結構常數
+OLE_ENDOFCHAIN = 0xFFFFFFFE
+OLE_FREESECT = 0xFFFFFFFF
+OLE_NOSTREAM = 0xFFFFFFFF  # 目錄項目 left/right/child 為空
+OLE_MAXREGSECT = 0xFFFFFFFA
+OLE_DIR_ENTRY_SIZE = 128
+OLE_HEADER_DIFAT = 109
+OLE_STORAGE = 1
+
+# Word FIB（File Information Block，WordDocument 資料流開頭）
+FIB_IDENT = 0xA5EC
+FIB_F_DOT = 0x0001
+FIB_F_ENCRYPTED = 0x0100
+FIB_F_OBFUSCATED = 0x8000
+# 讀到 fibRgCswNew（Word 2000 以後的 nFibNew）所需的長度上限
+FIB_READ = 2048
+# nFib / nFibNew → Word 版本
+WORD_VERSIONS = {
+    0x0065: "Word 6.0", 0x0066: "Word 6.0", 0x0067: "Word 6.0",
+    0x0068: "Word 95", 0x0069: "Word 95",
+    0x00C1: "Word 97", 0x00D9: "Word 2000", 0x0101: "Word 2002",
+    0x010C: "Word 2003", 0x0112: "Word 2007",
+}
+# 含 VBA 巨集的儲存區名稱（Word 97 以後）
+MACRO_STORAGES = {"macros", "_vba_project_cur"}
+
+# --deep-ole 時輸出的欄位；非 .doc 或未開啟時皆為空字串
+DocDetails = namedtuple("DocDetails", ["Encrypted", "Macros", "WordVersion", "Integrity"])
+NO_DETAILS = DocDetails("", "", "", "")
+
+class OleReader:
+    """
+    精簡的 OLE 目錄讀取器：只讀標頭與實際用到的 FAT 項目/目錄磁區，
+    不像 olefile 會一次載入整個 FAT 與目錄。
+    """
+
+    def __init__(self, f, head: bytes):
+        if len(head) < HEAD_SIZE or not head.startswith(OLE_MAGIC):
+            raise ValueError("OLE 標頭不完整")
+        self.f = f
+        shift = int.from_bytes(head[0x1E:0x20], "little")
+        if shift not in (9, 12):
+            raise ValueError(f"不支援的磁區大小 2^{shift}")
+        self.sector_size = 1 << shift
+        self.fat_sector_count = int.from_bytes(head[0x2C:0x30], "little")
+        self.first_dir_sector = int.from_bytes(head[0x30:0x34], "little")
+        self.mini_cutoff = int.from_bytes(head[0x38:0x3C], "little")
+        self.first_difat_sector = int.from_bytes(head[0x44:0x48], "little")
+        self.difat = [
+            int.from_bytes(head[0x4C + i * 4:0x50 + i * 4], "little")
+            for i in range(OLE_HEADER_DIFAT)
+        ]
+        self.f.seek(0, os.SEEK_END)
+        self.file_size = self.f.tell()
+        self.max_sectors = max(self.file_size // self.sector_size, 1)
+        self._fat_cache = {}
+        # 目錄磁區鏈（依序找到的磁區編號）與已讀取的目錄磁區
+        self._dir_sids = [self.first_dir_sector]
+        self._dir_cache = {}
+
+    def read_sector(self, sid: int) -> bytes:
+        if sid > OLE_MAXREGSECT:
+            raise ValueError(f"無效磁區編號 {sid:#x}")
+        self.f.seek((sid + 1) * self.sector_size)
+        data = self.f.read(self.sector_size)
+        if len(data) < self.sector_size:
+            raise ValueError("檔案被截斷")
+        return data
+
+    def _fat_sector_id(self, index: int) -> int:
+        """第 index 個 FAT 磁區的位置（超過標頭 109 筆時沿 DIFAT 鏈尋找）。"""
+        if index < OLE_HEADER_DIFAT:
+            return self.difat[index]
+        per = self.sector_size // 4 - 1
+        index -= OLE_HEADER_DIFAT
+        sid = self.first_difat_sector
+        for _ in range(index // per):
+            sid = int.from_bytes(self.read_sector(sid)[-4:], "little")
+        pos = (index % per) * 4
+        return int.from_bytes(self.read_sector(sid)[pos:pos + 4], "little")
+
+    def next_sector(self, sid: int) -> int:
+        per = self.sector_size // 4
+        fat_index = sid // per
+        fat_sector = self._fat_cache.get(fat_index)
+        if fat_sector is None:
+            fat_sector = self.read_sector(self._fat_sector_id(fat_index))
+            self._fat_cache[fat_index] = fat_sector
+        pos = (sid % per) * 4
+        return int.from_bytes(fat_sector[pos:pos + 4], "little")
+
+    def _dir_entry(self, did: int) -> bytes:
+        """第 did 個目錄項目（沿目錄磁區鏈定位，已讀過的磁區會快取）。"""
+        per = self.sector_size // OLE_DIR_ENTRY_SIZE
+        index = did // per
+        while len(self._dir_sids) <= index:
+            if len(self._dir_sids) >= self.max_sectors:
+                raise ValueError("目錄磁區鏈循環")
+            sid = self.next_sector(self._dir_sids[-1])
+            if sid == OLE_ENDOFCHAIN:
+                raise ValueError(f"目錄項目 {did} 超出目錄範圍")
+            self._dir_sids.append(sid)
+        data = self._dir_cache.get(index)
+        if data is None:
+            data = self._dir_cache[index] = self.read_sector(self._dir_sids[index])
+        off = (did % per) * OLE_DIR_ENTRY_SIZE
+        return data[off:off + OLE_DIR_ENTRY_SIZE]
+
+    def iter_root_entries(self):
+        """
+        產出根目錄底下一層的 (名稱, 類型, 起始磁區, 大小)：由根項目的 child 沿紅黑樹的 left/right 走訪，
+        不會進入子儲存區（例如 .xls/.ppt 內嵌 Word 物件的 MBD…/WordDocument）。
+        """
+        root = self._dir_entry(0)
+        stack = [int.from_bytes(root[0x4C:0x50], "little")]
+        seen = set()
+        while stack:
+            did = stack.pop()
+            if did == OLE_NOSTREAM:
+                continue
+            if did in seen:
+                raise ValueError("目錄樹循環")
+            seen.add(did)
+            e = self._dir_entry(did)
+            stack.append(int.from_bytes(e[0x48:0x4C], "little"))
+            stack.append(int.from_bytes(e[0x44:0x48], "little"))
+            name_len = int.from_bytes(e[0x40:0x42], "little")
+            etype = e[0x42]
+            if etype == 0 or name_len < 2 or name_len > 64:
+                continue
+            name = e[:name_len - 2].decode("utf-16-le", errors="ignore")
+            start = int.from_bytes(e[0x74:0x78], "little")
+            size = int.from_bytes(e[0x78:0x80], "little")
+            yield name, etype, start, size
+
+    def exists(self, name: str) -> bool:
+        """根目錄下一層是否有此名稱的資料流/儲存區（名稱不分大小寫）。"""
+        target = name.lower()
+        return any(n.lower() == target for n, _, _, _ in self.iter_root_entries())
+
+    def read_stream(self, start: int, size: int, limit: int) -> bytes:
+        """沿 FAT 鏈讀出資料流開頭最多 limit bytes（只讀需要的磁區）。"""
+        want = min(size, limit)
+        parts = []
+        got = 0
+        sid = start
+        while got < want:
+            if sid == OLE_ENDOFCHAIN:
+                raise ValueError("資料流磁區鏈提前結束")
+            parts.append(self.read_sector(sid))
+            got += self.sector_size
+            if got < want:
+                sid = self.next_sector(sid)
+        return b"".join(parts)[:want]
+
+    def is_truncated(self) -> bool:
+        """
+        由最後一個有內容的 FAT 磁區找出最大的已配置磁區編號，檔案長度不足即為截斷。
+        FAT 從尾端往前找，通常只需讀一個磁區。
+        """
+        per = self.sector_size // 4
+        for index in range(self.fat_sector_count - 1, -1, -1):
+            sid = self._fat_sector_id(index)
+            if sid > OLE_MAXREGSECT or sid >= self.max_sectors:
+                return True
+            data = self.read_sector(sid)
+            for pos in range(per - 1, -1, -1):
+                if int.from_bytes(data[pos * 4:pos * 4 + 4], "little") != OLE_FREESECT:
+                    highest = index * per + pos
+                    return (highest + 2) * self.sector_size > self.file_size
+        return False
+
+def _ole_word_doc(f, head: bytes) -> tuple[bool, str]:
+    """以已開啟的檔案物件與檔頭判斷 OLE 是否為舊版 Word .doc。"""
+    try:
+        if OleReader(f, head).exists("WordDocument"):
+            return True, "DOC(legacy)"
+        return False, "OLE 但無 WordDocument（可能是 XLS/PPT）"
+    except Exception as e:
+        return False, f"OLE 解析失敗：{e}"
+
+def _word_version(fib: bytes) -> str:
+    """nFib（Word 97 以後另看 fibRgCswNew 內的 nFibNew）轉為版本名稱。"""
+    n_fib = int.from_bytes(fib[2:4], "little")
+    if n_fib >= 0x00C1:
+        # FibBase(32) + csw + fibRgW + cslw + fibRgLw + cbRgFcLcb + fibRgFcLcbBlob + cswNew + nFibNew
+        pos = 32
+        csw = int.from_bytes(fib[pos:pos + 2], "little")
+        pos += 2 + csw * 2
+        cslw = int.from_bytes(fib[pos:pos + 2], "little")
+        pos += 2 + cslw * 4
+        cb = int.from_bytes(fib[pos:pos + 2], "little")
+        pos += 2 + cb * 8
+        if pos + 4 <= len(fib) and int.from_bytes(fib[pos:pos + 2], "little") > 0:
+            n_fib = int.from_bytes(fib[pos + 2:pos + 4], "little") or n_fib
+    return WORD_VERSIONS.get(n_fib, f"nFib {n_fib:#06x}")
+
+def _ole_word_doc_deep(f, head: bytes) -> tuple[bool, str, DocDetails]:
+    """
+    --deep-ole：除了 WordDocument 是否存在，另讀 FIB 開頭與 FAT 最後一個磁區，判斷
+    加密（fEncrypted / fObfuscated）、是否含巨集儲存區、Word 版本、檔案是否截斷或損毀。
+    """
+    try:
+        ole = OleReader(f, head)
+        word = None
+        macros = False
+        for name, etype, start, size in ole.iter_root_entries():
+            lname = name.lower()
+            if lname == "worddocument" and word is None:
+                word = (start, size)
+            elif etype == OLE_STORAGE and lname in MACRO_STORAGES:
+                macros = True
+        if word is None:
+            return False, "OLE 但無 WordDocument（可能是 XLS/PPT）", NO_DETAILS
+    except Exception as e:
+        return False, f"OLE 解析失敗：{e}", NO_DETAILS
+
+    macro_flag = "Y" if macros else "N"
+    try:
+        truncated = ole.is_truncated()
+    except ValueError:
+        truncated = True
+    start, size = word
+    if size < ole.mini_cutoff:
+        # Word 寫出的 WordDocument 一定大於 mini stream 門檻（4096）
+        return True, f"WordDocument 只有 {size} bytes", DocDetails("", macro_flag, "", "CORRUPT")
+    try:
+        fib = ole.read_stream(start, size, FIB_READ)
+    except ValueError as e:
+        return True, f"FIB 讀取失敗：{e}", DocDetails("", macro_flag, "", "TRUNCATED" if truncated else "CORRUPT")
+    if len(fib) < 32 or int.from_bytes(fib[0:2], "little") != FIB_IDENT:
+        return True, "FIB 標記不正確", DocDetails("", macro_flag, "", "CORRUPT")
+
+    flags = int.from_bytes(fib[0x0A:0x0C], "little")
+    if flags & FIB_F_ENCRYPTED:
+        encrypted = "XOR" if flags & FIB_F_OBFUSCATED else "Y"
+    else:
+        encrypted = "N"
+    note = "範本（fDot）" if flags & FIB_F_DOT else ""
+    details = DocDetails(encrypted, macro_flag, _word_version(fib), "TRUNCATED" if truncated else "OK")
+    return True, note, details
 
 def is_ole_word_doc(path: Path) -> tuple[bool, str]:
-    """檢查 OLE 檔是否為舊版 Word .doc（需 olefile；無則回報不確定）。"""
-    if not HAS_OLEFILE:
-        return False, "OLE(未知，未安裝 olefile)"
+    """檢查 OLE 檔是否為舊版 Word .doc（OLE 結構內要有 WordDocument）。"""
     try:
-        if not olefile.isOleFile(str(path)):
-            return False, "不是有效 OLE"
-        with olefile.OleFileIO(str(path)) as ole:
-            if ole.exists("WordDocument"):
-                return True, "DOC(legacy)"
-            return False, "OLE 但無 WordDocument（可能是 XLS/PPT）"
+        with open(path, "rb") as f:
+            head = f.read(HEAD_SIZE)
+            if not head.startswith(OLE_MAGIC):
+                return False, "不是有效 OLE"
+            return _ole_word_doc(f, head)
     except Exception as e:
         return False, f"OLE 解析失敗：{e}"
 
-def classify(path: Path) -> tuple[str, str, bool]:
-    """
-    回傳 (Kind, Note, IsDocxLike)
-    Kind: DOCX / DOCM / DOC(legacy) / RTF / OLE-OTHER / NOT-WORD / UNKNOWN
-    IsDocxLike: 只在 DOCX/DOCM 為 True（可由參數調整）
-    """
-    magic = sniff_magic(path)
-    if magic == "zip":
-        ok, note = is_real_docx_or_docm(path)
-        if ok:
-            # note 會是 "DOCX" 或 "DOCM"
-            return note, "", (note in ("DOCX", "DOCM"))
-        else:
-            return "NOT-WORD", f"ZIP 但 {note}", False
-    if magic == "ole":
-        ok, note = is_ole_word_doc(path)
-        if ok:
-            return "DOC(legacy)", "", False
-        return "OLE-OTHER", note, False
+def classify(path: Path, deep_ole: bool = False) -> tuple[str, str, bool, DocDetails]:
+    """
+    回傳 (Kind, Note, IsDocxLike, DocDetails)
+    Kind: DOCX / DOCM / DOTX / DOTM / DOC(legacy) / RTF / OLE-OTHER / NOT-WORD / UNKNOWN
+    IsDocxLike: 只在 DOCX/DOCM 為 True（可由參數調整）；Strict 格式在 Note 標示 "Strict"
+    每個檔案只開啟一次：檔頭讀一次後，ZIP/OLE 解析沿用同一個檔案物件。
+    deep_ole=True 時 .doc 另外回報加密、巨集、Word 版本與完整性（DocDetails），否則為 NO_DETAILS。
+    """
+    t = PROFILE.start()
+    try:
+        f = open(path, "rb")
+    except Exception:
+        PROFILE.stop("head", t)
+        return "NOT-WORD", "非 ZIP/OLE/RTF 結構", False, NO_DETAILS
+    with f:
+        try:
+            head = f.read(HEAD_SIZE)
+        except Exception:
+            head = b""
+        PROFILE.stop("head", t, read=len(head))
+        magic = magic_from_head(head)
+        if magic == "zip":
+            t = PROFILE.start()
+            ok, kind, note = _docx_from_zip(f)
+            PROFILE.stop("zip", t)
+            if ok:
+                # kind 會是 "DOCX" / "DOCM" / "DOTX" / "DOTM"
+                return kind, note, (kind in ("DOCX", "DOCM")), NO_DETAILS
+            else:
+                return "NOT-WORD", f"ZIP 但 {kind}", False, NO_DETAILS
+        if magic == "ole":
+            t = PROFILE.start()
+            if deep_ole:
+                ok, note, details = _ole_word_doc_deep(f, head)
+            else:
+                ok, note = _ole_word_doc(f, head)
+                details = NO_DETAILS
+                if ok:
+                    note = ""
+            PROFILE.stop("ole", t)
+            if ok:
+                return "DOC(legacy)", note, False, details
+            return "OLE-OTHER", note, False, NO_DETAILS
     if magic == "rtf":
-        return "RTF", "", False
+        return "RTF", "", False, NO_DETAILS
     if magic == "unknown":
-        return "NOT-WORD", "非 ZIP/OLE/RTF 結構", False
-    return "UNKNOWN", magic, False
-
-def iter_files(root: Path):
-    """scandir 疊代，速度快且能處理權限問題。"""
-    stack = [root]
-    while stack:
-        cur = stack.pop()
+        return "NOT-WORD", "非 ZIP/OLE/RTF 結構", False, NO_DETAILS
+    return "UNKNOWN", magic, False, NO_DETAILS
+
+def verify_converted(path: Path, macro_enabled: bool = False) -> tuple[bool, str, str]:
+    """
+    轉檔後檢查（DocToDocx 使用）：輸出必須是真的 DOCX（macro_enabled 時為 DOCM）。
+    回傳 (是否通過, Kind, Note)。
+    """
+    kind, note, _, _ = classify(path)
+    expected = "DOCM" if macro_enabled else "DOCX"
+    if kind == expected:
+        return True, kind, note
+    if kind in ("DOCX", "DOCM"):
+        return False, kind, f"預期為 {expected}"
+    return False, kind, note
+
+def iter_files(roots, **walk_opts):
+    """以共用的 DirWalker 掃描（可多個根目錄、多執行緒）。產出 (Path, stat)；stat 失敗時為 None。"""
+    for _, e, is_dir, _ in walk(roots, prestat=True, **walk_opts):
         try:
-            with os.scandir(cur) as it:
-                for e in it:
-                    try:
-                        if e.is_dir(follow_symlinks=False):
-                            stack.append(Path(e.path))
-                        elif e.is_file(follow_symlinks=False):
-                            yield Path(e.path)
-                    except OSError:
-                        continue
-        except (PermissionError, FileNotFoundError):
+            if not e.is_file(follow_symlinks=False):
+                continue
+        except OSError:
             continue
+        yield Path(e.path), safe_stat(e)
+
+# 快取格式版本：classify 判定邏輯改變時遞增，舊快取即自動失效
+CACHE_VERSION = 5
+
+class VerifyCache:
+    """
+    以 SQLite 保存每個檔案的 classify 結果（含 --deep-ole 的 DocDetails），鍵為 (path, size, mtime_ns)。
+    開啟時一次載入 roots 底下的所有紀錄到記憶體，查詢不需再存取資料庫；
+    只有新增/變更/移除的檔案才會寫回。
+    """
+
+    def __init__(self, db_path: Path, roots):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != str(CACHE_VERSION):
+            # 欄位可能不同：整個重建
+            self.conn.execute("DROP TABLE IF EXISTS results")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(CACHE_VERSION),))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+            "kind TEXT, note TEXT, docx_like INTEGER, "
+            "encrypted TEXT, macros TEXT, word_version TEXT, integrity TEXT)"
+        )
+        self.conn.commit()
+
+        prefixes = tuple(str(r).rstrip(os.sep) + os.sep for r in roots)
+        self.entries = {
+            path: (size, mtime_ns, kind, note, bool(docx_like), DocDetails(*details))
+            for path, size, mtime_ns, kind, note, docx_like, *details in self.conn.execute(
+                "SELECT path, size, mtime_ns, kind, note, docx_like, "
+                "encrypted, macros, word_version, integrity FROM results"
+            )
+            if path.startswith(prefixes)
+        }
+        self.seen = set()
+        self.added = []
+        self.changed = []
+        self._dirty = 0
+
+    def lookup(self, path: Path, st, deep_ole: bool = False):
+        """
+        回傳快取的 (kind, note, is_docx_like, details)；未命中或檔案已變更時回傳 None。
+        deep_ole=True 而快取中的 .doc 是未做深度檢查的結果時也視為未命中（不算變更）。
+        """
+        key = str(path)
+        self.seen.add(key)
+        old = self.entries.get(key)
+        if old is None:
+            self.added.append(key)
+            return None
+        if st is None or old[0] != st.st_size or old[1] != st.st_mtime_ns:
+            self.changed.append(key)
+            return None
+        if deep_ole and old[2] == "DOC(legacy)" and not old[5].Integrity:
+            return None
+        return old[2], old[3], old[4], old[5]
+
+    def store(self, path: Path, st, kind: str, note: str, is_docx_like: bool, details: DocDetails = NO_DETAILS):
+        if st is None:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (str(path), st.st_size, st.st_mtime_ns, kind, note, int(is_docx_like), *details),
+        )
+        self._dirty += 1
+        if self._dirty >= 1000:
+            # 定期提交，執行中斷時已檢查的結果不會遺失
+            self.conn.commit()
+            self._dirty = 0
+
+    def finish(self) -> list:
+        """刪除本次未出現的紀錄並提交，回傳已移除的路徑清單。"""
+        removed = [k for k in self.entries if k not in self.seen]
+        self.conn.executemany("DELETE FROM results WHERE path = ?", ((k,) for k in removed))
+        self.conn.commit()
+        self.conn.close()
+        return removed
+
+def iter_classified(
+    entries, workers: int = 1, cache: "VerifyCache | None" = None, recheck: bool = False, deep_ole: bool = False
+):
+    """
+    對 entries（(Path, stat)）逐一 classify，產出 (path, stat, kind, note, is_docx_like, details, from_cache)。
+    有快取且檔案大小/修改時間未變時直接沿用上次結果（recheck=True 則一律重新檢查）。
+    workers > 1 時以執行緒池平行處理（I/O 等待可重疊），
+    並維持與輸入相同的順序輸出，同時限制進行中的工作數量避免佔用過多記憶體。
+    """
+    def cached(p, st):
+        if cache is None:
+            return None
+        t = PROFILE.start()
+        hit = cache.lookup(p, st, deep_ole)
+        PROFILE.stop("cache", t)
+        return None if recheck else hit
+
+    if workers <= 1:
+        for p, st in entries:
+            hit = cached(p, st)
+            if hit is not None:
+                yield (p, st, *hit, True)
+            else:
+                yield (p, st, *classify(p, deep_ole), False)
+        return
+
+    max_pending = workers * 4
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for p, st in entries:
+            hit = cached(p, st)
+            pending.append((p, st, hit if hit is not None else ex.submit(classify, p, deep_ole)))
+            if len(pending) >= max_pending:
+                q, qst, res = pending.popleft()
+                yield (q, qst, *res, True) if isinstance(res, tuple) else (q, qst, *res.result(), False)
+        while pending:
+            q, qst, res = pending.popleft()
+            yield (q, qst, *res, True) if isinstance(res, tuple) else (q, qst, *res.result(), False)
+
+def count_details(deep_stats: dict, details: DocDetails):
+    """累計 --deep-ole 的加密 / 含巨集 / 截斷損毀件數（--resume 時既有的 CSV 列也要計入）。"""
+    if details.Encrypted in ("Y", "XOR"):
+        deep_stats["加密"] += 1
+    if details.Macros == "Y":
+        deep_stats["含巨集"] += 1
+    if details.Integrity in ("TRUNCATED", "CORRUPT"):
+        deep_stats["截斷/損毀"] += 1
+
 
 def main():
     ap = argparse.ArgumentParser(
         description="列出資料夾所有檔案並檢查是否為真正的 DOCX（不看副檔名）。"
     )
-    ap.add_argument("folder", help="要檢查的資料夾")
+    ap.add_argument("folders", nargs="+", help="要檢查的資料夾（可指定多個）")
     ap.add_argument("--csv", help="輸出 CSV 路徑（UTF-8 BOM）")
     ap.add_argument("--not-docx-only", dest="not_docx_only", action="store_true",
                     help="只輸出『不是 DOCX』的檔案")
     ap.add_argument("--count-docm-as-docx", dest="count_docm_as_docx", action="store_true",
                     help="將 DOCM 視為通過（一起算成 DOCX 類型）")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="平行檢查的執行緒數（網路磁碟建議 8~32），預設 1 為逐一處理")
+    ap.add_argument("--scan-workers", dest="scan_workers", type=int, default=1,
+                    help="同時掃描資料夾的執行緒數（>1 時輸出順序不固定），預設 1")
+    ap.add_argument("--include", action="append", help="只檢查符合的檔案（萬用字元，可重複指定），例：*.doc*")
+    ap.add_argument("--exclude", action="append", help="排除符合的資料夾/檔案（萬用字元，可重複指定），例：~$*")
+    ap.add_argument("--max-depth", dest="max_depth", type=int, default=None,
+                    help="最大掃描深度（根目錄下第一層為 1）")
+    ap.add_argument("--cache", help="增量檢查快取檔（SQLite）；未變更的檔案沿用上次結果")
+    ap.add_argument("--full-recheck", dest="full_recheck", action="store_true",
+                    help="忽略快取內容，全部重新檢查（仍會更新快取）")
+    ap.add_argument("--deep-ole", dest="deep_ole", action="store_true",
+                    help="深入檢查舊版 .doc：CSV 另輸出 Encrypted、Macros、WordVersion、Integrity 欄位"
+                         "（只多讀 FIB 開頭與一個 FAT 磁區）")
+    ap.add_argument("--resume", action="store_true",
+                    help="接續上次中斷的執行：保留 --csv 已寫出的列，只檢查尚未輸出的檔案")
+    add_profile_arguments(ap)
+    add_progress_arguments(ap)
     args = ap.parse_args()
+    PROFILE.configure(args, "VerifyDoc")
 
-    root = Path(args.folder).expanduser().resolve()
-    if not root.exists() or not root.is_dir():
-        raise SystemExit(f"找不到資料夾：{root}")
+    roots = [Path(f).expanduser().resolve() for f in args.folders]
+    for root in roots:
+        if not root.exists() or not root.is_dir():
+            raise SystemExit(f"找不到資料夾：{root}")
 
-    rows = []
-    stats = {"DOCX":0,"DOCM":0,"DOC(legacy)":0,"RTF":0,"OLE-OTHER":0,"NOT-WORD":0,"UNKNOWN":0}
+    stats = {"DOCX":0,"DOCM":0,"DOTX":0,"DOTM":0,"DOC(legacy)":0,"RTF":0,"OLE-OTHER":0,"NOT-WORD":0,"UNKNOWN":0}
+    deep_stats = {"加密": 0, "含巨集": 0, "截斷/損毀": 0}
 
-    for p in iter_files(root):
-        kind, note, is_docx_like = classify(p)
+    # 邊檢查邊寫出 CSV，記憶體用量與檔案數無關，中斷時已寫出的列也不會遺失
+    writer = None
+    done = set()
+    if args.csv:
+        out = Path(args.csv).expanduser().resolve()
+        fields = ["Path","Kind","IsDocx","Ext","Size","Note"]
+        if args.deep_ole:
+            fields += list(DocDetails._fields)
+        writer = CsvStreamWriter(out, fields, resume=args.resume)
+        for row in writer.existing_rows():
+            done.add(row["Path"])
+            stats[row["Kind"]] = stats.get(row["Kind"], 0) + 1
+            if args.deep_ole:
+                count_details(deep_stats, DocDetails(*(row[k] for k in DocDetails._fields)))
+        if done:
+            print(f"接續上次執行：已輸出 {len(done)} 筆，略過這些檔案")
+        writer.open()
+
+    cache = None
+    if args.cache:
+        cache_path = Path(args.cache).expanduser().resolve()
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache = VerifyCache(cache_path, roots)
+        cache.seen.update(done)
+
+    entries = PROFILE.iter("walk", iter_files(
+        roots, workers=args.scan_workers, include=args.include, exclude=args.exclude, max_depth=args.max_depth
+    ))
+    if done:
+        entries = ((p, st) for p, st in entries if str(p) not in done)
+
+    # 沒有 --csv 也沒有 --log 時，主控台是唯一的輸出，維持逐檔列印
+    progress = Progress.from_args(args, verbose=args.verbose or not (writer or args.log))
+    progress.start()
+    for p, st, kind, note, is_docx_like, details, from_cache in PROFILE.iter("classify", iter_classified(
+        entries, args.workers, cache, args.full_recheck, args.deep_ole
+    )):
+        if cache is not None and not from_cache:
+            t = PROFILE.start()
+            cache.store(p, st, kind, note, is_docx_like, details)
+            PROFILE.stop("cache", t)
+        count_details(deep_stats, details)
 
         # 若使用者要把 DOCM 視為 DOCX，一起算通過
         is_docx = (kind == "DOCX") or (args.count_docm_as_docx and kind == "DOCM")
@@ -143,31 +629,57 @@ def main():
         stats[kind] = stats.get(kind, 0) + 1
 
         if args.not_docx_only and is_docx:
+            progress.event(kind, p)
             continue  # 只列出不是 DOCX 的
 
-        rows.append({
-            "Path": str(p),
-            "Kind": kind,
-            "IsDocx": "Y" if is_docx else "N",
-            "Ext": p.suffix.lower(),
-            "Size": p.stat().st_size if p.exists() else "",
-            "Note": note
-        })
-        print(f"{kind:11s} | {'DOCX' if is_docx else 'NOT'} | {p}")
+        if writer is not None:
+            row = {
+                "Path": str(p),
+                "Kind": kind,
+                "IsDocx": "Y" if is_docx else "N",
+                "Ext": p.suffix.lower(),
+                "Size": st.st_size if st else "",
+                "Note": note
+            }
+            if args.deep_ole:
+                row.update(details._asdict())
+            t = PROFILE.start()
+            writer.writerow(row)
+            PROFILE.stop("csv", t)
+        text = None
+        if progress.verbose:
+            extra = ""
+            if details.Integrity:
+                extra = f" | {details.WordVersion} 加密:{details.Encrypted or '-'} 巨集:{details.Macros} {details.Integrity}"
+            text = f"{kind:11s} | {'DOCX' if is_docx else 'NOT'} | {p}{extra}"
+        progress.event(kind, p, text, is_docx=is_docx, note=note, cached=from_cache,
+                       **(details._asdict() if args.deep_ole else {}))
+    progress.close()
+
+    if writer is not None:
+        writer.close()
+
+    if cache is not None:
+        removed = cache.finish()
+        print("\n=== 與上次快取比較 ===")
+        print(f"新增：{len(cache.added)}")
+        print(f"變更：{len(cache.changed)}")
+        print(f"移除：{len(removed)}")
+        if cache.entries:  # 首次建立快取時不逐一列出新增
+            for label, paths in (("新增", cache.added), ("變更", cache.changed), ("移除", removed)):
+                for path in paths:
+                    print(f"  [{label}] {path}")
 
     print("\n=== 統計 ===")
     for k, v in stats.items():
         print(f"{k:11s}: {v}")
+    if args.deep_ole:
+        for k, v in deep_stats.items():
+            print(f"DOC {k}: {v}")
 
-    if args.csv:
-        out = Path(args.csv).expanduser().resolve()
-        out.parent.mkdir(parents=True, exist_ok=True)
-        with open(out, "w", newline="", encoding="utf-8-sig") as f:
-            writer = csv.DictWriter(f, fieldnames=["Path","Kind","IsDocx","Ext","Size","Note"])
-            writer.writeheader()
-            writer.writerows(rows)
-        print(f"\n已輸出 CSV：{out}")
-    else:
+    if writer is not None:
+        print(f"\n已輸出 CSV：{writer.path}")
+    elif not args.log:
         print("\n（未指定 --csv，僅在主控台列印結果）")
 
 if __name__ == "__main__":
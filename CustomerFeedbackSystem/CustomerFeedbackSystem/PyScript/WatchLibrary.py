@@ -0,0 +1,582 @@
+# 不需額外套件（僅限 Linux：使用 inotify；.parquet/.feather 匯出需 pyarrow）
+# 用法：python3 /srv/PyScript/WatchLibrary.py watch "/mnt/GMP文件庫" --db /srv/gmp_library.sqlite --workers 8 --deep-ole
+# 用法：python3 /srv/PyScript/WatchLibrary.py export --db /srv/gmp_library.sqlite -o /srv/清單與驗證結果.xlsx --count-docm-as-docx
+#       （watch 執行中也可以匯出；匯出不走訪資料夾）
+
+# -*- coding: utf-8 -*-
+"""
+持續監看文件庫，讓 ListAllFilePath.py（檔案清單）與 VerifyDoc.py（Word 格式檢查）的結果保持最新，不必每天整個重掃：
+  watch   第一次完整掃描一次，之後依 inotify 事件只更新有變動的項目，結果存在 SQLite（--db）：
+            - 事件依路徑合併，最後一次事件後靜置 --debounce 秒才處理（大量複製、連續存檔只判定一次）
+            - 只對新增或大小/修改時間有變動的檔案重新 classify；搬移（同 inode、大小、修改時間）沿用原判定
+            - 新增或搬入的資料夾只重掃該子樹；刪除或搬出的資料夾整個子樹一起移除
+            - 事件佇列溢位（IN_Q_OVERFLOW）時，重掃這段時間有事件的資料夾子樹（不知道時重掃全部根目錄），
+              只重新 classify 有變動的檔案
+            - 另每隔 --reconcile-hours 小時做一次只比對 stat 的全量核對，補上監看不到的變動（例如網路磁碟另一端的修改）
+          重新啟動時沿用同一個 --db：只需比對 stat，判定過且沒變動的檔案不會再讀。
+  export  從 SQLite 匯出與 ScanLibrary.py 相同欄位的報告（.xlsx / .csv / .parquet / .feather）。
+SQLite 以 WAL 模式開啟，watch 執行中可以另開一個行程 export。
+"""
+import argparse
+import errno
+import os
+import signal
+import sqlite3
+import stat
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from ArrowStream import COLUMNAR_SUFFIXES
+from DirWalker import safe_stat, walk
+from Inotify import (
+    IN_ATTRIB, IN_CLOSE_WRITE, IN_CREATE, IN_DELETE, IN_DELETE_SELF, IN_DONT_FOLLOW, IN_EXCL_UNLINK,
+    IN_IGNORED, IN_ISDIR, IN_MOVE_SELF, IN_MOVED_FROM, IN_MOVED_TO, IN_ONLYDIR, IN_Q_OVERFLOW, Inotify,
+)
+from ListAllFilePath import HEADERS, export_to_columnar, export_to_csv_stream, export_to_excel
+from Progress import Progress, add_progress_arguments
+from ScanLibrary import VERIFY_COLUMN_TYPES
+from VerifyDoc import NO_DETAILS, DocDetails, classify
+from XlsxStream import EXCEL_MAX_ROWS
+
+STORE_VERSION = 1
+
+# 判定結果：(kind, note, docx_like, DocDetails)；資料夾與非一般檔案不判定
+NOT_CLASSIFIED = ("", "", False, NO_DETAILS)
+
+PROGRESS_LABELS = {"unchanged": "未變動", "added": "新增", "changed": "變更", "moved": "搬移", "removed": "移除"}
+
+
+class LibraryStore:
+    """
+    以 SQLite 保存清單與判定結果；每個項目一列，以完整路徑為主鍵。
+    kind 為 NULL 表示尚未判定（或判定方式改變，需要重新判定）。
+    """
+
+    def __init__(self, db_path: Path, deep_ole: Optional[bool] = None):
+        """deep_ole 為 None 時只讀取（export）；與上次不同時，已判定的檔案標記為需重新判定。"""
+        self.path = db_path
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        version = self._meta("version")
+        if version is not None and version != str(STORE_VERSION):
+            if deep_ole is None:
+                raise SystemExit(f"資料庫格式版本不符（{version}），請重新執行 watch：{db_path}")
+            self.conn.execute("DROP TABLE IF EXISTS entries")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " path TEXT PRIMARY KEY, root TEXT NOT NULL, is_dir INTEGER NOT NULL,"
+            " size INTEGER, mtime_ns INTEGER, ctime_ns INTEGER, ino INTEGER,"
+            " kind TEXT, note TEXT, docx_like INTEGER,"
+            " encrypted TEXT, macros TEXT, word_version TEXT, integrity TEXT, checked REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_ino ON entries (ino)")
+        self.deep_ole = self._meta("deep_ole") == "1"
+        if deep_ole is not None:
+            if deep_ole and not self.deep_ole:
+                self.conn.execute("UPDATE entries SET kind = NULL WHERE is_dir = 0 AND kind <> ''")
+            self.deep_ole = deep_ole
+            self._set_meta("version", str(STORE_VERSION))
+            self._set_meta("deep_ole", "1" if deep_ole else "0")
+            self.conn.commit()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @staticmethod
+    def _range(top: str):
+        # top 底下的所有路徑：top + os.sep 開頭（以字串範圍查詢，可用主鍵索引）
+        return top + os.sep, top + chr(ord(os.sep) + 1)
+
+    def subtree(self, top: str) -> Dict[str, tuple]:
+        """top 本身與底下所有項目：path → (is_dir, size, mtime_ns, ino, classified)。"""
+        lo, hi = self._range(top)
+        cur = self.conn.execute(
+            "SELECT path, is_dir, size, mtime_ns, ino, kind IS NOT NULL FROM entries"
+            " WHERE path = ? OR (path >= ? AND path < ?)", (top, lo, hi)
+        )
+        return {r[0]: r[1:] for r in cur}
+
+    def get(self, path: str) -> Optional[tuple]:
+        """(is_dir, size, mtime_ns, ino, classified)；不存在時為 None。"""
+        return self.conn.execute(
+            "SELECT is_dir, size, mtime_ns, ino, kind IS NOT NULL FROM entries WHERE path = ?", (path,)
+        ).fetchone()
+
+    def find_moved(self, st: os.stat_result) -> Optional[tuple]:
+        """同 inode、大小、修改時間且已判定的項目（搬移或改名）：回傳其判定結果。"""
+        row = self.conn.execute(
+            "SELECT kind, note, docx_like, encrypted, macros, word_version, integrity FROM entries"
+            " WHERE ino = ? AND size = ? AND mtime_ns = ? AND is_dir = 0 AND kind IS NOT NULL LIMIT 1",
+            (st.st_ino, st.st_size, st.st_mtime_ns),
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], bool(row[2]), DocDetails(*row[3:])
+
+    def upsert(self, root: str, path: str, is_dir: bool, st: os.stat_result, verdict: Optional[tuple]):
+        """verdict 為 None 時表示尚未判定。"""
+        if verdict is None:
+            kind = note = docx_like = None
+            details = (None,) * len(DocDetails._fields)
+        else:
+            kind, note, docx_like, details = verdict
+        self.conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+            (path, root, int(is_dir), None if is_dir else st.st_size, st.st_mtime_ns, st.st_ctime_ns,
+             st.st_ino, kind, note, None if docx_like is None else int(docx_like), *details, time.time()),
+        )
+
+    def delete(self, path: str):
+        self.conn.execute("DELETE FROM entries WHERE path = ?", (path,))
+
+    def count(self) -> Counter:
+        counts = Counter()
+        for is_dir, pending, n in self.conn.execute(
+            "SELECT is_dir, kind IS NULL, COUNT(*) FROM entries GROUP BY is_dir, kind IS NULL"
+        ):
+            counts["Folder" if is_dir else "File"] += n
+            if pending:
+                counts["pending"] += n
+        return counts
+
+    def iter_rows(self) -> Iterator[tuple]:
+        """依路徑排序讀出所有項目（export 用），分批讀取不佔大量記憶體。"""
+        cur = self.conn.execute(
+            "SELECT root, path, is_dir, size, mtime_ns, ctime_ns, kind, note, docx_like,"
+            " encrypted, macros, word_version, integrity FROM entries ORDER BY path"
+        )
+        while True:
+            rows = cur.fetchmany(10000)
+            if not rows:
+                return
+            yield from rows
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+class LibraryWatcher:
+    """
+    維護 roots 底下的監看與 store 的內容。
+    reconcile() 比對一個子樹的實際狀態與 store（完整掃描、溢位後重掃、定期核對都用它）；
+    run() 進入事件迴圈，直到 Ctrl+C。
+    """
+
+    def __init__(self, roots: Sequence[Path], store: LibraryStore, workers: int = 4,
+                 debounce: float = 2.0, reconcile_hours: float = 24.0, progress: Optional[Progress] = None):
+        self.roots = [str(r) for r in roots]
+        self.store = store
+        self.workers = max(1, workers)
+        self.debounce = debounce
+        self.reconcile_secs = reconcile_hours * 3600 if reconcile_hours > 0 else None
+        self.progress = progress or Progress()
+        self.inotify = Inotify()
+        self.mask = (IN_CREATE | IN_CLOSE_WRITE | IN_ATTRIB | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+                     | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK)
+        self.wds: Dict[int, str] = {}
+        self.watched: Dict[str, int] = {}
+        self.watch_failed = 0
+        self.pending: Dict[str, float] = {}   # 路徑 → 最後一次事件時間
+        self.new_dirs = set()                 # 建立或搬入的資料夾：需要重掃子樹
+        self.active = set()                   # 本次處理前有事件的資料夾（溢位時重掃這些）
+        self.overflow = False
+        self.counts: Counter = Counter()
+
+    def _root_of(self, path: str) -> str:
+        for root in self.roots:
+            if path == root or path.startswith(root + os.sep):
+                return root
+        return self.roots[0]
+
+    def _watch(self, path: str):
+        if path in self.watched:
+            return
+        try:
+            wd = self.inotify.add_watch(path, self.mask)
+        except OSError as e:
+            self.watch_failed += 1
+            if e.errno == errno.ENOSPC and self.watch_failed == 1:
+                print(f"[警告] 監看數量已達上限（目前 {len(self.watched):,} 個資料夾），之後新增的資料夾只靠定期核對更新；"
+                      f"可調高 /proc/sys/fs/inotify/max_user_watches", file=sys.stderr)
+            return
+        old = self.wds.get(wd)
+        if old is not None and old != path:
+            # 同一個 inode（資料夾被搬移）：改成新路徑
+            self.watched.pop(old, None)
+        self.wds[wd] = path
+        self.watched[path] = wd
+
+    def _unwatch(self, top: str):
+        """移除 top 與底下的監看（資料夾已刪除或搬出監看範圍）。"""
+        prefix = top + os.sep
+        for path in [p for p in self.watched if p == top or p.startswith(prefix)]:
+            wd = self.watched.pop(path)
+            if self.wds.get(wd) == path:
+                del self.wds[wd]
+                self.inotify.rm_watch(wd)
+
+    def _classify_all(self, todo: List[tuple]):
+        """todo：(root, path, st, event)；判定後寫入 store。"""
+        def work(item):
+            return classify(Path(item[1]), self.store.deep_ole)
+
+        if self.workers <= 1:
+            results = map(work, todo)
+            ex = None
+        else:
+            ex = ThreadPoolExecutor(max_workers=self.workers)
+            results = ex.map(work, todo)
+        try:
+            for (root, path, st, event), verdict in zip(todo, results):
+                self.store.upsert(root, path, False, st, verdict)
+                self._event(event, path, verdict[0])
+        finally:
+            if ex is not None:
+                ex.shutdown()
+
+    def _event(self, event: str, path: str, kind: str = ""):
+        self.counts[event] += 1
+        self.progress.event(event, path, f"{event:9s} | {kind:11s} | {path}", kind=kind)
+
+    def _update(self, root: str, path: str, st: os.stat_result, is_dir: bool, old: Optional[tuple],
+                todo: List[tuple]):
+        """比對一個項目；需要判定的一般檔案放進 todo，其餘直接寫入 store。"""
+        if old is not None and old[0] == is_dir and old[4] and (is_dir or (old[1], old[2], old[3]) == (
+                st.st_size, st.st_mtime_ns, st.st_ino)):
+            if is_dir and old[2] != st.st_mtime_ns:
+                self.store.upsert(root, path, True, st, NOT_CLASSIFIED)
+            self.progress.event("unchanged", path)
+            return False
+        event = "added" if old is None else "changed"
+        if is_dir or not stat.S_ISREG(st.st_mode):
+            self.store.upsert(root, path, is_dir, st, NOT_CLASSIFIED)
+            self._event(event, path)
+            return True
+        moved = self.store.find_moved(st) if old is None else None
+        if moved is not None:
+            self.store.upsert(root, path, False, st, moved)
+            self._event("moved", path, moved[0])
+        else:
+            todo.append((root, path, st, event))
+        return True
+
+    def reconcile(self, top: str) -> int:
+        """讓 store 中 top 子樹與實際狀態一致（並補上監看），回傳變動的項目數。"""
+        root = self._root_of(top)
+        known = self.store.subtree(top)
+        todo: List[tuple] = []
+        changed = 0
+        if top == root:
+            known.pop(top, None)
+            self._watch(top)
+        else:
+            try:
+                st = os.lstat(top)
+            except OSError:
+                st = None
+            if st is None or not stat.S_ISDIR(st.st_mode):
+                known.pop(top, None)
+                if st is not None:
+                    changed += self._update(root, top, st, False, self.store.get(top), todo)
+                    self._classify_all(todo)
+                self._remove_known(known)
+                self._unwatch(top)
+                return changed + len(known)
+            self._watch(top)
+            changed += self._update(root, top, st, True, known.pop(top, None), todo)
+
+        # 先處理新增與變動（搬移的檔案還能從舊路徑找到判定結果），最後才刪除已不存在的項目
+        for _, entry, is_dir, _ in walk([Path(top)], prestat=True):
+            st = safe_stat(entry)
+            if st is None:
+                continue
+            path = entry.path
+            if is_dir:
+                self._watch(path)
+            changed += self._update(root, path, st, is_dir, known.pop(path, None), todo)
+        self._classify_all(todo)
+        self._remove_known(known)
+        self.store.commit()
+        return changed + len(known)
+
+    def _remove_known(self, known: Dict[str, tuple]):
+        for path in known:
+            self.store.delete(path)
+            self._event("removed", path)
+
+    def scan(self) -> int:
+        """對所有根目錄 reconcile 一次（啟動時的完整掃描、定期核對）。"""
+        return sum(self.reconcile(root) for root in self.roots)
+
+    def _on_event(self, ev, now: float):
+        if ev.mask & IN_Q_OVERFLOW:
+            self.overflow = True
+            return
+        if ev.mask & IN_IGNORED:
+            path = self.wds.pop(ev.wd, None)
+            if path is not None and self.watched.get(path) == ev.wd:
+                del self.watched[path]
+            return
+        base = self.wds.get(ev.wd)
+        if base is None:
+            return
+        if ev.mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            # 資料夾本身的刪除/搬移由上層資料夾的事件處理；根目錄則檢查是否還在
+            if base in self.roots:
+                self.pending[base] = now
+            return
+        path = os.path.join(base, ev.name) if ev.name else base
+        if ev.mask & IN_ISDIR and ev.mask & (IN_CREATE | IN_MOVED_TO):
+            self.new_dirs.add(path)
+        self.pending[path] = now
+        self.active.add(base)
+        if ev.mask & (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO) and base not in self.roots:
+            # 資料夾內容變動會改變資料夾本身的修改時間
+            self.pending[base] = now
+
+    def _flush(self, now: float) -> int:
+        """處理靜置超過 debounce 秒的路徑，回傳變動的項目數。"""
+        if self.overflow:
+            self.overflow = False
+            targets = _outermost(self.active) or list(self.roots)
+            print(f"[警告] 事件佇列溢位，重新核對 {len(targets)} 個資料夾", file=sys.stderr)
+            self.pending.clear()
+            self.new_dirs.clear()
+            self.active.clear()
+            return sum(self.reconcile(t) for t in targets)
+
+        ready = [p for p, t in self.pending.items() if now - t >= self.debounce]
+        if not ready:
+            return 0
+        for p in ready:
+            del self.pending[p]
+        if not self.pending:
+            self.active.clear()
+
+        changed = 0
+        todo: List[tuple] = []
+        missing = []
+        subtrees = []
+        for path in sorted(ready):
+            try:
+                st = os.lstat(path)
+            except OSError:
+                missing.append(path)
+                continue
+            if path in self.roots:
+                continue
+            if stat.S_ISDIR(st.st_mode) and (path in self.new_dirs or path not in self.watched):
+                self.new_dirs.discard(path)
+                subtrees.append(path)
+            else:
+                changed += self._update(self._root_of(path), path, st, stat.S_ISDIR(st.st_mode),
+                                        self.store.get(path), todo)
+        self._classify_all(todo)
+        for top in _outermost(subtrees):
+            changed += self.reconcile(top)
+        # 刪除放在最後：搬移時新位置已先沿用舊位置的判定結果
+        for path in missing:
+            if path in self.roots:
+                print(f"[警告] 根目錄已不存在：{path}", file=sys.stderr)
+            known = self.store.subtree(path)
+            self._remove_known(known)
+            changed += len(known)
+            self._unwatch(path)
+        self.store.commit()
+        self.progress.flush()
+        return changed
+
+    def run(self):
+        """事件迴圈：Ctrl+C 結束。"""
+        next_reconcile = time.monotonic() + self.reconcile_secs if self.reconcile_secs else None
+        while True:
+            now = time.monotonic()
+            if self.pending or self.overflow:
+                timeout = self.debounce
+                if self.pending:
+                    timeout = max(0.05, min(self.pending.values()) + self.debounce - now)
+            else:
+                timeout = None if next_reconcile is None else max(0.0, next_reconcile - now)
+            for ev in self.inotify.read(timeout):
+                self._on_event(ev, time.monotonic())
+            now = time.monotonic()
+            before = Counter(self.counts)
+            changed = self._flush(now)
+            if next_reconcile is not None and now >= next_reconcile and not self.pending:
+                changed += self.scan()
+                next_reconcile = now + self.reconcile_secs
+            if changed:
+                self._report(self.counts - before)
+
+    def _report(self, delta: Counter):
+        parts = [f"{PROGRESS_LABELS.get(k, k)} {v:,}" for k, v in delta.items() if v]
+        print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {'，'.join(parts)}", flush=True)
+
+    def close(self):
+        self.inotify.close()
+
+
+def _outermost(paths) -> List[str]:
+    """去掉被其他路徑包含的子路徑。"""
+    result = []
+    for p in sorted(paths):
+        if result and (p == result[-1] or p.startswith(result[-1] + os.sep)):
+            continue
+        result.append(p)
+    return result
+
+
+def _fromtimestamp_ns(ns: Optional[int]) -> Optional[datetime]:
+    # 與 os.stat_result.st_mtime 相同的換算方式（秒 + 奈秒 * 1e-9），結果與 entry_row 完全一致
+    if not ns:
+        return None
+    sec, nsec = divmod(ns, 10 ** 9)
+    return datetime.fromtimestamp(sec + nsec * 1e-9)
+
+
+def store_rows(store: LibraryStore, count_docm_as_docx: bool = False) -> Iterator[List[Any]]:
+    """
+    由 store 產生與 ScanLibrary.py 相同欄位的資料列（HEADERS + Kind / IsDocx / Note，deep_ole 時另加 DocDetails）。
+    尚未判定的檔案 Kind 為空白。
+    """
+    deep = store.deep_ole
+    for root, path, is_dir, size, mtime_ns, ctime_ns, kind, note, docx_like, *details in store.iter_rows():
+        rel = path[len(root) + 1:].replace(os.sep, "/")
+        parent, _, name = rel.rpartition("/")
+        row = [
+            name,
+            "Folder" if is_dir else "File",
+            "" if is_dir else os.path.splitext(name)[1].lower(),
+            None if is_dir else size,
+            _fromtimestamp_ns(mtime_ns),
+            _fromtimestamp_ns(ctime_ns),
+            rel,
+            parent or "/",
+            rel.count("/") + 1,
+            path,
+        ]
+        if is_dir or not kind:
+            row.extend([""] * (3 + (len(DocDetails._fields) if deep else 0)))
+        else:
+            is_docx = (kind == "DOCX") or (count_docm_as_docx and kind == "DOCM")
+            row.extend([kind, "Y" if is_docx else "N", note or ""])
+            if deep:
+                row.extend(d or "" for d in details)
+        yield row
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def cmd_watch(args):
+    if not sys.platform.startswith("linux"):
+        raise SystemExit("watch 需要 Linux（inotify）；其他平台請改用 ScanLibrary.py 定期掃描")
+    # 以服務（systemd 等）執行時，停止服務與 Ctrl+C 一樣正常結束
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    roots = [Path(t).expanduser().resolve() for t in args.targets]
+    for root in roots:
+        if not root.is_dir():
+            raise SystemExit(f"找不到資料夾：{root}")
+    roots = [Path(r) for r in _outermost(str(r) for r in roots)]
+    db_path = Path(args.db).expanduser().resolve()
+    store = LibraryStore(db_path, args.deep_ole)
+    progress = Progress.from_args(args, PROGRESS_LABELS)
+    watcher = LibraryWatcher(roots, store, args.workers, args.debounce, args.reconcile_hours, progress)
+    try:
+        print(f"完整核對：{', '.join(map(str, roots))}（資料庫：{db_path}）")
+        t0 = time.perf_counter()
+        progress.start()
+        watcher.scan()
+        progress.finish()
+        counts = store.count()
+        print(f"資料夾：{counts['Folder']:,}，檔案：{counts['File']:,}，"
+              f"監看 {len(watcher.watched):,} 個資料夾，耗時 {time.perf_counter() - t0:.1f} 秒")
+        if watcher.watch_failed:
+            print(f"[警告] {watcher.watch_failed:,} 個資料夾無法監看，只靠定期核對（--reconcile-hours）更新")
+        if args.once:
+            return
+        print(f"開始監看（靜置 {args.debounce:g} 秒後處理事件），按 Ctrl+C 結束")
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\n已停止監看")
+    finally:
+        watcher.close()
+        store.close()
+        progress.close()
+
+
+def cmd_export(args):
+    db_path = Path(args.db).expanduser().resolve()
+    if not db_path.is_file():
+        raise SystemExit(f"找不到資料庫：{db_path}")
+    store = LibraryStore(db_path)
+    out_path = Path(args.output).expanduser().resolve()
+    if out_path.suffix.lower() not in (".xlsx", ".csv") + COLUMNAR_SUFFIXES:
+        out_path = out_path.with_suffix(".xlsx")
+    headers = list(HEADERS) + ["Kind", "IsDocx", "Note"] + (list(DocDetails._fields) if store.deep_ole else [])
+    counts = store.count()
+    rows = store_rows(store, args.count_docm_as_docx)
+    suffix = out_path.suffix.lower()
+    sheets = 1
+    try:
+        if suffix == ".csv":
+            export_to_csv_stream(rows, headers, out_path)
+        elif suffix in COLUMNAR_SUFFIXES:
+            export_to_columnar(rows, headers, out_path, VERIFY_COLUMN_TYPES)
+        else:
+            sheets = export_to_excel(rows, headers, out_path)
+    finally:
+        store.close()
+    print(f"資料夾：{counts['Folder']:,}，檔案：{counts['File']:,}")
+    if counts["pending"]:
+        print(f"[提醒] {counts['pending']:,} 個檔案尚未判定（watch 仍在處理中），Kind 欄為空白")
+    if sheets > 1:
+        print(f"資料列超過 Excel 單一工作表上限（{EXCEL_MAX_ROWS:,} 列），已分成 {sheets} 個工作表。")
+    print(f"已完成，輸出檔：{out_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="持續監看文件庫，增量更新檔案清單與 Word 格式檢查結果")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("watch", help="完整核對一次後持續監看（Linux inotify）")
+    p.add_argument("targets", nargs="+", help="要監看的資料夾（可指定多個）")
+    p.add_argument("--db", required=True, help="保存清單與判定結果的 SQLite 檔（重新啟動時沿用）")
+    p.add_argument("--workers", type=int, default=4, help="平行檢查檔案的執行緒數，預設 4")
+    p.add_argument("--deep-ole", action="store_true",
+                   help="深入檢查舊版 .doc（Encrypted、Macros、WordVersion、Integrity）；由關改開時會重新判定")
+    p.add_argument("--debounce", type=float, default=2.0, help="路徑最後一次事件後靜置幾秒才處理，預設 2")
+    p.add_argument("--reconcile-hours", type=float, default=24.0,
+                   help="每隔幾小時做一次只比對 stat 的全量核對（0 為不做），預設 24")
+    p.add_argument("--once", action="store_true", help="只做完整核對、更新資料庫後結束（不監看）")
+    add_progress_arguments(p)
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("export", help="從資料庫匯出報告（不走訪資料夾）")
+    p.add_argument("--db", required=True, help="watch 使用的 SQLite 檔")
+    p.add_argument("-o", "--output", required=True, help="輸出檔路徑：.xlsx / .csv / .parquet / .feather（需 pyarrow）")
+    p.add_argument("--count-docm-as-docx", action="store_true", help="將 DOCM 視為通過（IsDocx 為 Y）")
+    p.set_defaults(func=cmd_export)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+串流寫出 .xlsx（不需 openpyxl）：每列直接寫成工作表 XML，
+欄寬與日期格式在寫出同一列時一併計算，記憶體用量與資料列數無關。
+超過 Excel 單一工作表列數上限時，自動換到下一個工作表（Inventory_2、Inventory_3 …）。
+輸出外觀與原本 openpyxl 版相同：凍結首列、篩選、自動欄寬、日期格式 yyyy-mm-dd hh:mm:ss。
+"""
+import re
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, List, Optional
+from xml.sax.saxutils import escape
+
+# Excel 單一工作表列數上限（含表頭）
+EXCEL_MAX_ROWS = 1_048_576
+# 自動欄寬上限（與 excel_autofit 相同）
+MAX_COL_WIDTH = 80
+DATE_FORMAT = "yyyy-mm-dd hh:mm:ss"
+
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+# XML 1.0 不允許的控制字元（openpyxl 遇到會丟例外，這裡直接移除）
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '<Override PartName="/docProps/core.xml" '
+    'ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>'
+    '<Override PartName="/docProps/app.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.extended-properties+xml"/>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" Target="docProps/core.xml"/>'
+    '<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/extended-properties" Target="docProps/app.xml"/>'
+    '</Relationships>'
+)
+
+_APP_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+    '<Application>Microsoft Excel</Application></Properties>'
+)
+
+_STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="' + DATE_FORMAT + '"/></numFmts>'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/><family val="2"/><scheme val="minor"/></font></fonts>'
+    '<fills count="2"><fill><patternFill/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def column_letter(idx: int) -> str:
+    """1 -> A, 27 -> AA"""
+    letters = ""
+    while idx > 0:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+class _SheetSpool:
+    """單一工作表：資料列先寫到暫存檔，同時累計欄寬與列數。"""
+
+    def __init__(self, title: str, ncols: int):
+        self.title = title
+        self.rows = 0
+        self.widths = [0] * ncols
+        self.spool = tempfile.TemporaryFile()
+
+
+class XlsxStreamWriter:
+    """
+    用法：
+        with XlsxStreamWriter(out_path, headers) as w:
+            for r in rows:
+                w.append(r)
+    """
+
+    def __init__(
+        self,
+        out_path: Path,
+        headers: List[str],
+        sheet_title: str = "Inventory",
+        max_rows: int = EXCEL_MAX_ROWS,
+    ):
+        self.out_path = out_path
+        self.headers = headers
+        self.sheet_title = sheet_title
+        self.max_rows = max_rows
+        self.cols = [column_letter(i) for i in range(1, len(headers) + 1)]
+        self.sheets: List[str] = []
+        self._refs: List[str] = []
+        self._zf = zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED)
+        self._sheet: Optional[_SheetSpool] = None
+
+    # ---- 工作表 ----
+    def _new_sheet(self):
+        n = len(self.sheets) + 1
+        title = self.sheet_title if n == 1 else f"{self.sheet_title}_{n}"
+        self.sheets.append(title)
+        self._sheet = _SheetSpool(title, len(self.headers))
+        self._write_row(self.headers)
+
+    def _finish_sheet(self):
+        sh = self._sheet
+        if sh is None:
+            return
+        n = len(self.sheets)
+        last = f"{self.cols[-1]}{sh.rows}"
+        self._refs.append(f"$A$1:${self.cols[-1]}${sh.rows}")
+        cols = "".join(
+            f'<col min="{i}" max="{i}" width="{min(w + 2, MAX_COL_WIDTH)}" customWidth="1"/>'
+            for i, w in enumerate(sh.widths, start=1)
+        )
+        head = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            '<sheetPr><outlinePr summaryBelow="1" summaryRight="1"/><pageSetUpPr/></sheetPr>'
+            f'<dimension ref="A1:{last}"/>'
+            '<sheetViews><sheetView workbookViewId="0">'
+            '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+            '<selection pane="bottomLeft" activeCell="A1" sqref="A1"/>'
+            '</sheetView></sheetViews>'
+            '<sheetFormatPr baseColWidth="8" defaultRowHeight="15"/>'
+            f'<cols>{cols}</cols><sheetData>'
+        )
+        tail = (
+            f'</sheetData><autoFilter ref="A1:{last}"/>'
+            '<pageMargins left="0.75" right="0.75" top="1" bottom="1" header="0.5" footer="0.5"/>'
+            '</worksheet>'
+        )
+        with self._zf.open(f"xl/worksheets/sheet{n}.xml", "w", force_zip64=True) as dst:
+            dst.write(head.encode("utf-8"))
+            sh.spool.seek(0)
+            shutil.copyfileobj(sh.spool, dst, 1024 * 1024)
+            dst.write(tail.encode("utf-8"))
+        sh.spool.close()
+        self._sheet = None
+
+    # ---- 資料列 ----
+    def _write_row(self, values: List[Any]):
+        sh = self._sheet
+        sh.rows += 1
+        r = sh.rows
+        widths = sh.widths
+        parts = [f'<row r="{r}">']
+        for i, val in enumerate(values):
+            if val is None or val == "":
+                # 與 openpyxl 相同：空字串視為空白儲存格，不寫出空的 inlineStr
+                continue
+            text = str(val)
+            if len(text) > widths[i]:
+                widths[i] = len(text)
+            ref = f"{self.cols[i]}{r}"
+            if isinstance(val, datetime):
+                serial = (val - _EXCEL_EPOCH).total_seconds() / 86400
+                parts.append(f'<c r="{ref}" s="1"><v>{serial!r}</v></c>')
+            elif isinstance(val, bool):
+                parts.append(f'<c r="{ref}" t="b"><v>{int(val)}</v></c>')
+            elif isinstance(val, (int, float)):
+                parts.append(f'<c r="{ref}"><v>{val!r}</v></c>')
+            else:
+                text = escape(_ILLEGAL_XML_CHARS.sub("", text))
+                space = ' xml:space="preserve"' if text != text.strip() else ""
+                parts.append(f'<c r="{ref}" t="inlineStr"><is><t{space}>{text}</t></is></c>')
+        parts.append("</row>")
+        sh.spool.write("".join(parts).encode("utf-8"))
+
+    def append(self, values: List[Any]):
+        if self._sheet is None:
+            self._new_sheet()
+        elif self._sheet.rows >= self.max_rows:
+            self._finish_sheet()
+            self._new_sheet()
+        self._write_row(values)
+
+    # ---- 活頁簿 ----
+    def close(self):
+        if self._zf is None:
+            return
+        if self._sheet is None and not self.sheets:
+            self._new_sheet()  # 沒有資料也輸出只有表頭的工作表
+        self._finish_sheet()
+
+        n = len(self.sheets)
+        overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, n + 1)
+        )
+        self._zf.writestr("[Content_Types].xml", _CONTENT_TYPES_HEAD + overrides + "</Types>")
+        self._zf.writestr("_rels/.rels", _ROOT_RELS)
+        self._zf.writestr("docProps/app.xml", _APP_XML)
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self._zf.writestr(
+            "docProps/core.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+            'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+            f'<dcterms:created xsi:type="dcterms:W3CDTF">{now}</dcterms:created>'
+            f'<dcterms:modified xsi:type="dcterms:W3CDTF">{now}</dcterms:modified>'
+            '</cp:coreProperties>',
+        )
+        self._zf.writestr("xl/styles.xml", _STYLES_XML)
+
+        sheets = "".join(
+            f'<sheet name="{escape(t)}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, t in enumerate(self.sheets, start=1)
+        )
+        # 篩選範圍需對應隱藏的 _FilterDatabase 名稱（Excel 自己存檔時也會寫入）
+        names = "".join(
+            f'<definedName name="_xlnm._FilterDatabase" localSheetId="{i}" hidden="1">'
+            f"'{escape(t)}'!{ref}</definedName>"
+            for i, (t, ref) in enumerate(zip(self.sheets, self._refs))
+        )
+        self._zf.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<bookViews><workbookView/></bookViews>'
+            f'<sheets>{sheets}</sheets><definedNames>{names}</definedNames></workbook>',
+        )
+        rels = "".join(
+            f'<Relationship Id="rId{i}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, n + 1)
+        )
+        rels += (
+            f'<Relationship Id="rId{n + 1}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/>'
+        )
+        self._zf.writestr(
+            "xl/_rels/workbook.xml.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{rels}</Relationships>',
+        )
+        self._zf.close()
+        self._zf = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
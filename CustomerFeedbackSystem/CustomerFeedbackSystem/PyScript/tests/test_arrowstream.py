@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""ArrowStream：Parquet / Feather 讀回的型別（int64、timestamp、字典）與值等於 entry_row；Parquet 每個 row group 的字典只含用到的值。執行：python -m pytest tests"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ArrowStream import HAS_PYARROW, ArrowStreamWriter  # noqa: E402
+from DirWalker import walk  # noqa: E402
+from ListAllFilePath import ARROW_COLUMN_TYPES, HEADERS, entry_row  # noqa: E402
+from SyntheticTree import generate  # noqa: E402
+
+if HAS_PYARROW:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+BATCH = 16
+
+
+@unittest.skipUnless(HAS_PYARROW, "需要 pyarrow")
+class RoundTripTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.base = Path(cls.tmp.name)
+        generate(cls.base / "gen", files=60, depth=3, fanout=3, median_kb=4, max_kb=32)
+        root = cls.base / "gen" / "tree"
+        cls.rows = [entry_row(root, entry, is_dir) for _, entry, is_dir, _ in walk([root], prestat=True)]
+        cls.fields = [(h, ARROW_COLUMN_TYPES.get(h, "string")) for h in HEADERS]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def write(self, suffix: str) -> Path:
+        out = self.base / f"inventory{suffix}"
+        # 小批次：字典跨多個批次成長
+        with ArrowStreamWriter(out, self.fields, batch_size=BATCH) as w:
+            for r in self.rows:
+                w.append(r)
+        self.assertEqual(w.rows, len(self.rows))
+        return out
+
+    def read(self, path: Path):
+        if path.suffix == ".parquet":
+            return pq.read_table(path)
+        with pa.ipc.open_file(path) as reader:
+            self.assertGreater(reader.num_record_batches, 2)
+            return reader.read_all()
+
+    def test_types_and_values(self):
+        for suffix in (".parquet", ".feather"):
+            table = self.read(self.write(suffix))
+            self.assertEqual(table.column_names, list(HEADERS))
+            self.assertEqual(table.schema.field("Size(bytes)").type, pa.int64())
+            self.assertEqual(table.schema.field("Depth").type, pa.int32())
+            self.assertEqual(table.schema.field("ModifiedTime").type, pa.timestamp("us"))
+            for name in ("Type", "Extension", "Parent"):
+                self.assertTrue(pa.types.is_dictionary(table.schema.field(name).type), f"{suffix} {name}")
+            rows = [list(r.values()) for r in table.to_pylist()]
+            self.assertEqual(rows, self.rows, suffix)
+
+    @unittest.skipIf(pandas is None, "需要 pandas")
+    def test_pandas_dtypes(self):
+        for suffix, read in ((".parquet", pandas.read_parquet), (".feather", pandas.read_feather)):
+            df = read(self.write(suffix))
+            self.assertEqual(str(df["Depth"].dtype), "int32")
+            self.assertTrue(str(df["ModifiedTime"].dtype).startswith("datetime64"), suffix)
+            for name in ("Type", "Extension", "Parent"):
+                self.assertEqual(str(df[name].dtype), "category", f"{suffix} {name}")
+            self.assertEqual(sorted(df["Type"].cat.categories), ["File", "Folder"])
+            self.assertEqual(len(df), len(self.rows))
+
+    def test_parquet_row_group_dictionary_is_local(self):
+        pf = pq.ParquetFile(self.write(".parquet"))
+        self.assertGreater(pf.num_row_groups, 2)
+        for g in range(pf.num_row_groups):
+            col = pf.read_row_group(g, columns=["Parent"]).column("Parent").combine_chunks()
+            self.assertEqual(sorted(col.dictionary.to_pylist()), sorted(set(col.to_pylist()) - {None}), g)
+
+
+if __name__ == "__main__":
+    unittest.main()
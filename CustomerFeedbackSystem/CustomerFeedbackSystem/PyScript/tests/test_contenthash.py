@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""ContentHash：小檔的取樣雜湊即完整雜湊，且以固定緩衝區讀取。執行：python -m pytest tests"""
+import builtins
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ContentHash  # noqa: E402
+from ContentHash import READ_BUFFER, DuplicateFinder, file_digest  # noqa: E402
+
+
+class _RecordingFile:
+    def __init__(self, f, sizes):
+        self._f = f
+        self._sizes = sizes
+
+    def read(self, n=-1):
+        self._sizes.append(n)
+        return self._f.read(n)
+
+    def readinto(self, buf):
+        self._sizes.append(len(buf))
+        return self._f.readinto(buf)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+        return False
+
+
+class SampleDigestTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        self.finder = DuplicateFinder(workers=1, sample_size=64 * 1024)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def sample(self, path: Path, size: int, sizes: list):
+        real_open = builtins.open
+
+        def recording_open(*args, **kwargs):
+            return _RecordingFile(real_open(*args, **kwargs), sizes)
+
+        with mock.patch.object(ContentHash, "open", recording_open, create=True):
+            return self.finder._sample_digest(str(path), size)
+
+    def test_small_file_is_full_digest(self):
+        for size in (1, 1000, 128 * 1024):
+            p = self.base / f"f{size}"
+            p.write_bytes(bytes(range(256)) * (size // 256) + b"x" * (size % 256))
+            sizes = []
+            self.assertEqual(self.sample(p, size, sizes), (file_digest(p)[0], True, size))
+            self.assertTrue(all(0 < n <= size + 1 for n in sizes), sizes)
+
+    def test_file_grown_after_scan_read_in_bounded_chunks(self):
+        p = self.base / "grown"
+        p.write_bytes(b"a" * (3 * READ_BUFFER))
+        sizes = []
+        digest, complete, read = self.sample(p, 100, sizes)
+        self.assertEqual((digest, complete, read), (file_digest(p)[0], True, 3 * READ_BUFFER))
+        self.assertTrue(all(0 < n <= READ_BUFFER for n in sizes), sizes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""ConverterPool 以假後端測試卡住、當掉、轉檔失敗；ComBackend 啟動 Word 時持有跨行程 mutex。執行：python -m pytest tests"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import DocConverter  # noqa: E402
+from DocConverter import ComBackend, ConverterBackend, ConverterPool  # noqa: E402
+
+
+class FakeBackend(ConverterBackend):
+    """來源內容決定行為：hang 卡住、crash 讓工作行程直接結束、fail 丟出例外，其餘複製到輸出。"""
+
+    name = "fake"
+
+    def convert(self, src: Path, dst: Path, macro_enabled: bool = False):
+        data = src.read_text()
+        if data == "hang":
+            time.sleep(60)
+        if data == "crash":
+            os._exit(3)
+        if data == "fail":
+            raise RuntimeError("bad doc")
+        shutil.copyfile(src, dst)
+
+
+class ConverterPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def tasks(self, *contents):
+        for i, data in enumerate(contents):
+            src = self.base / f"{i}_{data}.doc"
+            src.write_text(data)
+            yield i, src, self.base / f"{i}_{data}.docx", False
+
+    def test_hang_crash_fail(self):
+        pool = ConverterPool(FakeBackend, workers=2, timeout=2.0, poll=0.05)
+        results = {r.key: r for r in pool.run(self.tasks("ok", "hang", "crash", "fail", "ok"))}
+
+        self.assertEqual(sorted(results), [0, 1, 2, 3, 4])
+        for key in (0, 4):
+            self.assertTrue(results[key].ok, results[key].message)
+            self.assertEqual(results[key].dst.read_text(), "ok")
+        self.assertFalse(results[1].ok)
+        self.assertIn("逾時", results[1].message)
+        self.assertFalse(results[2].ok)
+        self.assertIn("異常結束", results[2].message)
+        self.assertFalse(results[3].ok)
+        self.assertEqual(results[3].message, "ERROR: bad doc")
+        # 卡住與當掉的工作行程各重新啟動一次
+        self.assertEqual(pool.restarts, 2)
+
+    def test_retries(self):
+        pool = ConverterPool(FakeBackend, workers=1, timeout=2.0, poll=0.05, retries=1)
+        results = {r.key: r for r in pool.run(self.tasks("crash", "ok"))}
+        self.assertFalse(results[0].ok)
+        self.assertEqual(results[0].attempts, 2)
+        self.assertTrue(results[1].ok)
+        self.assertEqual(results[1].attempts, 1)
+        self.assertEqual(pool.retried, 1)
+
+    def test_crash_seen_while_exiting_is_not_lost(self):
+        # 當掉的行程第一次 is_alive() 仍為 True（尚未結束完），之後才是 False
+        real = DocConverter.Process.is_alive
+        seen = set()
+
+        def is_alive(proc):
+            alive = real(proc)
+            if not alive and proc.pid not in seen:
+                seen.add(proc.pid)
+                return True
+            return alive
+
+        with mock.patch.object(DocConverter.Process, "is_alive", is_alive):
+            pool = ConverterPool(FakeBackend, workers=1, timeout=5.0, poll=0.05)
+            results = {r.key: r for r in pool.run(self.tasks("crash", "ok"))}
+        self.assertEqual(sorted(results), [0, 1])
+        self.assertIn("異常結束", results[0].message)
+        self.assertTrue(results[1].ok)
+
+
+class ComStartupLockTest(unittest.TestCase):
+    def test_word_started_while_holding_mutex(self):
+        events = []
+        win32event = types.SimpleNamespace(
+            WAIT_TIMEOUT=0x102,
+            CreateMutex=lambda sa, owner, name: events.append(("create", name)) or mock.Mock(),
+            WaitForSingleObject=lambda h, ms: events.append("wait") or 0,
+            ReleaseMutex=lambda h: events.append("release"),
+        )
+        win32com = types.ModuleType("win32com")
+        win32com.client = types.SimpleNamespace(DispatchEx=lambda prog: events.append("dispatch") or mock.Mock())
+        modules = {
+            "pythoncom": types.SimpleNamespace(CoInitialize=lambda: None),
+            "win32com": win32com,
+            "win32com.client": win32com.client,
+            "win32event": win32event,
+        }
+        pids = iter([{100}, {100, 200}])
+
+        def word_pids():
+            events.append("pids")
+            return next(pids)
+
+        with mock.patch.dict(sys.modules, modules), mock.patch.object(DocConverter, "_word_pids", word_pids):
+            backend = ComBackend()
+            backend.start()
+        self.assertEqual(
+            events,
+            [("create", DocConverter.WORD_STARTUP_MUTEX), "wait", "pids", "dispatch", "pids", "release"],
+        )
+        self.assertEqual(backend.helper_pids(), [200])
+
+
+if __name__ == "__main__":
+    unittest.main()
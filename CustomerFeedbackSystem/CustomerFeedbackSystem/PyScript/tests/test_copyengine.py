@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""CopyEngine：記錄檔接續時保留目的檔名、內容相同略過與檔名配發。執行：python -m pytest tests"""
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import CopyEngine as copy_engine  # noqa: E402
+from CopyEngine import CopyEngine, CopyJournal  # noqa: E402
+
+
+class JournalResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = Path(self.tmp.name)
+        self.out = base / "out"
+        self.out.mkdir()
+        self.journal_path = base / "copy.journal"
+        self.src = {}
+        for d in ("a", "b", "c"):
+            (base / d).mkdir()
+            p = base / d / "foo.txt"
+            p.write_text(f"content of {d}")
+            self.src[d] = p
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, sources):
+        journal = CopyJournal(self.journal_path)
+        try:
+            engine = CopyEngine(self.out, workers=2, copy_func=shutil.copy2, journal=journal)
+            return list(engine.run(sources))
+        finally:
+            journal.close()
+
+    def test_journal_names_reserved_for_their_sources(self):
+        first = self._run([self.src["a"], self.src["b"]])
+        self.assertEqual([r.dst.name for r in first], ["foo.txt", "foo (2).txt"])
+        (self.out / "foo (2).txt").unlink()
+
+        second = self._run([self.src["a"], self.src["c"], self.src["b"]])
+        by_src = {r.src: r for r in second}
+        self.assertEqual(by_src[self.src["a"]].status, "journaled")
+        self.assertEqual(by_src[self.src["b"]].status, "copied")
+        self.assertEqual(by_src[self.src["b"]].dst.name, "foo (2).txt")
+        c = by_src[self.src["c"]]
+        self.assertEqual(c.status, "copied")
+        self.assertNotEqual(c.dst, by_src[self.src["b"]].dst)
+        # 每個來源的內容都完整保留在各自的目的檔
+        for r in second:
+            self.assertEqual(r.dst.read_text(), r.src.read_text())
+
+
+class SkipIdenticalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = Path(self.tmp.name)
+        self.out = base / "out"
+        self.out.mkdir()
+        (self.out / "existing.txt").write_text("same")
+        self.src = []
+        for d, text in (("a", "same"), ("b", "diff"), ("c", "diff"), ("d", "long content")):
+            (base / d).mkdir()
+            p = base / d / "foo.txt"
+            p.write_text(text)
+            self.src.append(p)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_identical_skipped_and_names_reserved_in_order(self):
+        real_digest = copy_engine.file_digest
+        hashed_on = []
+
+        def digest(path):
+            hashed_on.append(threading.current_thread())
+            return real_digest(path)
+
+        with mock.patch.object(copy_engine, "file_digest", digest):
+            engine = CopyEngine(self.out, workers=4, skip_identical=True, copy_func=shutil.copy2)
+            results = list(engine.run(self.src))
+
+        self.assertEqual([r.src for r in results], self.src)
+        self.assertEqual([r.status for r in results], ["identical", "copied", "identical", "copied"])
+        self.assertEqual(results[0].dst, self.out / "existing.txt")
+        # foo.txt 保留給 a（內容相同略過後空出），b 依序配到 foo (2).txt，c 與 b 的輸出相同
+        self.assertEqual(results[1].dst.name, "foo (2).txt")
+        self.assertEqual(results[2].dst, results[1].dst)
+        self.assertEqual(results[3].dst.name, "foo (4).txt")
+        self.assertEqual((self.out / "foo (2).txt").read_text(), "diff")
+        self.assertEqual(sorted(p.name for p in self.out.iterdir()), ["existing.txt", "foo (2).txt", "foo (4).txt"])
+        # 內容比對只在複製工作執行緒讀檔，規劃（主執行緒）不讀檔
+        self.assertTrue(hashed_on)
+        self.assertNotIn(threading.main_thread(), hashed_on)
+
+    def test_unique_size_not_read(self):
+        with mock.patch.object(copy_engine, "file_digest", side_effect=AssertionError("不應讀檔")):
+            engine = CopyEngine(self.out, workers=2, skip_identical=True, copy_func=shutil.copy2)
+            results = list(engine.run(self.src[3:]))
+        self.assertEqual([r.status for r in results], ["copied"])
+        self.assertEqual(results[0].dst.name, "foo.txt")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+CsvStreamWriter：resume 時截掉寫到一半的最後一列、表頭不同時拒絕接續，
+以及 VerifyDoc --resume 從中斷的 CSV 接續後，資料列與統計和一次跑完相同。
+執行：python -m pytest tests
+"""
+import contextlib
+import csv
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VerifyDoc  # noqa: E402
+from CsvStream import CSV_ENCODING, CsvStreamWriter  # noqa: E402
+from SyntheticTree import generate  # noqa: E402
+
+FIELDS = ["Path", "Kind", "Note"]
+
+
+def read_rows(path: Path):
+    with open(path, "r", newline="", encoding=CSV_ENCODING) as f:
+        return list(csv.reader(f))
+
+
+class CsvStreamWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "out.csv"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rows, resume=False, fields=FIELDS):
+        w = CsvStreamWriter(self.path, fields, resume=resume, flush_every=2)
+        existing = list(w.existing_rows())
+        with w.open():
+            for r in rows:
+                w.writerow(dict(zip(fields, r)))
+        return existing
+
+    def test_resume_drops_partial_tail(self):
+        self.write([["a", "DOCX", "多行\n備註"], ["b", "RTF", ""]])
+        with open(self.path, "ab") as f:
+            f.write('c,NOT-WORD,寫到一'.encode("utf-8"))
+        existing = self.write([["c", "NOT-WORD", "x"]], resume=True)
+        self.assertEqual([r["Path"] for r in existing], ["a", "b"])
+        self.assertEqual(existing[0]["Note"], "多行\n備註")
+        # 接續寫入不重複表頭、也不再寫一次 BOM
+        self.assertEqual(read_rows(self.path), [
+            FIELDS, ["a", "DOCX", "多行\n備註"], ["b", "RTF", ""], ["c", "NOT-WORD", "x"],
+        ])
+        self.assertEqual(self.path.read_bytes().count(b"\xef\xbb\xbf"), 1)
+
+    def test_resume_partial_header_starts_over(self):
+        self.path.write_bytes("﻿Path,Ki".encode("utf-8"))
+        self.assertEqual(self.write([["a", "DOCX", ""]], resume=True), [])
+        self.assertEqual(read_rows(self.path), [FIELDS, ["a", "DOCX", ""]])
+
+    def test_header_mismatch_refused(self):
+        self.write([["a", "DOCX", ""]])
+        before = self.path.read_bytes()
+        w = CsvStreamWriter(self.path, FIELDS + ["Encrypted"], resume=True)
+        with self.assertRaises(SystemExit) as cm:
+            list(w.existing_rows())
+        self.assertIn("欄位", str(cm.exception))
+        self.assertEqual(self.path.read_bytes(), before)
+
+    def test_without_resume_overwrites(self):
+        self.write([["a", "DOCX", ""]])
+        self.assertEqual(self.write([["b", "RTF", ""]]), [])
+        self.assertEqual(read_rows(self.path), [FIELDS, ["b", "RTF", ""]])
+
+
+class VerifyDocResumeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.base = Path(cls.tmp.name)
+        generate(cls.base / "gen", files=60, depth=2, fanout=3, median_kb=8, max_kb=64)
+        cls.tree = cls.base / "gen" / "tree"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def run_main(self, out: Path, *extra) -> str:
+        buf = io.StringIO()
+        argv = ["VerifyDoc.py", str(self.tree), "--csv", str(out), "--workers", "1", "--deep-ole", *extra]
+        with mock.patch.object(sys, "argv", argv), \
+                contextlib.redirect_stdout(buf), contextlib.redirect_stderr(io.StringIO()):
+            VerifyDoc.main()
+        out_text = buf.getvalue()
+        return out_text[out_text.index("=== 統計 ==="):out_text.index("已輸出 CSV")]
+
+    def test_resume_matches_clean_run(self):
+        clean = self.base / "clean.csv"
+        clean_stats = self.run_main(clean)
+        clean_rows = read_rows(clean)
+        self.assertGreater(len(clean_rows), 40)
+
+        # 模擬中斷：保留表頭與前 20 列，第 21 列只寫了一半
+        data = clean.read_bytes()
+        lines = data.split(b"\n")
+        partial = self.base / "partial.csv"
+        partial.write_bytes(b"\n".join(lines[:21]) + b"\n" + lines[21][:len(lines[21]) // 2])
+        resumed_stats = self.run_main(partial, "--resume")
+        self.assertEqual(read_rows(partial), clean_rows)
+        self.assertEqual(resumed_stats, clean_stats)
+
+        # 已全部輸出時再接續：不重複任何列
+        self.assertEqual(self.run_main(partial, "--resume"), clean_stats)
+        self.assertEqual(read_rows(partial), clean_rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
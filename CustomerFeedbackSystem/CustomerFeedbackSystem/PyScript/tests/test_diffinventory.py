@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+DiffInventory：removed / added / modified / renamed、只有一對一才算改名、--content 在多個同大小候選中配對、
+--workers 1 與多個子行程結果相同，以及同一份清單的 .csv / .xlsx / .parquet / .feather 互比沒有差異。
+執行：python -m pytest tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from DiffInventory import InventoryDiff  # noqa: E402
+from DirWalker import walk  # noqa: E402
+from ListAllFilePath import (  # noqa: E402
+    HEADERS, entry_row, export_to_columnar, export_to_csv_stream, export_to_excel,
+)
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    pyarrow = None
+
+MTIME = 1_700_000_000  # 整秒：各格式的修改時間都只到秒
+
+
+def write_inventory(root: Path, out: Path) -> Path:
+    rows = [entry_row(root, entry, is_dir) for _, entry, is_dir, _ in walk([root], prestat=True)]
+    suffix = out.suffix.lower()
+    if suffix == ".csv":
+        export_to_csv_stream(rows, list(HEADERS), out)
+    elif suffix == ".xlsx":
+        export_to_excel(rows, list(HEADERS), out)
+    else:
+        export_to_columnar(rows, list(HEADERS), out)
+    return out
+
+
+def diff(before: Path, after: Path, **opts):
+    d = InventoryDiff(**opts)
+    rows = sorted((s, old.rel if old else "", new.rel if new else "") for s, old, new in d.run(before, after))
+    return rows, d
+
+
+class DiffInventoryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        a = self.base / "a"
+        (a / "sub").mkdir(parents=True)
+        files = {
+            "keep.txt": b"k",
+            "mod.txt": b"mm",
+            "gone.txt": b"ggg",
+            "old.txt": b"oooo",
+            # 同大小同修改時間的三個檔案
+            "sub/x1.bin": b"1" * 100,
+            "sub/x2.bin": b"2" * 100,
+            "sub/x3.bin": b"3" * 100,
+        }
+        for rel, data in files.items():
+            (a / rel).write_bytes(data)
+            os.utime(a / rel, (MTIME, MTIME))
+        # 後一份：複製後再修改（兩份的 FullPath 都可讀取，--content 才能比對內容）
+        b = self.base / "b"
+        shutil.copytree(a, b)
+        (b / "mod.txt").write_bytes(b"modified")
+        os.utime(b / "mod.txt", (MTIME, MTIME))
+        (b / "gone.txt").unlink()
+        (b / "added.txt").write_bytes(b"added!")
+        os.utime(b / "added.txt", (MTIME, MTIME))
+        os.rename(b / "old.txt", b / "sub" / "new.txt")
+        # 三個同大小的檔案改名且順序打亂
+        for src, dst in (("x1", "y3"), ("x2", "y1"), ("x3", "y2")):
+            os.rename(b / "sub" / f"{src}.bin", b / "sub" / f"{dst}.bin")
+        self.before = write_inventory(a, self.base / "before.csv")
+        self.after = write_inventory(b, self.base / "after.csv")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_statuses_and_one_to_one_rename(self):
+        rows, d = diff(self.before, self.after, workers=1)
+        self.assertEqual(rows, [
+            ("added", "", "added.txt"),
+            ("added", "", "sub/y1.bin"),
+            ("added", "", "sub/y2.bin"),
+            ("added", "", "sub/y3.bin"),
+            ("modified", "mod.txt", "mod.txt"),
+            ("removed", "gone.txt", ""),
+            # 三個同大小同時間的檔案不任意配對
+            ("removed", "sub/x1.bin", ""),
+            ("removed", "sub/x2.bin", ""),
+            ("removed", "sub/x3.bin", ""),
+            ("renamed", "old.txt", "sub/new.txt"),
+        ])
+        self.assertEqual((d.before, d.after, d.unchanged), (7, 7, 1))
+        self.assertEqual(d.counts, {"removed": 4, "added": 4, "modified": 1, "renamed": 1})
+
+    def test_content_pairs_same_size_candidates(self):
+        rows, d = diff(self.before, self.after, workers=1, content=True, hash_workers=2)
+        self.assertEqual(rows, [
+            ("added", "", "added.txt"),
+            ("modified", "mod.txt", "mod.txt"),
+            ("removed", "gone.txt", ""),
+            ("renamed", "old.txt", "sub/new.txt"),
+            ("renamed", "sub/x1.bin", "sub/y3.bin"),
+            ("renamed", "sub/x2.bin", "sub/y1.bin"),
+            ("renamed", "sub/x3.bin", "sub/y2.bin"),
+        ])
+        self.assertEqual(d.hash_errors, {})
+
+    def test_workers_match_serial(self):
+        for content in (False, True):
+            serial, d1 = diff(self.before, self.after, workers=1, content=content)
+            parallel, d2 = diff(self.before, self.after, workers=2, content=content)
+            self.assertEqual(parallel, serial)
+            self.assertEqual(d2.counts, d1.counts)
+            self.assertEqual((d2.before, d2.after, d2.unchanged), (d1.before, d1.after, d1.unchanged))
+
+    def test_formats_compare_equal(self):
+        a = self.base / "a"
+        # .parquet / .feather 需要 pyarrow
+        suffixes = [".xlsx"] + ([".parquet", ".feather"] if pyarrow is not None else [])
+        for suffix in suffixes:
+            other = write_inventory(a, self.base / f"before{suffix}")
+            for left, right in ((self.before, other), (other, self.before)):
+                rows, d = diff(left, right, workers=1)
+                self.assertEqual(rows, [], suffix)
+                self.assertEqual((d.before, d.after, d.unchanged), (7, 7, 7))
+
+
+if __name__ == "__main__":
+    unittest.main()
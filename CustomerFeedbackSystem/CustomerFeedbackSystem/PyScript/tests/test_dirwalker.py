@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""DirWalker：掃描中途資料夾讀取失敗（網路磁碟斷線等）時不可卡住。執行：python -m pytest tests"""
+import errno
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import DirWalker  # noqa: E402
+
+_real_scandir = os.scandir
+
+
+def _failing_scandir(bad: str, exc: BaseException):
+    def fake(path):
+        if os.path.basename(path) == bad:
+            raise exc
+        return _real_scandir(path)
+    return fake
+
+
+class WalkFailureTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        for d in ("a", "b", "c"):
+            (root / d / "sub").mkdir(parents=True)
+            (root / d / "f.txt").write_text("x")
+            (root / d / "sub" / "g.txt").write_text("y")
+        self.root = root
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _walk(self, workers: int, timeout: float = 10.0):
+        """在另一個執行緒走訪，逾時視為卡住；回傳 (相對路徑集合, 例外)。"""
+        result = {}
+
+        def run():
+            try:
+                result["paths"] = {
+                    Path(e.path).relative_to(self.root).as_posix()
+                    for _, e, _, _ in DirWalker.walk([self.root], workers=workers)
+                }
+            except BaseException as e:
+                result["error"] = e
+
+        t = threading.Thread(target=run, daemon=True)
+        t.start()
+        t.join(timeout)
+        self.assertFalse(t.is_alive(), f"walk(workers={workers}) 卡住")
+        return result.get("paths"), result.get("error")
+
+    def test_oserror_skips_directory(self):
+        fake = _failing_scandir("b", OSError(errno.EIO, "Input/output error"))
+        for workers in (1, 4):
+            with mock.patch.object(DirWalker.os, "scandir", fake):
+                paths, error = self._walk(workers)
+            self.assertIsNone(error)
+            self.assertIn("b", paths)
+            self.assertNotIn("b/f.txt", paths)
+            self.assertIn("a/sub/g.txt", paths)
+            self.assertIn("c/sub/g.txt", paths)
+
+    def test_unexpected_error_reaches_caller(self):
+        fake = _failing_scandir("sub", RuntimeError("boom"))
+        with mock.patch.object(DirWalker.os, "scandir", fake):
+            _, error = self._walk(4)
+        self.assertIsInstance(error, RuntimeError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+DocToDocx.main 以假後端測試：增量轉檔（略過未變更、來源變更時轉到 .partial 再取代、雜湊在工作行程計算），
+以及輸出驗證失敗時移往隔離資料夾、不寫入增量紀錄、列入 --report。
+執行：python -m pytest tests
+"""
+import contextlib
+import csv
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import DocConverter  # noqa: E402
+import DocToDocx  # noqa: E402
+from ContentHash import file_digest  # noqa: E402
+from DocConverter import ConverterBackend  # noqa: E402
+from SyntheticTree import make_ooxml_doc  # noqa: E402
+
+
+class FakeBackend(ConverterBackend):
+    """
+    輸出大小隨來源內容而變的 DOCX（macro_enabled 時為 DOCM）；來源以 bad 開頭時寫出不是 DOCX 的檔案。
+    每次轉檔在輸出資料夾的上一層 converted.log 記下「來源\\t輸出檔名」。
+    """
+
+    name = "fake"
+
+    def convert(self, src: Path, dst: Path, macro_enabled: bool = False):
+        data = src.read_bytes()
+        if data.startswith(b"bad"):
+            dst.write_bytes(b"plain text, not a zip")
+        else:
+            dst.write_bytes(make_ooxml_doc(4096 + len(data), "docm" if macro_enabled else "docx"))
+        with open(dst.parent.parent / "converted.log", "a", encoding="utf-8") as f:
+            f.write(f"{src.name}\t{dst.name}\n")
+
+
+class DocToDocxCase(unittest.TestCase):
+    backend = FakeBackend
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        self.src = self.base / "src"
+        self.src.mkdir()
+        self.out = self.base / "out"
+        self.list = self.base / "list.txt"
+        self.runs = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_sources(self, **contents):
+        for stem, data in contents.items():
+            (self.src / f"{stem}.doc").write_bytes(data)
+        self.list.write_text("\n".join(str(p) for p in sorted(self.src.iterdir())) + "\n", encoding="utf-8")
+
+    def run_main(self, *extra) -> dict:
+        """執行 DocToDocx.main，回傳 --report 的 {來源檔名: 該列}。"""
+        self.runs += 1
+        report = self.base / f"report{self.runs}.csv"
+        argv = ["DocToDocx.py", str(self.list), "-o", str(self.out), "--backend", self.backend.name,
+                "--workers", "1", "--report", str(report), *map(str, extra)]
+        with mock.patch.dict(DocToDocx.BACKENDS, {self.backend.name: self.backend}), \
+                mock.patch.object(sys, "argv", argv), \
+                contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            DocToDocx.main()
+        with open(report, encoding="utf-8-sig", newline="") as f:
+            return {Path(row["Source"]).name: row for row in csv.DictReader(f)}
+
+    def conversions(self):
+        log = self.base / "converted.log"
+        return log.read_text(encoding="utf-8").splitlines() if log.exists() else []
+
+    def manifest(self):
+        db = self.base / "out.convert_manifest.sqlite"
+        with sqlite3.connect(str(db)) as conn:
+            return {Path(src).name: (digest, Path(dst).name)
+                    for src, digest, dst in conn.execute("SELECT src, hash, dst FROM outputs")}
+
+
+class IncrementalTest(DocToDocxCase):
+    def test_skip_reconvert_and_replace(self):
+        self.write_sources(a=b"aaa", b=b"bbb")
+        pid_log = self.base / "digest_pids.log"
+        real_digest = DocConverter.file_digest
+
+        def digest(path, *args, **kwargs):
+            with open(pid_log, "a") as f:
+                f.write(f"{os.getpid()}\n")
+            return real_digest(path, *args, **kwargs)
+
+        with mock.patch.object(DocConverter, "file_digest", digest):
+            rows = self.run_main("--incremental")
+        self.assertEqual({k: r["Status"] for k, r in rows.items()}, {"a.doc": "converted", "b.doc": "converted"})
+        self.assertEqual(self.conversions(), ["a.doc\ta.docx", "b.doc\tb.docx"])
+        # 來源雜湊在工作行程計算並隨結果送回，主行程不再讀取來源
+        pids = set(pid_log.read_text().split())
+        self.assertEqual(len(pids), 1)
+        self.assertNotIn(str(os.getpid()), pids)
+        self.assertEqual(self.manifest(), {
+            "a.doc": (file_digest(self.src / "a.doc")[0], "a.docx"),
+            "b.doc": (file_digest(self.src / "b.doc")[0], "b.docx"),
+        })
+
+        # 未變更：全部略過
+        rows = self.run_main("--incremental")
+        self.assertEqual({k: r["Status"] for k, r in rows.items()}, {"a.doc": "up-to-date", "b.doc": "up-to-date"})
+        self.assertEqual(len(self.conversions()), 2)
+
+        # 來源變更：轉到 a.partial.docx，成功後以 os.replace 取代 a.docx
+        self.write_sources(a=b"changed source")
+        replaced = []
+        real_replace = os.replace
+
+        def replace(src, dst):
+            replaced.append((Path(src).name, Path(dst).name))
+            return real_replace(src, dst)
+
+        with mock.patch.object(DocToDocx.os, "replace", replace):
+            rows = self.run_main("--incremental")
+        self.assertEqual(rows["a.doc"]["Status"], "converted")
+        self.assertEqual(rows["b.doc"]["Status"], "up-to-date")
+        self.assertEqual(self.conversions()[2:], ["a.doc\ta.partial.docx"])
+        self.assertEqual(replaced, [("a.partial.docx", "a.docx")])
+        self.assertEqual(sorted(p.name for p in self.out.iterdir()), ["a.docx", "b.docx"])
+        self.assertEqual((self.out / "a.docx").read_bytes(), make_ooxml_doc(4096 + len(b"changed source")))
+        self.assertEqual(self.manifest()["a.doc"], (file_digest(self.src / "a.doc")[0], "a.docx"))
+
+
+class QuarantineTest(DocToDocxCase):
+    def test_invalid_output_quarantined(self):
+        self.write_sources(good=b"good", bad=b"bad source")
+        rows = self.run_main("--incremental")
+
+        # 重試一次後仍不是 DOCX：移到隔離資料夾，輸出資料夾只留合格的檔案
+        self.assertEqual(self.conversions(), ["bad.doc\tbad.docx", "bad.doc\tbad.docx", "good.doc\tgood.docx"])
+        q_dir = self.base / "out_quarantine"
+        self.assertEqual([p.name for p in q_dir.iterdir()], ["bad.docx"])
+        self.assertEqual(sorted(p.name for p in self.out.iterdir()), ["good.docx"])
+
+        bad = rows["bad.doc"]
+        self.assertEqual(bad["Status"], "quarantined")
+        self.assertEqual(bad["Output"], str(q_dir / "bad.docx"))
+        self.assertEqual(bad["Kind"], "NOT-WORD")
+        self.assertEqual(bad["Attempts"], "2")
+        self.assertIn("輸出驗證失敗", bad["Message"])
+        self.assertEqual(rows["good.doc"]["Status"], "converted")
+        self.assertEqual(rows["good.doc"]["Kind"], "DOCX")
+
+        # 不合格的輸出沒有增量紀錄，下次仍會重新轉檔；隔離資料夾已有同名檔時另存 (2)
+        self.assertEqual(set(self.manifest()), {"good.doc"})
+        rows = self.run_main("--incremental")
+        self.assertEqual(rows["bad.doc"]["Status"], "quarantined")
+        self.assertEqual(rows["bad.doc"]["Output"], str(q_dir / "bad (2).docx"))
+        self.assertEqual(rows["good.doc"]["Status"], "up-to-date")
+
+    def test_macro_enabled_expects_docm(self):
+        self.write_sources(a=b"aaa")
+        rows = self.run_main("--macro-enabled")
+        self.assertEqual(rows["a.doc"]["Status"], "converted")
+        self.assertEqual(rows["a.doc"]["Kind"], "DOCM")
+        self.assertEqual(rows["a.doc"]["Output"], str(self.out / "a.docm"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""FastCopy.copy_fd：核心方式第一次就回傳 0 時改用下一種方式；複製量與來源大小不符時報錯。執行：python -m pytest tests"""
+import os
+import sys
+import tempfile
+import unittest
+from itertools import count
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import FastCopy  # noqa: E402
+
+DATA = os.urandom(300 * 1024)
+# 每個測試使用不同的假裝置組，不受其他測試停用的方式影響
+_devices = count(1000)
+
+
+def _no_reflink(sfd, dfd, size):
+    raise OSError(FastCopy.errno.EOPNOTSUPP, "reflink")
+
+
+class CopyFdTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = Path(self.tmp.name) / "src.bin"
+        self.src.write_bytes(DATA)
+        self.dst = Path(self.tmp.name) / "dst.bin"
+        self.devices = (next(_devices), next(_devices))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def copy(self) -> str:
+        with open(self.src, "rb", buffering=0) as fsrc, open(self.dst, "wb", buffering=0) as fdst:
+            return FastCopy.copy_fd(fsrc.fileno(), fdst.fileno(), len(DATA), self.devices)
+
+    @unittest.skipUnless(hasattr(os, "copy_file_range") and hasattr(os, "sendfile"), "需要 copy_file_range 與 sendfile")
+    def test_zero_at_start_falls_back(self):
+        with mock.patch.object(FastCopy, "_reflink", _no_reflink), \
+                mock.patch.object(FastCopy.os, "copy_file_range", return_value=0):
+            self.assertEqual(self.copy(), "sendfile")
+        self.assertEqual(self.dst.read_bytes(), DATA)
+        self.assertIn("copy_file_range", FastCopy._disabled[self.devices])
+
+    @unittest.skipUnless(hasattr(os, "sendfile") and os.name == "posix", "需要 sendfile")
+    def test_short_copy_raises(self):
+        real_sendfile = os.sendfile
+
+        def short_sendfile(out_fd, in_fd, offset, count):
+            # 模擬來源在複製途中被截斷：只送出前 100 KiB
+            return real_sendfile(out_fd, in_fd, offset, max(0, min(count, 100 * 1024 - offset)))
+
+        with mock.patch.object(FastCopy, "_reflink", _no_reflink), \
+                mock.patch.object(FastCopy, "_copy_file_range", _no_reflink), \
+                mock.patch.object(FastCopy.os, "sendfile", short_sendfile):
+            with self.assertRaises(OSError) as cm:
+                self.copy()
+        self.assertEqual(cm.exception.errno, FastCopy.errno.EIO)
+        self.assertNotIn("sendfile", FastCopy._disabled[self.devices])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+InventoryStore：匯出的資料列與 entry_row 完全相同（datetime 在匯出時才產生、同一資料夾的 Parent 共用同一個字串），
+以及 find / children 查詢（find 以每個資料夾一份的名稱字典查詢）、加入項目後查詢結果更新。
+執行：python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+from array import array
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from DirWalker import walk  # noqa: E402
+from InventoryStore import InventoryStore  # noqa: E402
+from ListAllFilePath import entry_row  # noqa: E402
+
+MTIME = 1_700_000_000.25
+
+
+class InventoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / "tree"
+        files = {
+            "a.TXT": b"a",
+            "報告.docx": b"docx",
+            "sub/b.bin": b"bb",
+            "sub/c.bin": b"cc",
+            "sub/深層/d": b"",
+            "empty_dir/.keep": b"keep.",
+        }
+        for rel, data in files.items():
+            p = self.root / rel
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.write_bytes(data)
+            os.utime(p, (MTIME, MTIME))
+        (self.root / "sub" / "空資料夾").mkdir()
+        if sys.platform != "win32":
+            # 無法以 UTF-8 解碼的檔名：以 surrogateescape 保存並原樣還原
+            with open(os.fsencode(self.root / "sub") + b"/bad\xff.txt", "wb") as f:
+                f.write(b"xyz")
+        self.items = list(walk([self.root], prestat=True))
+        self.store = InventoryStore(self.root)
+        for _, entry, is_dir, _ in self.items:
+            self.store.add(entry, is_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rows_match_entry_row(self):
+        expected = [entry_row(self.root, entry, is_dir) for _, entry, is_dir, _ in self.items]
+        rows = list(self.store.rows())
+        self.assertEqual(rows, expected)
+        self.assertEqual(len(self.store), len(expected))
+        self.assertEqual(self.store.row(self.store.find("a.TXT"))[4], datetime.fromtimestamp(MTIME))
+
+    def test_lazy_datetimes_and_interned_dirs(self):
+        # 時間以 float 陣列保存，datetime 只在 row() 產生
+        self.assertIsInstance(self.store._mtime, array)
+        self.assertFalse(any(isinstance(v, datetime) for v in vars(self.store).values()))
+        dirs = sorted(entry_row(self.root, e, True)[6] for _, e, is_dir, _ in self.items if is_dir)
+        self.assertEqual(sorted(self.store._dirs), sorted([""] + dirs))
+        # 同一資料夾的項目共用同一個 Parent 字串物件
+        b, c = self.store.row(self.store.find("sub/b.bin")), self.store.row(self.store.find("sub/c.bin"))
+        self.assertEqual(b[7], "sub")
+        self.assertIs(b[7], c[7])
+
+    def test_find_and_children(self):
+        for i in range(len(self.store)):
+            self.assertEqual(self.store.find(self.store.rel_path(i)), i)
+        self.assertIsNone(self.store.find("sub/missing.bin"))
+        self.assertIsNone(self.store.find("missing/b.bin"))
+        self.assertEqual(self.store.find("/sub/深層/d/"), self.store.find("sub/深層/d"))
+        # 同一資料夾再次查詢時直接查字典，不再走訪子項目
+        b = self.store.find("sub/b.bin")
+        with mock.patch.object(self.store, "_children_index", side_effect=AssertionError("scan again")):
+            self.assertEqual(self.store.find("sub/b.bin"), b)
+            self.assertIsNone(self.store.find("sub/x.bin"))
+        self.assertEqual(sorted(self.store.name(i) for i in self.store.children("sub/")),
+                         sorted(e.name for _, e, _, _ in self.items if Path(e.path).parent == self.root / "sub"))
+        self.assertEqual(self.store.children("sub/空資料夾"), [])
+        self.assertEqual(self.store.children("missing"), [])
+
+        # 查詢後再加入項目：查詢結果隨之更新
+        new = self.root / "sub" / "e.bin"
+        new.write_bytes(b"eeee")
+        entry = next(e for e in os.scandir(self.root / "sub") if e.name == "e.bin")
+        i = self.store.add(entry, False)
+        self.assertEqual(self.store.find("sub/e.bin"), i)
+        self.assertIn(i, self.store.children("sub"))
+        self.assertEqual(self.store.row(i), entry_row(self.root, entry, False))
+
+    def test_files_and_total_size(self):
+        files = dict(self.store.files())
+        self.assertEqual(files[str(self.root / "sub" / "b.bin")], 2)
+        self.assertNotIn(str(self.root / "sub"), files)
+        self.assertEqual(self.store.total_size(), sum(files.values()))
+        # 只有 b.bin / c.bin 大小相同（2 bytes），其餘大小唯一
+        shared = sorted(Path(p).name for p, _ in self.store.files(shared_size_only=True))
+        self.assertEqual(shared, ["b.bin", "c.bin"])
+
+
+if __name__ == "__main__":
+    unittest.main()
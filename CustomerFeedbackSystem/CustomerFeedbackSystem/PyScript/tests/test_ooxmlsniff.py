@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+OoxmlSniff.sniff_word_ooxml：DOCX / DOCM / DOTX / DOTM、Strict 命名空間、缺少 word/document.xml；
+ZIP64、加密項目與名稱大小寫不同時回傳 None，由 VerifyDoc 改用 zipfile 判斷。
+執行：python -m pytest tests
+"""
+import io
+import struct
+import sys
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VerifyDoc  # noqa: E402
+from OoxmlSniff import STRICT_NS, WORD_MAIN_TYPES, sniff_word_ooxml  # noqa: E402
+
+CONTENT_TYPE = {kind: ct.decode() for ct, kind in WORD_MAIN_TYPES.items()}
+TRANSITIONAL_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def make_ooxml(kind: str = "DOCX", ns: str = TRANSITIONAL_NS, main: bool = True,
+               content_types_name: str = "[Content_Types].xml") -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(
+            content_types_name,
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            f'<Override PartName="/word/document.xml" ContentType="{CONTENT_TYPE[kind]}"/></Types>',
+        )
+        if main:
+            zf.writestr("word/document.xml", f'<w:document xmlns:w="{ns}"><w:body/></w:document>')
+        zf.writestr("word/media/image1.png", b"\x89PNG" + bytes(2048), zipfile.ZIP_STORED)
+    return buf.getvalue()
+
+
+def to_zip64(data: bytes) -> bytes:
+    """改寫成 ZIP64 結尾（ZIP64 EOCD + locator，EOCD 欄位填 0xFFFF/0xFFFFFFFF），zipfile 仍可讀取。"""
+    eocd = data.rfind(b"PK\x05\x06")
+    _, _, _, _, count, cd_size, cd_offset, _ = struct.unpack("<4s4H2LH", data[eocd:eocd + 22])
+    record = struct.pack("<4sQ2H2L4Q", b"PK\x06\x06", 44, 45, 45, 0, 0, count, count, cd_size, cd_offset)
+    locator = struct.pack("<4sLQL", b"PK\x06\x07", 0, eocd, 1)
+    end = struct.pack("<4s4H2LH", b"PK\x05\x06", 0, 0, 0xFFFF, 0xFFFF, 0xFFFFFFFF, 0xFFFFFFFF, 0)
+    return data[:eocd] + record + locator + end
+
+
+def set_encrypted(data: bytes, name: bytes) -> bytes:
+    """在本地檔頭與中央目錄標記 name 項目為加密（general purpose flag bit 0）。"""
+    data = bytearray(data)
+    for sig, flag_at, name_at in ((b"PK\x03\x04", 6, 30), (b"PK\x01\x02", 8, 46)):
+        pos = data.find(sig)
+        while pos >= 0:
+            if data[pos + name_at:pos + name_at + len(name)] == name:
+                struct.pack_into("<H", data, pos + flag_at, struct.unpack_from("<H", data, pos + flag_at)[0] | 1)
+            pos = data.find(sig, pos + 1)
+    return bytes(data)
+
+
+def sniff(data: bytes):
+    return sniff_word_ooxml(io.BytesIO(data))
+
+
+class SniffTest(unittest.TestCase):
+    def test_kinds(self):
+        for kind in ("DOCX", "DOCM", "DOTX", "DOTM"):
+            self.assertEqual(sniff(make_ooxml(kind)), (True, kind, ""), kind)
+
+    def test_strict_namespace(self):
+        self.assertEqual(STRICT_NS, b"http://purl.oclc.org/ooxml/wordprocessingml/main")
+        self.assertEqual(sniff(make_ooxml("DOCX", ns=STRICT_NS.decode())), (True, "DOCX", "Strict"))
+
+    def test_missing_main_part(self):
+        self.assertEqual(sniff(make_ooxml(main=False)), (False, "缺少必要檔", ""))
+
+    def test_not_word(self):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("[Content_Types].xml", "<Types/>")
+            zf.writestr("word/document.xml", "<x/>")
+        self.assertEqual(sniff(buf.getvalue()), (False, "不是 Word OOXML", ""))
+
+    def test_unsupported_cases_return_none(self):
+        cases = {
+            "zip64": to_zip64(make_ooxml("DOCM")),
+            "encrypted": set_encrypted(make_ooxml(), b"[Content_Types].xml"),
+            "case": make_ooxml(content_types_name="[content_types].xml"),
+        }
+        for name, data in cases.items():
+            self.assertIsNone(sniff(data), name)
+
+
+class ZipfileFallbackTest(unittest.TestCase):
+    def docx_from_zip(self, data: bytes):
+        calls = []
+        real = VerifyDoc._docx_from_zipfile
+
+        def fallback(f):
+            calls.append(f.tell())
+            return real(f)
+
+        with mock.patch.object(VerifyDoc, "_docx_from_zipfile", fallback):
+            result = VerifyDoc._docx_from_zip(io.BytesIO(data))
+        return result, calls
+
+    def test_fast_path_skips_zipfile(self):
+        self.assertEqual(self.docx_from_zip(make_ooxml("DOTX")), ((True, "DOTX", ""), []))
+
+    def test_zip64_falls_back(self):
+        data = to_zip64(make_ooxml("DOCM"))
+        self.assertEqual(zipfile.ZipFile(io.BytesIO(data)).read("word/document.xml")[:11], b"<w:document")
+        # 改用 zipfile 前先回到檔頭
+        self.assertEqual(self.docx_from_zip(data), ((True, "DOCM", ""), [0]))
+
+    def test_encrypted_falls_back(self):
+        result, calls = self.docx_from_zip(set_encrypted(make_ooxml(), b"[Content_Types].xml"))
+        self.assertEqual(calls, [0])
+        self.assertFalse(result[0])
+        self.assertTrue(result[1].startswith("ZIP 解析失敗"), result[1])
+
+    def test_case_insensitive_names_fall_back(self):
+        data = make_ooxml("DOTM", content_types_name="[content_types].xml")
+        self.assertEqual(self.docx_from_zip(data), ((True, "DOTM", ""), [0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
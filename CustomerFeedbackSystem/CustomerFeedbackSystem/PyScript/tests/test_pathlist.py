@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""PathList.iter_xlsx_column：日期儲存格讀出 Excel 序號（不解析樣式），路徑與 openpyxl 版相同。執行：python -m pytest tests"""
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PathList import iter_xlsx_column, iter_xlsx_column_openpyxl, read_path_list  # noqa: E402
+from XlsxStream import XlsxStreamWriter  # noqa: E402
+
+try:
+    import openpyxl  # noqa: F401
+except ImportError:
+    openpyxl = None
+
+
+class XlsxColumnTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.xlsx = Path(self.tmp.name) / "list.xlsx"
+        with XlsxStreamWriter(self.xlsx, ["FullPath"]) as w:
+            w.append([r"D:\docs\a.doc"])
+            w.append([datetime(2024, 1, 1)])
+            w.append([" 'D:\\docs\\b c.doc' "])
+            w.append([12])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_date_cell_is_serial(self):
+        values = list(iter_xlsx_column(self.xlsx, skip_header=True))
+        self.assertEqual(values, [r"D:\docs\a.doc", "45292.0", " 'D:\\docs\\b c.doc' ", "12"])
+
+    @unittest.skipIf(openpyxl is None, "需要 openpyxl")
+    def test_only_dates_differ_from_openpyxl(self):
+        fast = list(iter_xlsx_column(self.xlsx, skip_header=True))
+        slow = list(iter_xlsx_column_openpyxl(self.xlsx, skip_header=True))
+        self.assertEqual(slow[1], "2024-01-01 00:00:00")
+        self.assertEqual(fast[:1] + fast[2:], slow[:1] + slow[2:])
+        fast_paths = list(read_path_list(self.xlsx, skip_header=True))
+        slow_paths = list(read_path_list(self.xlsx, skip_header=True, engine="openpyxl"))
+        self.assertEqual(fast_paths[0], Path(r"D:\docs\a.doc"))
+        self.assertEqual(fast_paths[2], Path(r"D:\docs\b c.doc"))
+        self.assertEqual(fast_paths[:1] + fast_paths[2:], slow_paths[:1] + slow_paths[2:])
+
+
+if __name__ == "__main__":
+    unittest.main()
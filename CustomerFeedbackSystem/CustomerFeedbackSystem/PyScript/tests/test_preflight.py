@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Preflight.preflight：不存在、資料夾、重複列出與大小寫不同的重複列。執行：python -m pytest tests"""
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Preflight  # noqa: E402
+from Preflight import preflight  # noqa: E402
+
+
+class PreflightTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        for rel in ("a/x.doc", "a/y.doc", "b/z.doc"):
+            p = self.base / rel
+            p.parent.mkdir(exist_ok=True)
+            p.write_text(rel)
+        (self.base / "a" / "sub").mkdir()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_missing_directory_duplicate(self):
+        a, b = self.base / "a", self.base / "b"
+        paths = [a / "x.doc", a / "sub", a / "nope.doc", b / "z.doc", a / "x.doc",
+                 self.base / "gone" / "q.doc", a / "y.doc"]
+        report = preflight(paths, workers=2)
+        self.assertEqual(report.total, 7)
+        self.assertEqual(report.parents, 3)
+        self.assertEqual([p for p, _ in report.valid], [a / "x.doc", b / "z.doc", a / "y.doc"])
+        self.assertEqual(report.valid[0][1].st_size, os.stat(a / "x.doc").st_size)
+        self.assertEqual(report.missing, [a / "nope.doc", self.base / "gone" / "q.doc"])
+        self.assertEqual(report.directories, [a / "sub"])
+        self.assertEqual(report.duplicates, {a / "x.doc": 2})
+
+    def test_keep_duplicates(self):
+        a = self.base / "a"
+        report = preflight([a / "x.doc", a / "x.doc", a / "x.doc"], keep_duplicates=True)
+        self.assertEqual([p for p, _ in report.valid], [a / "x.doc"] * 3)
+        self.assertEqual(report.duplicates, {a / "x.doc": 3})
+
+    def test_case_folded_duplicates(self):
+        # 模擬 Windows：normcase 轉小寫，C:\\A\\x.doc 與 c:\\a\\X.DOC 是同一個檔案
+        lower = self.base / "a" / "x.doc"
+        upper = self.base / "A" / "X.DOC"
+        with mock.patch.object(Preflight.os.path, "normcase", str.lower):
+            for keep in (False, True):
+                report = preflight([lower, upper, self.base / "A" / "Y.doc"], keep_duplicates=keep)
+                self.assertEqual(report.parents, 1)
+                expected = [lower, upper, self.base / "A" / "Y.doc"] if keep else [lower, self.base / "A" / "Y.doc"]
+                self.assertEqual([p for p, _ in report.valid], expected)
+                self.assertEqual(report.missing, [])
+                self.assertEqual(report.duplicates, {lower: 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
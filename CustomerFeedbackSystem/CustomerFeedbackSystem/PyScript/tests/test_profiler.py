@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Profiler：--profile-json 輸出各階段統計；未啟用時 classify 與複製迴圈中的 start/stop 不做任何事。執行：python -m pytest tests"""
+import contextlib
+import io
+import json
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Profiler  # noqa: E402
+import VerifyDoc  # noqa: E402
+from CopyEngine import CopyEngine  # noqa: E402
+from SyntheticTree import make_doc, make_ooxml_doc, make_rtf  # noqa: E402
+
+STAT_KEYS = {"count", "total_seconds", "self_seconds", "mean_ms", "p95_ms",
+             "bytes_read", "bytes_written", "per_second"}
+
+
+@contextlib.contextmanager
+def fresh_profiler():
+    """以新的 Profiler 取代各模組匯入的共用 PROFILE，測試之間互不影響。"""
+    prof, shared = Profiler.Profiler(), Profiler.PROFILE
+    with contextlib.ExitStack() as stack:
+        for mod in list(sys.modules.values()):
+            if getattr(mod, "PROFILE", None) is shared:
+                stack.enter_context(mock.patch.object(mod, "PROFILE", prof))
+        yield prof
+    prof.finish()  # 已結束時為空操作；避免 atexit 在測試結束後才印出報告
+
+
+class ProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        self.tree = self.base / "tree"
+        self.tree.mkdir()
+        for name, data in (
+            ("a.docx", make_ooxml_doc(8 * 1024)),
+            ("b.doc", make_doc(16 * 1024)[0]),
+            ("c.rtf", make_rtf(1024)),
+        ):
+            (self.tree / name).write_bytes(data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_profile_json_has_stage_keys(self):
+        out_json = self.base / "profile.json"
+        argv = ["VerifyDoc.py", str(self.tree), "--csv", str(self.base / "out.csv"),
+                "--workers", "1", "--profile-json", str(out_json)]
+        stdout = io.StringIO()
+        with fresh_profiler() as prof, mock.patch.object(sys, "argv", argv), \
+                contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+            VerifyDoc.main()
+            self.assertTrue(prof.enabled)
+            prof.finish()
+        summary = json.loads(out_json.read_text(encoding="utf-8"))
+        self.assertEqual(summary["tool"], "VerifyDoc")
+        self.assertEqual(summary["argv"], argv[1:])
+        self.assertGreater(summary["wall_seconds"], 0)
+        stages = summary["stages"]
+        self.assertTrue({"walk", "classify", "head", "zip", "ole", "csv"} <= set(stages), sorted(stages))
+        for name, s in stages.items():
+            self.assertEqual(set(s), STAT_KEYS, name)
+        self.assertEqual(stages["head"]["count"], 3)
+        self.assertEqual(stages["zip"]["count"], 1)
+        self.assertEqual(stages["ole"]["count"], 1)
+        self.assertGreater(stages["head"]["bytes_read"], 0)
+        self.assertIn("==== 效能量測：VerifyDoc", stdout.getvalue())
+
+    def test_disabled_is_a_no_op(self):
+        def no_clock():
+            raise AssertionError("未啟用時不應計時")
+
+        with fresh_profiler() as prof, \
+                mock.patch.object(Profiler, "time", types.SimpleNamespace(perf_counter=no_clock)):
+            self.assertIsNone(prof.start())
+            prof.stop("x", None)
+            for p in sorted(self.tree.iterdir()):
+                VerifyDoc.classify(p, deep_ole=True)
+            out = self.base / "out"
+            out.mkdir()
+            results = list(CopyEngine(out, workers=2, copy_func=shutil.copy2).run(sorted(self.tree.iterdir())))
+        self.assertEqual([r.status for r in results], ["copied"] * 3)
+        self.assertEqual(prof.stages, {})
+        self.assertFalse(prof.enabled)
+
+
+if __name__ == "__main__":
+    unittest.main()
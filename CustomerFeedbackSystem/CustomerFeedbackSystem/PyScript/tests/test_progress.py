@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Progress：預設模式不逐檔印出、--verbose 恢復逐檔輸出、--log 每個事件一行可解析的 JSON。執行：python -m pytest tests"""
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ListAllFilePath  # noqa: E402
+from Progress import Progress  # noqa: E402
+
+
+class ProgressTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def feed(self, progress: Progress):
+        progress.start(3)
+        for i, event in enumerate(("copied", "failed", "copied")):
+            progress.say(f"[{i + 1}/3] 處理：f{i}")
+            progress.event(event, self.base / f"f{i}", f"  -> {event} f{i}", dst=self.base / "out" / f"f{i}")
+        progress.close()
+
+    def test_default_has_no_per_file_lines(self):
+        out = io.StringIO()
+        self.feed(Progress({"copied": "已複製", "failed": "失敗"}, stream=out, interval=3600))
+        lines = out.getvalue().splitlines()
+        # 只有最後的狀態列與總結
+        self.assertEqual(len(lines), 2, lines)
+        self.assertTrue(lines[0].startswith("[3/3] 100.0%"), lines[0])
+        self.assertTrue(lines[0].endswith("| 已複製 2 失敗 1"), lines[0])
+        self.assertTrue(lines[1].startswith("處理 3 件"), lines[1])
+        self.assertNotIn("f0", out.getvalue())
+
+    def test_verbose_prints_per_file_lines(self):
+        out = io.StringIO()
+        self.feed(Progress(verbose=True, stream=out))
+        self.assertEqual(out.getvalue().splitlines(), [
+            "[1/3] 處理：f0", "  -> copied f0",
+            "[2/3] 處理：f1", "  -> failed f1",
+            "[3/3] 處理：f2", "  -> copied f2",
+        ])
+
+    def test_log_one_json_record_per_event(self):
+        log = self.base / "logs" / "run.jsonl"
+        out = io.StringIO()
+        progress = Progress(stream=out, log_path=log, interval=3600)
+        progress.log("missing", self.base / "gone")
+        self.feed(progress)
+        records = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual([(r["i"], r["event"]) for r in records],
+                         [(0, "missing"), (1, "copied"), (2, "failed"), (3, "copied")])
+        self.assertEqual(records[1]["path"], str(self.base / "f0"))
+        self.assertEqual(records[1]["dst"], str(self.base / "out" / "f0"))
+        self.assertTrue(all(isinstance(r["t"], float) for r in records))
+        self.assertIn(f"逐檔記錄：{log}", out.getvalue())
+
+
+class ListAllFilePathOutputTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+        self.tree = self.base / "tree"
+        (self.tree / "sub").mkdir(parents=True)
+        for rel in ("a.doc", "b.txt", "sub/c.docx"):
+            (self.tree / rel).write_text(rel)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_main(self, *extra) -> str:
+        argv = ["ListAllFilePath.py", str(self.tree), "-o", str(self.base / "out.csv"), *extra]
+        out = io.StringIO()
+        with mock.patch.object(sys, "argv", argv), contextlib.redirect_stdout(out):
+            ListAllFilePath.main()
+        return out.getvalue()
+
+    def test_cli_modes(self):
+        paths = sorted(str(self.tree / rel) for rel in ("a.doc", "b.txt", "sub", "sub/c.docx"))
+        quiet = self.run_main()
+        self.assertFalse([p for p in paths if p in quiet], quiet)
+
+        verbose = self.run_main("--verbose")
+        per_file = sorted(line.split(" | ", 1)[1] for line in verbose.splitlines() if " | " in line)
+        self.assertEqual(per_file, paths)
+
+        log = self.base / "run.jsonl"
+        self.run_main("--log", str(log))
+        records = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(sorted(r["path"] for r in records), paths)
+        self.assertEqual(sorted(r["i"] for r in records), [1, 2, 3, 4])
+        self.assertEqual({r["path"]: r["event"] for r in records}[str(self.tree / "sub")], "Folder")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""ScanLibrary：合併後的資料列等於 ListAllFilePath 的清單欄位加上 VerifyDoc 的判定欄位，且各階段不再 stat。執行：python -m pytest tests"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ListAllFilePath  # noqa: E402
+from DirWalker import walk  # noqa: E402
+from ListAllFilePath import HEADERS, entry_row  # noqa: E402
+from ScanLibrary import InventoryStage, VerifyStage, iter_items, run_stages  # noqa: E402
+from SyntheticTree import generate  # noqa: E402
+from VerifyDoc import classify  # noqa: E402
+
+
+class ScanLibraryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        generate(Path(cls.tmp.name) / "gen", files=40, depth=2, fanout=3, median_kb=8, max_kb=64)
+        cls.tree = Path(cls.tmp.name) / "gen" / "tree"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def expected(self, deep_ole, count_docm_as_docx):
+        rows = []
+        for _, entry, is_dir, _ in walk([self.tree], prestat=True):
+            row = entry_row(self.tree, entry, is_dir)
+            if is_dir:
+                row += [""] * (3 + (4 if deep_ole else 0))
+            else:
+                kind, note, _, details = classify(Path(entry.path), deep_ole)
+                is_docx = kind == "DOCX" or (count_docm_as_docx and kind == "DOCM")
+                row += [kind, "Y" if is_docx else "N", note] + (list(details) if deep_ole else [])
+            rows.append(row)
+        return rows
+
+    def test_joined_row_matches_inventory_plus_verify(self):
+        for deep_ole, docm, workers in ((False, False, 1), (True, True, 4)):
+            stages = [InventoryStage(), VerifyStage(deep_ole, docm)]
+            self.assertEqual([c for s in stages for c in s.columns][:len(HEADERS)], list(HEADERS))
+            # 各階段沿用 ScanItem.st，不再呼叫 safe_stat
+            with mock.patch.object(ListAllFilePath, "safe_stat", side_effect=AssertionError("stat again")):
+                rows = list(run_stages(iter_items([self.tree]), stages, workers))
+            self.assertEqual(rows, self.expected(deep_ole, docm))
+            self.assertEqual(len(rows[0]), len(HEADERS) + 3 + (4 if deep_ole else 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""VerifyDoc.classify：只看根目錄下一層的 WordDocument、每個檔案只開啟一次；verify_converted 依 macro_enabled 要求 DOCX / DOCM。執行：python -m pytest tests"""
+import builtins
+import struct
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VerifyDoc  # noqa: E402
+from SyntheticTree import make_cfb, make_doc, make_fib, make_ooxml_doc, make_rtf  # noqa: E402
+
+NOSTREAM = 0xFFFFFFFF
+DIR_OFFSET = 1024  # make_cfb：標頭 512 + 1 個 FAT 磁區
+
+
+def _link(data: bytearray, did: int, right: int = NOSTREAM, child: int = NOSTREAM):
+    """改寫第 did 個目錄項目的 right / child 指標。"""
+    off = DIR_OFFSET + did * 128
+    struct.pack_into("<II", data, off + 0x48, right, child)
+
+
+def make_embedded_xls(inner: str = "WordDocument") -> bytes:
+    """
+    內嵌 Word 物件的 .xls：根目錄下一層只有 MBD0001 與 Workbook，
+    WordDocument（或 Macros）在 MBD0001 儲存區之內。
+    目錄項目：0 Root、1 MBD0001、2 Macros、3 Workbook、4 WordDocument。
+    """
+    data, _ = make_cfb(
+        [("Workbook", b"\x09\x08" * 2048), ("WordDocument", make_fib(0x00C1).ljust(8192, b"\0"))],
+        ("MBD0001", "Macros"),
+    )
+    data = bytearray(data)
+    if inner == "WordDocument":
+        # 根目錄：MBD0001 → Workbook；MBD0001 內：WordDocument → Macros
+        _link(data, 1, right=3, child=4)
+        _link(data, 3)
+        _link(data, 4, right=2)
+    else:
+        # 根目錄：MBD0001 → Workbook → WordDocument（真正的 .doc）；Macros 在 MBD0001 內
+        _link(data, 1, right=3, child=2)
+        _link(data, 3, right=4)
+        _link(data, 4)
+    _link(data, 2)
+    return bytes(data)
+
+
+class _CountingFile:
+    def __init__(self, f, stats):
+        self._f = f
+        self._stats = stats
+
+    def read(self, n=-1):
+        data = self._f.read(n)
+        self._stats["read"] += len(data)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+        return False
+
+
+class ClassifyTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name: str, data: bytes) -> Path:
+        p = self.base / name
+        p.write_bytes(data)
+        return p
+
+    def test_embedded_word_document_is_not_doc(self):
+        p = self.write("report.xls", make_embedded_xls())
+        for deep in (False, True):
+            kind, note, _, _ = VerifyDoc.classify(p, deep_ole=deep)
+            self.assertEqual(kind, "OLE-OTHER", f"deep_ole={deep}")
+            self.assertIn("WordDocument", note)
+
+    def test_root_word_document_is_doc(self):
+        p = self.write("a.doc", make_doc(64 * 1024, macros=True)[0])
+        self.assertEqual(VerifyDoc.classify(p)[0], "DOC(legacy)")
+        kind, _, _, details = VerifyDoc.classify(p, deep_ole=True)
+        self.assertEqual(kind, "DOC(legacy)")
+        self.assertEqual(details.Macros, "Y")
+
+    def test_embedded_macros_are_not_reported(self):
+        p = self.write("b.doc", make_embedded_xls(inner="Macros"))
+        kind, _, _, details = VerifyDoc.classify(p, deep_ole=True)
+        self.assertEqual(kind, "DOC(legacy)")
+        self.assertEqual(details.Macros, "N")
+
+    def test_each_file_opened_once(self):
+        files = {
+            "a.docx": make_ooxml_doc(256 * 1024),
+            "b.doc": make_doc(4 * 1024 * 1024)[0],
+            "c.rtf": make_rtf(4096),
+            "d.bin": b"\x00junk" * 100,
+            "e.xls": make_embedded_xls(),
+        }
+        real_open = builtins.open
+        for name, data in files.items():
+            p = self.write(name, data)
+            for deep in (False, True):
+                stats = {"open": 0, "read": 0}
+
+                def counting_open(*args, **kwargs):
+                    stats["open"] += 1
+                    return _CountingFile(real_open(*args, **kwargs), stats)
+
+                with mock.patch("builtins.open", counting_open):
+                    VerifyDoc.classify(p, deep_ole=deep)
+                self.assertEqual(stats["open"], 1, f"{name} deep_ole={deep}")
+                # 只讀檔頭與少數磁區 / 中央目錄，不會讀完整個檔案
+                if len(data) > 64 * 1024:
+                    self.assertLess(stats["read"], 64 * 1024, f"{name} deep_ole={deep}")
+
+
+class VerifyConvertedTest(unittest.TestCase):
+    def test_macro_enabled_expects_docm(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        docx, docm, junk = (Path(tmp.name) / n for n in ("a.docx", "a.docm", "b.docx"))
+        docx.write_bytes(make_ooxml_doc(8 * 1024))
+        docm.write_bytes(make_ooxml_doc(8 * 1024, "docm"))
+        junk.write_bytes(b"not a zip")
+        self.assertEqual(VerifyDoc.verify_converted(docx), (True, "DOCX", ""))
+        self.assertEqual(VerifyDoc.verify_converted(docm, macro_enabled=True), (True, "DOCM", ""))
+        # 另一種 Word 格式也不算通過
+        self.assertEqual(VerifyDoc.verify_converted(docx, macro_enabled=True), (False, "DOCX", "預期為 DOCM"))
+        self.assertEqual(VerifyDoc.verify_converted(docm), (False, "DOCM", "預期為 DOCX"))
+        ok, kind, _ = VerifyDoc.verify_converted(junk, macro_enabled=True)
+        self.assertEqual((ok, kind), (False, "NOT-WORD"))
+
+
+if __name__ == "__main__":
+    unittest.main()
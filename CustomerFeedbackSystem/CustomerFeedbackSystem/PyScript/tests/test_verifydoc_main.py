@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""VerifyDoc.main：--workers N 與逐一處理的輸出相同、增量檢查快取。執行：python -m pytest tests"""
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import VerifyDoc  # noqa: E402
+from SyntheticTree import generate, make_doc, make_ooxml_doc, make_rtf  # noqa: E402
+
+
+def run_main(*argv) -> str:
+    """以指定參數執行 VerifyDoc.main，回傳主控台輸出。"""
+    out = io.StringIO()
+    with mock.patch.object(sys, "argv", ["VerifyDoc.py", *map(str, argv)]), \
+            contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+        VerifyDoc.main()
+    return out.getvalue()
+
+
+def stats_section(output: str) -> str:
+    return output[output.index("=== 統計 ==="):output.index("已輸出 CSV")]
+
+
+class SyntheticTreeCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.base = Path(cls.tmp.name)
+        generate(cls.base / "gen", files=120, depth=2, fanout=3, median_kb=16, max_kb=256)
+        cls.tree = cls.base / "gen" / "tree"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+
+class WorkersTest(SyntheticTreeCase):
+    def test_parallel_matches_serial(self):
+        for extra in ((), ("--deep-ole",)):
+            serial_csv = self.base / "serial.csv"
+            serial = run_main(self.tree, "--csv", serial_csv, "--workers", 1, *extra)
+            for workers in (2, 8):
+                csv = self.base / f"w{workers}.csv"
+                parallel = run_main(self.tree, "--csv", csv, "--workers", workers, *extra)
+                self.assertEqual(csv.read_bytes(), serial_csv.read_bytes(), f"workers={workers} {extra}")
+                self.assertEqual(stats_section(parallel), stats_section(serial))
+        rows = serial_csv.read_text(encoding="utf-8-sig").splitlines()
+        self.assertEqual(len(rows), 121)
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = Path(self.tmp.name)
+        self.tree = base / "tree"
+        self.tree.mkdir()
+        self.cache = base / "cache.db"
+        for name, data in (
+            ("a.docx", make_ooxml_doc(8 * 1024)),
+            ("b.doc", make_doc(16 * 1024)[0]),
+            ("c.rtf", make_rtf(1024)),
+            ("d.bin", b"junk" * 10),
+        ):
+            (self.tree / name).write_bytes(data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_cached(self, *extra):
+        """回傳 (實際 classify 的檔名, 主控台輸出)。"""
+        real = VerifyDoc.classify
+        checked = []
+
+        def classify(path, deep_ole=False):
+            checked.append(path.name)
+            return real(path, deep_ole)
+
+        with mock.patch.object(VerifyDoc, "classify", classify):
+            out = run_main(self.tree, "--cache", self.cache, *extra)
+        return sorted(checked), out
+
+    def cached_paths(self):
+        with sqlite3.connect(str(self.cache)) as conn:
+            return sorted(Path(p).name for (p,) in conn.execute("SELECT path FROM results"))
+
+    def test_unchanged_rerun_hits(self):
+        checked, _ = self.run_cached()
+        self.assertEqual(checked, ["a.docx", "b.doc", "c.rtf", "d.bin"])
+        checked, out = self.run_cached()
+        self.assertEqual(checked, [])
+        self.assertIn("新增：0\n變更：0\n移除：0", out)
+        self.assertIn("DOC(legacy): 1", out)
+
+    def test_size_or_mtime_change_misses(self):
+        self.run_cached()
+        (self.tree / "c.rtf").write_bytes(make_rtf(2048))
+        st = os.stat(self.tree / "d.bin")
+        os.utime(self.tree / "d.bin", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        checked, out = self.run_cached()
+        self.assertEqual(checked, ["c.rtf", "d.bin"])
+        self.assertIn("變更：2", out)
+        self.assertEqual(self.run_cached()[0], [])
+
+    def test_removed_pruned(self):
+        self.run_cached()
+        (self.tree / "a.docx").unlink()
+        checked, out = self.run_cached()
+        self.assertEqual(checked, [])
+        self.assertIn("移除：1", out)
+        self.assertIn(f"[移除] {self.tree / 'a.docx'}", out)
+        self.assertEqual(self.cached_paths(), ["b.doc", "c.rtf", "d.bin"])
+
+    def test_version_change_rebuilds(self):
+        self.run_cached()
+        with mock.patch.object(VerifyDoc, "CACHE_VERSION", VerifyDoc.CACHE_VERSION + 100):
+            checked, _ = self.run_cached()
+        self.assertEqual(checked, ["a.docx", "b.doc", "c.rtf", "d.bin"])
+        with sqlite3.connect(str(self.cache)) as conn:
+            version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+        self.assertEqual(version, str(VerifyDoc.CACHE_VERSION + 100))
+
+    def test_deep_ole_rechecks_shallow_doc(self):
+        self.run_cached()
+        # 快取中的 .doc 沒有深度檢查結果：只重新檢查 .doc，且不算變更
+        checked, out = self.run_cached("--deep-ole")
+        self.assertEqual(checked, ["b.doc"])
+        self.assertIn("變更：0", out)
+        self.assertEqual(self.run_cached("--deep-ole")[0], [])
+        # 深度結果可供一般模式沿用
+        self.assertEqual(self.run_cached()[0], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
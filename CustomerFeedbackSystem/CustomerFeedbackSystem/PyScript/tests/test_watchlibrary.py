@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+WatchLibrary（僅限 Linux）：直接呼叫 reconcile() / _flush() 驗證新增、修改、搬移、刪除、
+靜置時間、事件溢位重掃、deep_ole 由關改開，以及 store_rows 與 ListAllFilePath.entry_row 一致。
+執行：python -m pytest tests
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from SyntheticTree import make_doc, make_ooxml_doc  # noqa: E402
+
+LINUX = sys.platform.startswith("linux")
+if LINUX:
+    import WatchLibrary  # noqa: E402
+    from DirWalker import walk  # noqa: E402
+    from ListAllFilePath import entry_row  # noqa: E402
+    from Progress import Progress  # noqa: E402
+    from VerifyDoc import classify  # noqa: E402
+
+DEBOUNCE = 2.0
+CLOCK = 1000.0
+
+
+@unittest.skipUnless(LINUX, "WatchLibrary 需要 Linux inotify")
+class WatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = Path(self.tmp.name)
+        self.root = base / "lib"
+        (self.root / "d1" / "sub").mkdir(parents=True)
+        (self.root / "d2").mkdir()
+        self.write("d1/a.docx", make_ooxml_doc(4096))
+        self.write("d1/sub/b.doc", make_doc(16 * 1024)[0])
+        self.write("d2/c.txt", b"plain text")
+        self.store = WatchLibrary.LibraryStore(base / "lib.sqlite", deep_ole=False)
+        self.checked = []
+        patcher = mock.patch.object(WatchLibrary, "classify", self._classify)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        stderr = mock.patch.object(sys, "stderr", io.StringIO())
+        stderr.start()
+        self.addCleanup(stderr.stop)
+        self.watcher = WatchLibrary.LibraryWatcher(
+            [self.root], self.store, workers=1, debounce=DEBOUNCE, progress=Progress(stream=io.StringIO())
+        )
+        self.watcher.scan()
+
+    def tearDown(self):
+        self.watcher.close()
+        self.store.close()
+        self.tmp.cleanup()
+
+    def _classify(self, path, deep_ole=False):
+        self.checked.append(os.path.relpath(path, self.root))
+        return classify(path, deep_ole)
+
+    def write(self, rel: str, data: bytes):
+        (self.root / rel).write_bytes(data)
+
+    def events(self, now: float = CLOCK):
+        """讀出目前佇列中的所有 inotify 事件並交給 watcher。"""
+        while True:
+            evs = self.watcher.inotify.read(0.1)
+            if not evs:
+                return
+            for ev in evs:
+                self.watcher._on_event(ev, now)
+
+    def flush(self) -> int:
+        self.events()
+        self.checked.clear()
+        return self.watcher._flush(CLOCK + DEBOUNCE)
+
+    def kinds(self):
+        """store 內容：相對路徑 → kind（資料夾為 "/"，未判定為 None）。"""
+        rows = self.store.conn.execute("SELECT path, is_dir, kind FROM entries").fetchall()
+        return {os.path.relpath(p, self.root): ("/" if d else k) for p, d, k in rows}
+
+    def test_initial_scan(self):
+        self.assertEqual(sorted(self.checked), ["d1/a.docx", "d1/sub/b.doc", "d2/c.txt"])
+        self.assertEqual(self.kinds(), {
+            "d1": "/", "d1/sub": "/", "d2": "/",
+            "d1/a.docx": "DOCX", "d1/sub/b.doc": "DOC(legacy)", "d2/c.txt": "NOT-WORD",
+        })
+        self.assertEqual(set(self.watcher.watched), {str(self.root / d) for d in ("", "d1", "d1/sub", "d2")} | {str(self.root)})
+
+    def test_create_and_modify(self):
+        self.write("d2/new.doc", make_doc(16 * 1024)[0])
+        self.assertGreater(self.flush(), 0)
+        self.assertEqual(self.checked, ["d2/new.doc"])
+        self.assertEqual(self.kinds()["d2/new.doc"], "DOC(legacy)")
+
+        self.write("d1/a.docx", b"no longer a zip")
+        self.flush()
+        self.assertEqual(self.checked, ["d1/a.docx"])
+        self.assertEqual(self.kinds()["d1/a.docx"], "NOT-WORD")
+        # 資料夾只有修改時間改變時直接更新，不算變更
+        self.assertEqual(self.watcher.counts["changed"], 1)
+
+    def test_debounce(self):
+        self.write("d2/new.docx", make_ooxml_doc(4096))
+        self.events(CLOCK)
+        self.assertEqual(self.watcher._flush(CLOCK + DEBOUNCE / 2), 0)
+        self.assertNotIn("d2/new.docx", self.kinds())
+        self.assertIn(str(self.root / "d2" / "new.docx"), self.watcher.pending)
+        self.assertGreater(self.watcher._flush(CLOCK + DEBOUNCE), 0)
+        self.assertEqual(self.kinds()["d2/new.docx"], "DOCX")
+        self.assertEqual(self.watcher.pending, {})
+
+    def test_move_file_reuses_verdict(self):
+        os.rename(self.root / "d1" / "a.docx", self.root / "d2" / "renamed.docx")
+        self.flush()
+        self.assertEqual(self.checked, [])
+        kinds = self.kinds()
+        self.assertNotIn("d1/a.docx", kinds)
+        self.assertEqual(kinds["d2/renamed.docx"], "DOCX")
+        self.assertEqual(self.watcher.counts["moved"], 1)
+
+    def test_move_directory(self):
+        os.rename(self.root / "d1", self.root / "d2" / "moved")
+        self.flush()
+        self.assertEqual(self.checked, [])
+        self.assertEqual(self.kinds(), {
+            "d2": "/", "d2/c.txt": "NOT-WORD", "d2/moved": "/", "d2/moved/sub": "/",
+            "d2/moved/a.docx": "DOCX", "d2/moved/sub/b.doc": "DOC(legacy)",
+        })
+        self.assertNotIn(str(self.root / "d1"), self.watcher.watched)
+        self.assertIn(str(self.root / "d2" / "moved" / "sub"), self.watcher.watched)
+        # 搬過去的資料夾仍受監看
+        self.write("d2/moved/sub/x.docx", make_ooxml_doc(4096))
+        self.flush()
+        self.assertEqual(self.checked, ["d2/moved/sub/x.docx"])
+
+    def test_delete_file_and_subtree(self):
+        (self.root / "d2" / "c.txt").unlink()
+        shutil.rmtree(self.root / "d1")
+        self.flush()
+        self.assertEqual(self.kinds(), {"d2": "/"})
+        self.assertEqual(set(self.watcher.watched), {str(self.root), str(self.root / "d2")})
+
+    def test_overflow_rescans(self):
+        self.write("d2/new.docx", make_ooxml_doc(4096))
+        (self.root / "d1" / "sub" / "b.doc").unlink()
+        # 事件遺失：只知道佇列溢位
+        self.watcher.inotify.read(0.1)
+        self.watcher.overflow = True
+        self.checked.clear()
+        self.assertEqual(self.watcher._flush(CLOCK), 2)  # 新檔與刪檔
+        self.assertEqual(self.checked, ["d2/new.docx"])
+        kinds = self.kinds()
+        self.assertEqual(kinds["d2/new.docx"], "DOCX")
+        self.assertNotIn("d1/sub/b.doc", kinds)
+        self.assertFalse(self.watcher.overflow)
+
+    def test_store_rows_match_entry_row(self):
+        rows = {r[9]: r for r in WatchLibrary.store_rows(self.store)}
+        expected = {}
+        for _, entry, is_dir, _ in walk([self.root], prestat=True):
+            expected[entry.path] = entry_row(self.root, entry, is_dir)
+        self.assertEqual(set(rows), set(expected))
+        for path, row in rows.items():
+            self.assertEqual(row[:10], expected[path], path)
+            if row[1] == "File":
+                kind, note, docx_like, _ = classify(Path(path))
+                self.assertEqual(row[10:], [kind, "Y" if kind == "DOCX" else "N", note])
+            else:
+                self.assertEqual(row[10:], ["", "", ""])
+
+
+@unittest.skipUnless(LINUX, "WatchLibrary 需要 Linux inotify")
+class StoreDeepOleTest(unittest.TestCase):
+    def test_deep_ole_flip_marks_files_pending(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Path(tmp) / "lib.sqlite"
+            root = Path(tmp) / "lib"
+            root.mkdir()
+            (root / "a.doc").write_bytes(make_doc(16 * 1024)[0])
+            store = WatchLibrary.LibraryStore(db, deep_ole=False)
+            watcher = WatchLibrary.LibraryWatcher([root], store, workers=1, progress=Progress(stream=io.StringIO()))
+            watcher.scan()
+            watcher.close()
+            store.close()
+
+            store = WatchLibrary.LibraryStore(db, deep_ole=False)
+            self.assertEqual(store.count()["pending"], 0)
+            store.close()
+            # 由關改開：已判定的檔案需要重新判定（資料夾不受影響）
+            store = WatchLibrary.LibraryStore(db, deep_ole=True)
+            self.assertEqual(store.count()["pending"], 1)
+            self.assertTrue(store.deep_ole)
+            store.close()
+            # 只讀開啟（export）沿用資料庫的設定
+            store = WatchLibrary.LibraryStore(db)
+            self.assertTrue(store.deep_ole)
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""XlsxStreamWriter：空字串與 None 一樣不寫出儲存格。執行：python -m pytest tests"""
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from XlsxStream import XlsxStreamWriter  # noqa: E402
+
+
+class EmptyCellTest(unittest.TestCase):
+    def test_empty_string_not_written(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "out.xlsx"
+            with XlsxStreamWriter(out, ["Name", "Extension", "Size"]) as w:
+                w.append(["docs", "", None])
+                w.append(["a.txt", ".txt", 12])
+            with zipfile.ZipFile(out) as zf:
+                sheet = zf.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        self.assertIn('<row r="2"><c r="A2" t="inlineStr"><is><t>docs</t></is></c></row>', sheet)
+        self.assertNotIn("<t></t>", sheet)
+        self.assertIn('<c r="B3" t="inlineStr"><is><t>.txt</t></is></c>', sheet)
+
+
+if __name__ == "__main__":
+    unittest.main()